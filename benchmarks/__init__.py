@@ -0,0 +1,13 @@
+"""
+Benchmarks package
+
+Performance checks for the compiler pipeline. Each bench_* module is a
+script, run from the repository root with:
+
+    python -m benchmarks.bench_lexer
+
+benchmarks.suite times every pipeline stage on each program shape from
+benchmarks.generator and compares the results with baseline.json:
+
+    python -m benchmarks.suite [--quick] [--update-baseline]
+"""
@@ -0,0 +1,67 @@
+"""
+bench_arena.py
+
+Compares memory and pass speed for the slotted object AST and the same
+AST stored in an ASTArena.
+Run with: python -m benchmarks.bench_arena [lines]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer
+from myparser.parser import Parser
+from myparser.arena import ASTArena
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, format_code
+from benchmarks.generator import generate_program
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_passes(program):
+    SemanticAnalyzer().visit(program)
+    return TACGenerator().generate(program)
+
+
+def main(lines=50000, repeats=3):
+    source = generate_program(lines)
+    parsed = Parser(Lexer(source).tokenize()).parse()
+    arena = ASTArena.from_ast(parsed)
+    del parsed
+
+    ast, object_bytes = retained_bytes(arena.to_ast)
+    _, arena_bytes = retained_bytes(lambda: ASTArena.from_ast(ast))
+
+    print(f"{lines} lines, {len(source)} bytes of source, {len(arena)} nodes")
+    print(f"object AST:  {object_bytes / 1e6:7.2f} MB ({object_bytes / len(arena):.1f} bytes/node)")
+    print(f"ASTArena:    {arena_bytes / 1e6:7.2f} MB ({arena_bytes / len(arena):.1f} bytes/node)")
+
+    object_code, object_time = best_of(repeats, lambda: run_passes(ast))
+    arena_code, arena_time = best_of(repeats, lambda: run_passes(arena.program()))
+    assert format_code(object_code) == format_code(arena_code), "TAC differs"
+    _, build_time = best_of(repeats, lambda: ASTArena.from_ast(ast))
+
+    print(f"passes over objects: {object_time:.3f}s")
+    print(f"passes over arena:   {arena_time:.3f}s ({arena_time / object_time:.2f}x)")
+    print(f"building the arena:  {build_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,36 @@
+"""
+bench_batch.py
+
+Compiles a directory of generated files serially and across a process
+pool, and checks both produce the same output.
+Run with: python -m benchmarks.bench_batch [files] [jobs]
+"""
+
+import os
+import sys
+import tempfile
+
+from driver.batch import compile_batch
+from benchmarks.generator import generate_program
+
+
+def main(files=400, jobs=None):
+    jobs = jobs or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        for seed in range(files):
+            # Mixed sizes, so scheduling order matters
+            lines = 50 + (seed * 7919) % 2000
+            with open(os.path.join(directory, f"prog{seed:05}.tc"), "w") as f:
+                f.write(generate_program(lines, seed=seed))
+
+        serial = compile_batch([directory], jobs=1)
+        parallel = compile_batch([directory], jobs=jobs)
+        assert [r.tac for r in serial.results] == [r.tac for r in parallel.results], "outputs differ"
+
+        print(f"1 worker:   {serial.summary()}")
+        print(f"{jobs} worker(s): {parallel.summary()}")
+        print(f"speedup: {serial.elapsed / parallel.elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,53 @@
+"""
+bench_cache.py
+
+Compiles a set of generated files with a cold and then a warm
+compilation cache.
+Run with: python -m benchmarks.bench_cache [files]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from main import compile_file
+from driver.cache import CompilationCache
+from benchmarks.generator import generate_program
+
+
+def compile_all(paths, cache):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in paths:
+            # Only the TAC, so that a hit skips every stage
+            compile_file(path, cache, ("tac",))
+    return time.perf_counter() - start
+
+
+def main(files=200):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for seed in range(files):
+            path = os.path.join(directory, f"prog{seed}.tc")
+            with open(path, "w") as f:
+                f.write(generate_program(200, seed=seed))
+            paths.append(path)
+
+        cache = CompilationCache(os.path.join(directory, "cache"))
+        uncached = compile_all(paths, None)
+        cold = compile_all(paths, cache)
+        warm = compile_all(paths, cache)
+        assert (cache.hits, cache.misses) == (files, files), "cache was not used"
+
+        print(f"{files} files of 200 lines")
+        print(f"no cache:   {uncached:.3f}s")
+        print(f"cold cache: {cold:.3f}s ({cache.misses} misses)")
+        print(f"warm cache: {warm:.3f}s ({cache.hits} hits)")
+        print(f"speedup: {uncached / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,54 @@
+"""
+bench_dispatch.py
+
+Compares the NodeVisitor dispatch table against building a method name
+and calling getattr on every node, for both the semantic and TAC passes,
+on an AST of about a million nodes. Both sides recurse, so only the
+dispatch differs; see bench_traversal for the iterative passes.
+Run with: python -m benchmarks.bench_dispatch [lines]
+"""
+
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from myparser.ast_nodes import walk
+from benchmarks.generator import generate
+from intermediate import format_code
+from benchmarks.legacy import (
+    GetattrSemanticAnalyzer, GetattrTACGenerator, RecursiveSemanticAnalyzer, RecursiveTACGenerator,
+)
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(lines=8000, repeats=3):
+    ast = Parser(Lexer(generate("expressions", lines, terms=60)).tokenize()).parse()
+    nodes = sum(1 for _ in walk(ast))
+    print(f"{nodes} AST nodes")
+
+    _, getattr_semantic = best_of(repeats, lambda: GetattrSemanticAnalyzer().visit(ast))
+    _, table_semantic = best_of(repeats, lambda: RecursiveSemanticAnalyzer().visit(ast))
+    # Temporaries continue the ids of the table the AST was resolved in
+    analyzer = RecursiveSemanticAnalyzer()
+    analyzer.visit(ast)
+    getattr_code, getattr_tac = best_of(repeats, lambda: GetattrTACGenerator(analyzer.symbol_table).generate(ast))
+    table_code, table_tac = best_of(repeats, lambda: RecursiveTACGenerator(analyzer.symbol_table).generate(ast))
+    assert format_code(getattr_code) == format_code(table_code), "TAC differs"
+
+    print(f"semantic, getattr:        {getattr_semantic:.3f}s")
+    print(f"semantic, dispatch table: {table_semantic:.3f}s ({getattr_semantic / table_semantic:.2f}x)")
+    print(f"TAC, getattr:             {getattr_tac:.3f}s")
+    print(f"TAC, dispatch table:      {table_tac:.3f}s ({getattr_tac / table_tac:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,63 @@
+"""
+bench_expressions.py
+
+Compares the precedence-climbing expression parser against the old
+recursive-descent chain on long operator chains and nested groups.
+Run with: python -m benchmarks.bench_expressions [terms]
+"""
+
+import random
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from benchmarks.generator import OPERATORS, COMPARISONS
+from benchmarks.legacy import RecursiveDescentParser
+
+
+def chain(terms, seed=0):
+    rng = random.Random(seed)
+    parts = ["x"]
+    for _ in range(terms):
+        parts.append(rng.choice(OPERATORS + COMPARISONS))
+        parts.append(str(rng.randint(1, 99)) if rng.random() < 0.5 else "x")
+    return " ".join(parts)
+
+
+def program(expressions, terms):
+    body = "\n".join(f"x = {chain(terms, seed)};" for seed in range(expressions))
+    return f"int x = 1;\n{body}\n"
+
+
+def timed(parser_class, tokens, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ast = parser_class(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    return ast, best
+
+
+def main(terms=200):
+    source = program(2000, terms)
+    tokens = Lexer(source).tokenize()
+
+    current_ast, current = timed(Parser, tokens)
+    legacy_ast, legacy = timed(RecursiveDescentParser, tokens)
+    assert repr(current_ast) == repr(legacy_ast), "expression trees differ"
+
+    print(f"2000 expressions of {terms} operators, {len(tokens)} tokens")
+    print(f"recursive descent:     {legacy:.3f}s")
+    print(f"precedence climbing:   {current:.3f}s")
+    print(f"speedup: {legacy / current:.2f}x")
+
+    depth = 100000
+    nested = f"int x; x = {'(' * depth}x{')' * depth};"
+    start = time.perf_counter()
+    Parser(Lexer(nested).tokenize()).parse()
+    print(f"{depth} nested parentheses: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
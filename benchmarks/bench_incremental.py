@@ -0,0 +1,55 @@
+"""
+bench_incremental.py
+
+Measures the latency of small edits at random places through
+IncrementalDocument against a full lex and parse of the edited source.
+Apart from copying the text, which is a plain memory copy, an edit
+should cost about the same at every size.
+Run with: python -m benchmarks.bench_incremental [lines]
+"""
+
+import random
+import sys
+import time
+
+from lexer import Lexer
+from myparser import IncrementalDocument, Parser
+from myparser.ast_nodes import Assignment
+from benchmarks.generator import generate_program
+
+
+def top_level_assignments(document):
+    return [item for item in document.program.statements if isinstance(item, Assignment)]
+
+
+def main(lines=None):
+    sizes = [lines] if lines else [1000, 10000, 100000]
+    edits = 50
+
+    for size in sizes:
+        document = IncrementalDocument(generate_program(size))
+        rng = random.Random(0)
+        targets = rng.sample(top_level_assignments(document), edits)
+
+        times = []
+        for target in targets:
+            # Insert just before the `;` of a random assignment
+            position = document.spans.get(target).end - 1
+            start = time.perf_counter()
+            document.edit(position, position, " + 1")
+            times.append(time.perf_counter() - start)
+        times.sort()
+        incremental = sum(times) / edits
+        assert document.last_edit == "incremental"
+
+        start = time.perf_counter()
+        full = Parser(Lexer(document.text).tokenize()).parse()
+        reparse = time.perf_counter() - start
+        assert repr(full) == repr(document.program), "incremental tree differs"
+
+        print(f"{size} lines: edit {incremental * 1000:.3f}ms (median {times[edits // 2] * 1000:.3f}ms, "
+              f"max {times[-1] * 1000:.3f}ms), full reparse {reparse * 1000:.1f}ms, speedup {reparse / incremental:.0f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,75 @@
+"""
+bench_interning.py
+
+Measures the memory held by the tokens and AST of a program that reuses
+a handful of variables heavily, with interned names and pooled numbers
+against fresh copies of each value, and with and without leaf sharing
+in the parser.
+Run with: python -m benchmarks.bench_interning [lines] [variables]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer
+from lexer.locations import TokenList
+from lexer.token import Token, TokenType
+from myparser.parser import Parser
+from intermediate import TACGenerator, format_code
+from benchmarks.generator import generate_program
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def fresh(value):
+    # A new object equal to `value`, as the lexer returned before names
+    # were interned and numbers pooled
+    if isinstance(value, str):
+        return value[:1] + value[1:]
+    if isinstance(value, int):
+        return int(str(value))
+    return value
+
+
+def uninterned(tokens):
+    return TokenList((
+        Token(t.type, fresh(t.value) if t.type in (TokenType.IDENTIFIER, TokenType.NUMBER) else t.value, t.line)
+        for t in tokens
+    ), tokens.locations)
+
+
+def main(lines=50000, variables=5):
+    source = generate_program(lines, variables=variables)
+    print(f"{lines} lines, {variables} variables, {len(source)} bytes of source")
+
+    interned, interned_bytes = retained_bytes(lambda: Lexer(source).tokenize())
+    copies, copied_bytes = retained_bytes(lambda: uninterned(Lexer(source).tokenize()))
+    print(f"tokens, fresh values:   {copied_bytes / 1e6:7.2f} MB")
+    print(f"tokens, interned:       {interned_bytes / 1e6:7.2f} MB ({interned_bytes / copied_bytes:.2f}x)")
+
+    reference = None
+    for label, tokens, share_leaves in (
+        ("AST, fresh values:     ", copies, False),
+        ("AST, interned:         ", interned, False),
+        ("AST, shared leaves:    ", interned, True),
+    ):
+        start = time.perf_counter()
+        program, size = retained_bytes(lambda: Parser(tokens, share_leaves=share_leaves).parse())
+        elapsed = time.perf_counter() - start
+        print(f"{label}{size / 1e6:7.2f} MB, {len(program.spans)} spans, parsed in {elapsed:.3f}s")
+
+        code = format_code(TACGenerator().generate(program))
+        assert reference is None or code == reference, "TAC differs"
+        reference = code
+        del program
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
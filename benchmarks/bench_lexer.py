@@ -0,0 +1,52 @@
+"""
+bench_lexer.py
+
+Compares lexer throughput, for Token lists and for the TokenBuffer,
+against the per-character baseline.
+Run with: python -m benchmarks.bench_lexer [lines]
+"""
+
+import sys
+import time
+
+from lexer import Lexer
+from benchmarks.generator import generate_program
+from benchmarks.legacy import LegacyLexer
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lines=200000, repeats=3):
+    source = generate_program(lines)
+    size_mb = len(source) / 1e6
+
+    tokens = Lexer(source).tokenize()
+    legacy_tokens = LegacyLexer(source).tokenize()
+    assert [(t.type, t.value, t.line) for t in tokens] == [
+        (t.type, t.value, t.line) for t in legacy_tokens
+    ], "token streams differ"
+
+    buffer = Lexer(source).tokenize_buffer()
+    assert [(t.type, t.value, t.line) for t in buffer] == [
+        (t.type, t.value, t.line) for t in tokens
+    ], "buffer differs"
+
+    legacy = best_of(repeats, lambda: LegacyLexer(source).tokenize())
+    current = best_of(repeats, lambda: Lexer(source).tokenize())
+    buffered = best_of(repeats, lambda: Lexer(source).tokenize_buffer())
+
+    print(f"source: {lines} lines, {size_mb:.1f} MB, {len(tokens)} tokens")
+    print(f"legacy lexer:  {legacy:.3f}s  {size_mb / legacy:.2f} MB/s")
+    print(f"token list:    {current:.3f}s  {size_mb / current:.2f} MB/s  ({legacy / current:.1f}x)")
+    print(f"token buffer:  {buffered:.3f}s  {size_mb / buffered:.2f} MB/s  ({legacy / buffered:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+bench_mmap.py
+
+Compares lexing a file read into a str against lexing it through a
+memory map. Peak memory is the Python heap as seen by tracemalloc; the
+mapped file itself lives in the OS page cache.
+Run with: python -m benchmarks.bench_mmap [lines]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lexer import Lexer
+from benchmarks.generator import generate_program
+
+
+def measure(lex):
+    start = time.perf_counter()
+    count = sum(1 for _ in lex())
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in lex():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def read_and_lex(path):
+    with open(path, "r") as f:
+        source = f.read()
+    return Lexer(source).iter_tokens()
+
+
+def main(lines=200000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.tc")
+        with open(path, "w") as f:
+            f.write(generate_program(lines))
+        size_mb = os.path.getsize(path) / 1e6
+
+        count, read_time, read_peak = measure(lambda: read_and_lex(path))
+        _, mmap_time, mmap_peak = measure(lambda: Lexer.from_file(path).iter_tokens())
+
+    print(f"source: {lines} lines, {size_mb:.1f} MB, {count} tokens")
+    print(f"read() + str:  {read_time:.3f}s  peak heap {read_peak / 1e6:.1f} MB")
+    print(f"mmap + bytes:  {mmap_time:.3f}s  peak heap {mmap_peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,65 @@
+"""
+bench_output.py
+
+Compares the old print-per-line stage dumps against format_text with
+one buffered write, for the full dump and for TAC only.
+Run with: python -m benchmarks.bench_output [lines]
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+from driver.pipeline import DEFAULT_EMIT, compile_source, format_text
+from benchmarks.generator import generate_program
+
+
+def print_per_line(result):
+    # How compile_file wrote its dumps before compile_source existed
+    print("===== SOURCE CODE =====")
+    print(result.source)
+    print("\n===== TOKENS =====")
+    for token in result.tokens:
+        print(token)
+    print("\n===== AST GENERATED =====")
+    print("Semantic Analysis Passed")
+    print("\n===== THREE ADDRESS CODE =====")
+    for line in result.tac:
+        print(line)
+
+
+def write_once(result, emit):
+    sys.stdout.write(format_text(result, emit))
+
+
+def timed(fn, *args, repeats=3):
+    best = float("inf")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lines=50000):
+    source = generate_program(lines)
+    result = compile_source(source, DEFAULT_EMIT)
+
+    legacy = timed(print_per_line, result)
+    full = timed(write_once, result, DEFAULT_EMIT)
+    tac_only = timed(write_once, result, ("tac",))
+    compile_full = timed(compile_source, source, DEFAULT_EMIT)
+    compile_tac = timed(compile_source, source, ("tac",))
+
+    print(f"{lines} lines, output to {os.devnull}")
+    print(f"dump, print per line:    {legacy:.3f}s")
+    print(f"dump, one write:         {full:.3f}s ({legacy / full:.2f}x)")
+    print(f"dump, TAC only:          {tac_only:.3f}s ({legacy / tac_only:.2f}x)")
+    print(f"compile keeping tokens:  {compile_full:.3f}s")
+    print(f"compile, TAC only:       {compile_tac:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,112 @@
+"""
+bench_scopes.py
+
+Runs semantic analysis over a tower of thousands of nested blocks, each
+declaring a local and reading names from every level, with the undo-log
+SymbolTable against a table copied on every scope entry and a chain of
+per-scope dicts searched innermost first.
+Run with: python -m benchmarks.bench_scopes [depth] [globals]
+"""
+
+import sys
+import time
+
+from myparser.ast_nodes import Program, Declaration, Assignment, PrintStatement, Block, BinaryOp, Number, Identifier
+from semantic import SemanticAnalyzer, SymbolTable
+from semantic.symbol_table import Symbol
+
+
+class CopyingSymbolTable(SymbolTable):
+    """Saves a copy of the whole table on entering each scope."""
+
+    def enter_scope(self):
+        self.scopes.append(self.table)
+        self.table = dict(self.table)
+
+    def exit_scope(self):
+        self.table = self.scopes.pop()
+
+    def declare(self, name, symbol_type):
+        symbol = self.table.get(name)
+        if symbol is not None and symbol.depth == len(self.scopes):
+            raise Exception(f"Semantic Error: Variable '{name}' already declared.")
+        symbol = self.table[name] = Symbol(name, symbol_type, len(self.scopes))
+        return symbol
+
+
+class ChainedSymbolTable(SymbolTable):
+    """One dict per scope; lookups search from the innermost outwards."""
+
+    def enter_scope(self):
+        self.scopes.append({})
+
+    def exit_scope(self):
+        self.scopes.pop()
+
+    def declare(self, name, symbol_type):
+        scope = self.scopes[-1] if self.scopes else self.table
+        if name in scope:
+            raise Exception(f"Semantic Error: Variable '{name}' already declared.")
+        symbol = scope[name] = Symbol(name, symbol_type, len(self.scopes))
+        return symbol
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            symbol = scope.get(name)
+            if symbol is not None:
+                return symbol
+        return super().lookup(name)
+
+
+def scope_tower(depth, global_count):
+    """
+    A program with `global_count` globals and `depth` nested blocks.
+    Each block declares a local shadowing the one outside it, assigns a
+    global, and prints a sum of its own local, a global and the local
+    of the block a few levels up.
+    """
+    globals_ = [f"g{i}" for i in range(global_count)]
+    declarations = [Declaration(name, Number(i)) for i, name in enumerate(globals_)]
+
+    innermost = Block([PrintStatement(Identifier("local"))])
+    for level in reversed(range(depth)):
+        outer = f"l{max(0, level - 3)}"
+        target = globals_[level % global_count]
+        innermost = Block([
+            Declaration(f"l{level}", Number(level)),
+            Declaration("local", Identifier(target)),
+            Assignment(target, BinaryOp(Identifier("local"), "+", Number(1))),
+            PrintStatement(BinaryOp(BinaryOp(Identifier(f"l{level}"), "+", Identifier(target)), "+", Identifier(outer))),
+            innermost,
+        ])
+    return Program(declarations, [innermost], None)
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def analyze(program, table_class):
+    analyzer = SemanticAnalyzer()
+    analyzer.symbol_table = table_class()
+    analyzer.visit(program)
+
+
+def main(depth=5000, global_count=200, repeats=3):
+    program = scope_tower(depth, global_count)
+    print(f"{depth} nested scopes, {global_count} globals")
+
+    undo = best_of(repeats, lambda: analyze(program, SymbolTable))
+    print(f"undo log:        {undo:.3f}s")
+    for label, table_class in (("copy per scope: ", CopyingSymbolTable), ("chained dicts:  ", ChainedSymbolTable)):
+        elapsed = best_of(repeats, lambda: analyze(program, table_class))
+        print(f"{label} {elapsed:.3f}s ({elapsed / undo:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
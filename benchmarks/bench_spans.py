@@ -0,0 +1,49 @@
+"""
+bench_spans.py
+
+Measures the memory cost of source spans: the extra bytes each Token
+carries, and the size of the parser's span table relative to the AST.
+Run with: python -m benchmarks.bench_spans [lines]
+"""
+
+import sys
+import tracemalloc
+
+from lexer import Lexer
+from myparser.parser import Parser
+from benchmarks.generator import generate_program
+from benchmarks.legacy import LegacyToken
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main(lines=1000000):
+    source = generate_program(lines)
+
+    sample = source[: len(source) // 20]
+    tokens, with_spans = retained_bytes(lambda: Lexer(sample).tokenize())
+    rows = [(t.type, t.value, t.line) for t in tokens]
+    _, without_spans = retained_bytes(lambda: [LegacyToken(*row) for row in rows])
+    count = len(rows)
+    del tokens, rows
+
+    ast, total = retained_bytes(lambda: Parser(Lexer(source).iter_tokens()).parse())
+    spans = ast.spans.nbytes()
+    nodes = len(ast.spans)
+
+    print(f"source: {lines} lines, {len(source) / 1e6:.1f} MB")
+    print(f"token without spans: {without_spans / count:6.1f} bytes/token")
+    print(f"token with spans:    {with_spans / count:6.1f} bytes/token")
+    print(f"AST: {nodes} nodes, {total / 1e6:.1f} MB including spans")
+    print(f"span table: {spans / 1e6:.1f} MB, {spans / nodes:.1f} bytes/node, "
+          f"{100 * spans / total:.1f}% of the AST")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
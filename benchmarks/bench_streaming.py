@@ -0,0 +1,40 @@
+"""
+bench_streaming.py
+
+Compares peak memory of parsing from a token list against parsing from
+the lazy token stream.
+Run with: python -m benchmarks.bench_streaming [lines]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer
+from myparser.parser import Parser
+from benchmarks.generator import generate_program
+
+
+def measure(parse):
+    tracemalloc.start()
+    start = time.perf_counter()
+    parse()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(lines=50000):
+    source = generate_program(lines)
+
+    list_time, list_peak = measure(lambda: Parser(Lexer(source).tokenize()).parse())
+    stream_time, stream_peak = measure(lambda: Parser(Lexer(source).iter_tokens()).parse())
+
+    print(f"source: {lines} lines, {len(source) / 1e6:.1f} MB")
+    print(f"token list:   {list_time:.3f}s  peak {list_peak / 1e6:.1f} MB")
+    print(f"token stream: {stream_time:.3f}s  peak {stream_peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,46 @@
+"""
+bench_temps.py
+
+Counts the distinct temporaries in the TAC of each program shape before
+and after linear-scan temp allocation, alone and at the end of the full
+optimizer, with the largest number live at once and the time taken.
+Run with: python -m benchmarks.bench_temps [lines]
+"""
+
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator
+from optimizer import optimize, TempAllocator
+from benchmarks.generator import generate
+
+
+def compile_code(source):
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(program)
+    return TACGenerator(analyzer.symbol_table).generate(program)
+
+
+def distinct_temps(code):
+    return len({instr.dest.id for instr in code if instr.dest is not None and instr.dest.type == "temp"})
+
+
+def main(lines=5000):
+    for shape in ("mixed", "expressions", "loops"):
+        code = compile_code(generate(shape, lines))
+        print(f"{shape}: {lines} lines, {len(code)} instructions, {distinct_temps(code)} temps")
+
+        for label, passes in (("allocation only:", (TempAllocator,)), ("full optimizer: ", None)):
+            start = time.perf_counter()
+            optimized, counts = optimize(code) if passes is None else optimize(code, passes)
+            elapsed = time.perf_counter() - start
+            print(f"  {label} {distinct_temps(optimized):6} temps, "
+                  f"{counts['max_live_temps']} live at most, {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,56 @@
+"""
+bench_tokens.py
+
+Compares bytes per token for the dict-backed token class, the slotted
+Token with its TokenLocations row, and the TokenBuffer, and parse time from a list against parse time
+straight off the buffer.
+Run with: python -m benchmarks.bench_tokens [lines]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer
+from myparser.parser import Parser
+from benchmarks.generator import generate_program
+from benchmarks.legacy import LegacyToken
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(lines=50000):
+    source = generate_program(lines)
+    rows = [(t.type, t.value, t.line) for t in Lexer(source).tokenize()]
+    count = len(rows)
+
+    _, legacy = retained_bytes(lambda: [LegacyToken(*row) for row in rows])
+    _, slotted = retained_bytes(lambda: Lexer(source).tokenize())
+    buffer, buffered = retained_bytes(lambda: Lexer(source).tokenize_buffer())
+
+    print(f"source: {lines} lines, {count} tokens")
+    print(f"dict-backed Token: {legacy / count:6.1f} bytes/token")
+    print(f"slotted Token:     {slotted / count:6.1f} bytes/token (locations included)")
+    print(f"TokenBuffer:       {buffered / count:6.1f} bytes/token "
+          f"({buffer.nbytes() / count:.1f} in columns)")
+
+    from_list = timed(lambda: Parser(Lexer(source).tokenize()).parse())
+    from_buffer = timed(lambda: Parser(Lexer(source).tokenize_buffer()).parse())
+    print(f"lex + parse from list:   {from_list:.3f}s")
+    print(f"lex + parse from buffer: {from_buffer:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
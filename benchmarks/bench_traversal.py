@@ -0,0 +1,77 @@
+"""
+bench_traversal.py
+
+Compares the generator-trampolined passes against the same passes
+visiting children by recursion, on a large flat AST and on deeply
+nested expressions and blocks that recursion cannot handle.
+Run with: python -m benchmarks.bench_traversal [depth]
+"""
+
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, format_code
+from benchmarks.generator import generate
+from benchmarks.legacy import (
+    GetattrSemanticAnalyzer, GetattrTACGenerator, RecursiveSemanticAnalyzer, RecursiveTACGenerator,
+)
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_passes(analyzer_class, generator_class, ast):
+    analyzer = analyzer_class()
+    analyzer.visit(ast)
+    return generator_class(analyzer.symbol_table).generate(ast)
+
+
+VARIANTS = [
+    ("getattr + recursion", GetattrSemanticAnalyzer, GetattrTACGenerator),
+    ("table + recursion", RecursiveSemanticAnalyzer, RecursiveTACGenerator),
+    ("table + trampoline", SemanticAnalyzer, TACGenerator),
+]
+
+
+def main(depth=100000, repeats=7):
+    ast = Parser(Lexer(generate("expressions", 4000, terms=60)).tokenize()).parse()
+    print("flat AST (4000 lines of 60-term expressions), semantic + TAC:")
+    expected = None
+    for name, analyzer_class, generator_class in VARIANTS:
+        code, seconds = best_of(repeats, lambda: run_passes(analyzer_class, generator_class, ast))
+        code = format_code(code)
+        expected = expected or code
+        assert code == expected, "TAC differs"
+        print(f"  {name:<20} {seconds:.3f}s")
+
+    sources = {
+        "right-deep nesting": f"int x; x = {'(1 + ' * depth}x{')' * depth};",
+        "left-deep chain": f"int x; x = x{' - 1' * depth};",
+        "nested while blocks": f"int x; {'while (x > 0) { ' * depth}x = x - 1;{' }' * depth}",
+        "nested if/else blocks": f"int x; {'if (x) { ' * depth}print(x);{' } else { x = 1; }' * depth}",
+    }
+    for label, source in sources.items():
+        tokens = Lexer(source).tokenize()
+        ast, seconds = best_of(1, lambda: Parser(tokens).parse())
+        print(f"{label}, depth {depth}:")
+        print(f"  {'parse':<20} {seconds:.3f}s")
+        for name, analyzer_class, generator_class in VARIANTS:
+            try:
+                code, seconds = best_of(1, lambda: run_passes(analyzer_class, generator_class, ast))
+            except RecursionError:
+                print(f"  {name:<20} RecursionError")
+                continue
+            print(f"  {name:<20} {seconds:.3f}s, {len(code)} instructions")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,60 @@
+"""
+bench_value_numbering.py
+
+Compiles loop-heavy programs full of repeated subexpressions, optimizes
+the TAC with constant folding alone, with local value numbering on top
+and then with dead-code elimination, and runs each version with the
+reference evaluator to compare instruction counts, instructions
+executed and run time.
+Run with: python -m benchmarks.bench_value_numbering [lines] [pool]
+"""
+
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator
+from optimizer import optimize, ConstantFolder, ValueNumbering, DeadCodeElimination
+from benchmarks.evaluator import execute
+from benchmarks.generator import generate
+
+
+def compile_code(source):
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(program)
+    return TACGenerator(analyzer.symbol_table).generate(program)
+
+
+def timed_run(code, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        printed, steps = execute(code)
+        best = min(best, time.perf_counter() - start)
+    return printed, steps, best
+
+
+def main(lines=2000, pool=8):
+    for seed in range(2):
+        code = compile_code(generate("common", lines, seed, pool=pool))
+        print(f"{lines} lines, {pool} distinct subexpressions, seed {seed}")
+
+        reference, steps, plain = timed_run(code)
+        print(f"  unoptimized:      {len(code):7} instructions, {steps:9} executed, {plain:.3f}s")
+        for label, passes in (
+            ("folding:          ", (ConstantFolder,)),
+            ("+ value numbering:", (ConstantFolder, ValueNumbering)),
+            ("+ dead code:      ", (ConstantFolder, ValueNumbering, DeadCodeElimination)),
+        ):
+            optimized, counts = optimize(code, passes)
+            printed, executed, elapsed = timed_run(optimized)
+            assert printed == reference, "optimized program printed different values"
+            print(f"  {label} {len(optimized):7} instructions, {executed:9} executed, "
+                  f"{elapsed:.3f}s ({plain / elapsed:.2f}x), {counts.get('eliminated', 0)} eliminated")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
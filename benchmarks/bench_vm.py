@@ -0,0 +1,77 @@
+"""
+bench_vm.py
+
+Runs loop-heavy programs, the countdown loop of examples/sample2.tc
+scaled up and loops over repeated subexpressions, on the bytecode VM
+and on the reference TAC evaluator, with and without the optimizer,
+and reports TAC instructions executed per second.
+Run with: python -m benchmarks.bench_vm [iterations] [lines]
+"""
+
+import io
+import sys
+import time
+
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator
+from optimizer import optimize
+from vm import VirtualMachine, assemble
+from benchmarks.evaluator import execute
+from benchmarks.generator import generate
+
+
+def countdown(iterations):
+    # examples/sample2.tc with a longer loop
+    return f"""int x = {iterations};
+while (x > 0) {{
+    if (x % 2 == 0) {{
+        print(x);
+    }} else {{
+        print(x + 100);
+    }}
+    x = x - 1;
+}}
+"""
+
+
+def compile_code(source):
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(program)
+    return TACGenerator(analyzer.symbol_table).generate(program)
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(iterations=200000, lines=2000, repeats=3):
+    for name, source in (
+        (f"sample2 countdown from {iterations}", countdown(iterations)),
+        (f"common subexpressions, {lines} lines", generate("common", lines)),
+    ):
+        print(name)
+        code = compile_code(source)
+        for label, program in (("unoptimized", code), ("optimized  ", optimize(code)[0])):
+            printed, steps = execute(program)
+            evaluator = best_of(repeats, lambda: execute(program))
+
+            bytecode = assemble(program)
+            out = io.StringIO()
+            VirtualMachine(bytecode, out).run()
+            assert out.getvalue() == "".join(f"{value}\n" for value in printed), "VM printed different values"
+            machine = best_of(repeats, lambda: VirtualMachine(bytecode, io.StringIO()).run())
+
+            print(f"  {label} {steps:9} TAC instructions: evaluator {steps / evaluator / 1e6:5.2f}M/s, "
+                  f"VM {steps / machine / 1e6:5.2f}M/s ({evaluator / machine:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
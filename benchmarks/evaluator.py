@@ -0,0 +1,51 @@
+"""
+evaluator.py
+
+Reference interpreter for TAC instruction lists, used by benchmarks to
+check that optimized code prints the same values and to time it
+"""
+
+from intermediate.ir import Op
+from optimizer import evaluate
+
+
+def execute(code):
+    """
+    Run a list of TAC instructions. Returns the printed values and the
+    number of instructions executed, not counting labels. Variables
+    read before any store hold 0.
+    """
+    targets = {instr.label: index for index, instr in enumerate(code) if instr.op == Op.LABEL}
+    values = {}
+    printed = []
+    steps = 0
+    index = 0
+    end = len(code)
+
+    def value(operand):
+        if type(operand) is int:
+            return operand
+        return values.get(operand, 0)
+
+    while index < end:
+        instr = code[index]
+        index += 1
+        steps += 1
+        op = instr.op
+        if op == Op.BINARY:
+            result = evaluate(instr.operator, value(instr.left), value(instr.right))
+            if result is None:
+                raise Exception("Runtime Error: division by zero")
+            values[instr.dest] = result
+        elif op == Op.COPY:
+            values[instr.dest] = value(instr.left)
+        elif op == Op.IF_FALSE:
+            if not value(instr.left):
+                index = targets[instr.label]
+        elif op == Op.GOTO:
+            index = targets[instr.label]
+        elif op == Op.PRINT:
+            printed.append(value(instr.left))
+        else:
+            steps -= 1
+    return printed, steps
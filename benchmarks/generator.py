@@ -0,0 +1,196 @@
+"""
+generator.py
+
+Seeded generator for large, valid Tiny C programs
+"""
+
+import random
+
+
+OPERATORS = ["+", "-", "*", "/", "%"]
+COMPARISONS = ["==", "!=", "<", "<=", ">", ">="]
+
+
+def generate_program(lines=10000, variables=50, seed=0):
+    """
+    Build a program of roughly `lines` source lines.
+
+    The same arguments always produce the same text.
+    """
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(variables)]
+    out = [f"int {name} = {rng.randint(0, 99)};" for name in names]
+
+    def expr():
+        parts = [rng.choice(names)]
+        for _ in range(rng.randint(1, 4)):
+            parts.append(rng.choice(OPERATORS))
+            parts.append(str(rng.randint(1, 999)) if rng.random() < 0.4 else rng.choice(names))
+        return " ".join(parts)
+
+    while len(out) < lines:
+        roll = rng.random()
+        target = rng.choice(names)
+        if roll < 0.6:
+            out.append(f"{target} = {expr()};")
+        elif roll < 0.75:
+            out.append(f"print({expr()});  // checkpoint")
+        elif roll < 0.9:
+            out.append(f"if ({target} {rng.choice(COMPARISONS)} {rng.randint(0, 99)}) {{")
+            out.append(f"    {target} = {expr()};")
+            out.append("} else {")
+            out.append(f"    print({target});")
+            out.append("}")
+        else:
+            out.append(f"while ({target} > 100) {{")
+            out.append(f"    {target} = {target} - 7;")
+            out.append("}")
+
+    return "\n".join(out) + "\n"
+
+
+# --------------------------
+# Program Shapes
+# --------------------------
+
+# Each shape stresses one dimension of the pipeline. All of them only
+# divide by non-zero literals and every loop counts down to zero, so the
+# programs are also safe to run.
+
+def _declarations(names, rng):
+    return [f"int {name} = {rng.randint(1, 99)};" for name in names]
+
+
+def _expression(rng, names, terms):
+    parts = [rng.choice(names)]
+    for _ in range(terms):
+        operator = rng.choice(OPERATORS)
+        parts.append(operator)
+        if operator in ("/", "%") or rng.random() < 0.4:
+            parts.append(str(rng.randint(1, 999)))
+        else:
+            parts.append(rng.choice(names))
+    return " ".join(parts)
+
+
+def nested_program(lines=10000, depth=50, seed=0):
+    """Towers of if/while blocks nested `depth` levels deep."""
+    rng = random.Random(seed)
+    names = [f"n{i}" for i in range(depth)]
+    out = _declarations(names, rng)
+
+    while len(out) < lines:
+        for level, name in enumerate(names):
+            indent = "    " * level
+            if level % 2:
+                out.append(f"{indent}while ({name} > 0) {{")
+            else:
+                out.append(f"{indent}if ({name} {rng.choice(COMPARISONS)} {rng.randint(0, 99)}) {{")
+            out.append(f"{indent}    {name} = {name} - 1;")
+        for level in reversed(range(depth)):
+            out.append("    " * level + "}")
+
+    return "\n".join(out) + "\n"
+
+
+def expression_program(lines=10000, terms=60, seed=0):
+    """Assignments whose right-hand sides are long operator chains."""
+    rng = random.Random(seed)
+    names = [f"e{i}" for i in range(20)]
+    out = _declarations(names, rng)
+
+    while len(out) < lines:
+        expr = _expression(rng, names, terms)
+        # Parenthesise a random sub-range to vary the tree shape
+        tokens = expr.split(" ")
+        start = 2 * rng.randrange(terms // 2)
+        end = start + 2 * rng.randint(1, max(1, terms // 4))
+        if end < len(tokens):
+            tokens[start] = "(" + tokens[start]
+            tokens[end] += ")"
+        out.append(f"{rng.choice(names)} = {' '.join(tokens)};")
+
+    return "\n".join(out) + "\n"
+
+
+def declaration_program(lines=10000, seed=0):
+    """Nearly all declarations, with a few statements using them."""
+    rng = random.Random(seed)
+    count = max(1, lines - lines // 20)
+    names = [f"d{i}" for i in range(count)]
+    out = _declarations(names, rng)
+
+    while len(out) < lines:
+        out.append(f"{rng.choice(names)} = {_expression(rng, names, 2)};")
+
+    return "\n".join(out) + "\n"
+
+
+def loop_program(lines=10000, body=20, seed=0):
+    """Counted loops with large bodies and an inner loop."""
+    rng = random.Random(seed)
+    names = [f"l{i}" for i in range(10)]
+    out = ["int i;", "int j;", *_declarations(names, rng)]
+
+    while len(out) < lines:
+        out.append(f"i = {rng.randint(10, 100)};")
+        out.append("while (i > 0) {")
+        for _ in range(body):
+            out.append(f"    {rng.choice(names)} = {_expression(rng, names, 3)};")
+        out.append(f"    j = {rng.randint(1, 10)};")
+        out.append("    while (j > 0) {")
+        out.append(f"        print({_expression(rng, names, 2)});")
+        out.append("        j = j - 1;")
+        out.append("    }")
+        out.append("    i = i - 1;")
+        out.append("}")
+
+    return "\n".join(out) + "\n"
+
+
+def common_program(lines=10000, pool=8, seed=0):
+    """
+    Loops whose bodies combine the same few subexpressions over and
+    over, such as `a * b + a * b`.
+    """
+    rng = random.Random(seed)
+    names = [f"c{i}" for i in range(6)]
+    results = [f"r{i}" for i in range(4)]
+    out = ["int i;", *_declarations(names + results, rng)]
+    subexpressions = []
+    for _ in range(pool):
+        operator = rng.choice(OPERATORS)
+        right = str(rng.randint(1, 9)) if operator in ("/", "%") else rng.choice(names)
+        subexpressions.append(f"({rng.choice(names)} {operator} {right})")
+
+    while len(out) < lines:
+        out.append(f"i = {rng.randint(10, 50)};")
+        out.append("while (i > 0) {")
+        for _ in range(10):
+            terms = [rng.choice(subexpressions) for _ in range(rng.randint(2, 4))]
+            out.append(f"    {rng.choice(results)} = {' + '.join(terms)};")
+        out.append(f"    print({' - '.join(rng.sample(results, 2))});")
+        out.append("    i = i - 1;")
+        out.append("}")
+
+    return "\n".join(out) + "\n"
+
+
+SHAPES = {
+    "mixed": generate_program,
+    "nested": nested_program,
+    "expressions": expression_program,
+    "declarations": declaration_program,
+    "loops": loop_program,
+    "common": common_program,
+}
+
+
+def generate(shape="mixed", lines=10000, seed=0, **options):
+    """
+    Build a program of the given shape; `options` are passed through to
+    the shape's generator (e.g. depth=, terms=, body=).
+    """
+    if shape not in SHAPES:
+        raise Exception(f"Unknown program shape '{shape}', expected one of {', '.join(SHAPES)}")
+    return SHAPES[shape](lines=lines, seed=seed, **options)
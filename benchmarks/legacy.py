@@ -0,0 +1,437 @@
+"""
+legacy.py
+
+Reference implementations of pipeline stages as they were before their
+performance rewrites. They are kept only so that benchmarks can compare
+the current engines against a fixed baseline; nothing else imports them.
+"""
+
+from lexer.token import Token, TokenType
+from myparser.ast_nodes import BinaryOp, Number, Identifier
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, Instr, Op
+
+
+# ==============================
+# Per-character lexer
+# ==============================
+
+class LegacyLexer:
+    def __init__(self, text):
+        self.text = text
+        self.position = 0
+        self.current_char = self.text[self.position] if self.text else None
+        self.line = 1
+
+        self.keywords = {
+            "int": TokenType.INT,
+            "if": TokenType.IF,
+            "else": TokenType.ELSE,
+            "while": TokenType.WHILE,
+            "print": TokenType.PRINT,
+        }
+
+    # --------------------------
+    # Utility Methods
+    # --------------------------
+
+    def advance(self):
+        self.position += 1
+        if self.position < len(self.text):
+            self.current_char = self.text[self.position]
+        else:
+            self.current_char = None
+
+    def peek(self):
+        peek_pos = self.position + 1
+        if peek_pos < len(self.text):
+            return self.text[peek_pos]
+        return None
+
+    def skip_whitespace(self):
+        while self.current_char is not None and self.current_char.isspace():
+            if self.current_char == "\n":
+                self.line += 1
+            self.advance()
+
+    def skip_comment(self):
+        # Handles // single-line comments
+        while self.current_char is not None and self.current_char != "\n":
+            self.advance()
+
+    # --------------------------
+    # Token Generators
+    # --------------------------
+
+    def number(self):
+        result = ""
+        while self.current_char is not None and self.current_char.isdigit():
+            result += self.current_char
+            self.advance()
+        return Token(TokenType.NUMBER, int(result), self.line)
+
+    def identifier(self):
+        result = ""
+        while (
+            self.current_char is not None
+            and (self.current_char.isalnum() or self.current_char == "_")
+        ):
+            result += self.current_char
+            self.advance()
+
+        token_type = self.keywords.get(result, TokenType.IDENTIFIER)
+        return Token(token_type, result, self.line)
+
+    # --------------------------
+    # Main Tokenizer
+    # --------------------------
+
+    def tokenize(self):
+        tokens = []
+
+        while self.current_char is not None:
+
+            # Skip whitespace
+            if self.current_char.isspace():
+                self.skip_whitespace()
+                continue
+
+            # Skip comments
+            if self.current_char == "/" and self.peek() == "/":
+                self.advance()
+                self.advance()
+                self.skip_comment()
+                continue
+
+            # Numbers
+            if self.current_char.isdigit():
+                tokens.append(self.number())
+                continue
+
+            # Identifiers / Keywords
+            if self.current_char.isalpha() or self.current_char == "_":
+                tokens.append(self.identifier())
+                continue
+
+            # Operators
+            if self.current_char == "+":
+                tokens.append(Token(TokenType.PLUS, "+", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "-":
+                tokens.append(Token(TokenType.MINUS, "-", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "*":
+                tokens.append(Token(TokenType.MULTIPLY, "*", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "/":
+                tokens.append(Token(TokenType.DIVIDE, "/", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "=":
+                if self.peek() == "=":
+                    self.advance()
+                    self.advance()
+                    tokens.append(Token(TokenType.EQUAL, "==", self.line))
+                else:
+                    tokens.append(Token(TokenType.ASSIGN, "=", self.line))
+                    self.advance()
+                continue
+
+            if self.current_char == "!":
+                if self.peek() == "=":
+                    self.advance()
+                    self.advance()
+                    tokens.append(Token(TokenType.NOT_EQUAL, "!=", self.line))
+                    continue
+                else:
+                    raise Exception(f"Unexpected character '!' at line {self.line}")
+
+            if self.current_char == "<":
+                if self.peek() == "=":
+                    self.advance()
+                    self.advance()
+                    tokens.append(Token(TokenType.LESS_EQUAL, "<=", self.line))
+                else:
+                    tokens.append(Token(TokenType.LESS, "<", self.line))
+                    self.advance()
+                continue
+
+            if self.current_char == ">":
+                if self.peek() == "=":
+                    self.advance()
+                    self.advance()
+                    tokens.append(Token(TokenType.GREATER_EQUAL, ">=", self.line))
+                else:
+                    tokens.append(Token(TokenType.GREATER, ">", self.line))
+                    self.advance()
+                continue
+
+            # Symbols
+            if self.current_char == ";":
+                tokens.append(Token(TokenType.SEMICOLON, ";", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "(":
+                tokens.append(Token(TokenType.LPAREN, "(", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == ")":
+                tokens.append(Token(TokenType.RPAREN, ")", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "{":
+                tokens.append(Token(TokenType.LBRACE, "{", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == "}":
+                tokens.append(Token(TokenType.RBRACE, "}", self.line))
+                self.advance()
+                continue
+
+            if self.current_char == '%':
+                tokens.append(Token(TokenType.MOD, '%', self.line))
+                self.advance()
+                continue
+
+            # Unknown character
+            raise Exception(f"Illegal character '{self.current_char}' at line {self.line}")
+
+        tokens.append(Token(TokenType.EOF, line=self.line))
+        return tokens
+
+
+# ==============================
+# Dict-backed token
+# ==============================
+
+class LegacyToken:
+    def __init__(self, token_type, value=None, line=1):
+        self.type = token_type
+        self.value = value
+        self.line = line
+
+
+# ==============================
+# Recursive-descent expressions
+# ==============================
+
+class RecursiveDescentParser(Parser):
+    """
+    Parser with one method per precedence level:
+    equality -> relational -> additive -> multiplicative -> factor
+    """
+
+    def expression(self):
+        return self.equality()
+
+    def equality(self):
+        node = self.relational()
+        while self.current_token.type in (TokenType.EQUAL, TokenType.NOT_EQUAL):
+            operator = self.current_token.value
+            if self.current_token.type == TokenType.EQUAL:
+                self.eat(TokenType.EQUAL)
+            else:
+                self.eat(TokenType.NOT_EQUAL)
+            node = self.spans.extend(BinaryOp(node, operator, self.relational()), node, self.last_end)
+        return node
+
+    def relational(self):
+        node = self.additive()
+        while self.current_token.type in (
+            TokenType.GREATER,
+            TokenType.GREATER_EQUAL,
+            TokenType.LESS,
+            TokenType.LESS_EQUAL,
+        ):
+            operator = self.current_token.value
+            if self.current_token.type == TokenType.GREATER:
+                self.eat(TokenType.GREATER)
+            elif self.current_token.type == TokenType.GREATER_EQUAL:
+                self.eat(TokenType.GREATER_EQUAL)
+            elif self.current_token.type == TokenType.LESS:
+                self.eat(TokenType.LESS)
+            else:
+                self.eat(TokenType.LESS_EQUAL)
+            node = self.spans.extend(BinaryOp(node, operator, self.additive()), node, self.last_end)
+        return node
+
+    def additive(self):
+        node = self.term()
+        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
+            operator = self.current_token.value
+            if self.current_token.type == TokenType.PLUS:
+                self.eat(TokenType.PLUS)
+            else:
+                self.eat(TokenType.MINUS)
+            node = self.spans.extend(BinaryOp(node, operator, self.term()), node, self.last_end)
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MOD):
+            operator = self.current_token.value
+            if self.current_token.type == TokenType.MULTIPLY:
+                self.eat(TokenType.MULTIPLY)
+            elif self.current_token.type == TokenType.DIVIDE:
+                self.eat(TokenType.DIVIDE)
+            else:
+                self.eat(TokenType.MOD)
+            node = self.spans.extend(BinaryOp(node, operator, self.factor()), node, self.last_end)
+        return node
+
+    def factor(self):
+        token = self.current_token
+
+        if token.type == TokenType.NUMBER:
+            start = self.mark()
+            value = token.value
+            self.eat(TokenType.NUMBER)
+            return self.finish(Number(value), start)
+        elif token.type == TokenType.IDENTIFIER:
+            start = self.mark()
+            name = token.value
+            self.eat(TokenType.IDENTIFIER)
+            return self.finish(Identifier(name), start)
+        elif token.type == TokenType.LPAREN:
+            self.eat(TokenType.LPAREN)
+            node = self.expression()
+            self.eat(TokenType.RPAREN)
+            return node
+        else:
+            raise Exception(f"Invalid expression at token {token}")
+
+
+# ==============================
+# Recursive passes
+# ==============================
+
+class RecursiveSemanticAnalyzer(SemanticAnalyzer):
+    """SemanticAnalyzer visiting children by recursive calls."""
+
+    def visit_Program(self, node):
+        for decl in node.declarations:
+            self.visit(decl)
+        for stmt in node.statements:
+            self.visit(stmt)
+
+    def visit_Declaration(self, node):
+        if node.initializer:
+            self.visit(node.initializer)
+        self.symbol_table.declare(node.var_name, "int")
+
+    def visit_Assignment(self, node):
+        self.symbol_table.lookup(node.var_name)
+        self.visit(node.expression)
+
+    def visit_PrintStatement(self, node):
+        self.visit(node.expression)
+
+    def visit_IfStatement(self, node):
+        self.visit(node.condition)
+        self.visit(node.true_block)
+        if node.false_block:
+            self.visit(node.false_block)
+
+    def visit_WhileStatement(self, node):
+        self.visit(node.condition)
+        self.visit(node.body)
+
+    def visit_Block(self, node):
+        self.symbol_table.enter_scope()
+        for stmt in node.statements:
+            self.visit(stmt)
+        self.symbol_table.exit_scope()
+
+    def visit_BinaryOp(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+
+class RecursiveTACGenerator(TACGenerator):
+    """TACGenerator generating children by recursive calls."""
+
+    def gen_Program(self, node):
+        for decl in node.declarations:
+            self.generate(decl)
+        for stmt in node.statements:
+            self.generate(stmt)
+        return self.code
+
+    def gen_Declaration(self, node):
+        if node.initializer is not None:
+            self.emit(Instr(Op.COPY, self.symbol_for(node, node.var_name), self.generate(node.initializer)))
+
+    def gen_Assignment(self, node):
+        value = self.generate(node.expression)
+        self.emit(Instr(Op.COPY, self.symbol_for(node, node.var_name), value))
+
+    def gen_PrintStatement(self, node):
+        value = self.generate(node.expression)
+        self.emit(Instr(Op.PRINT, left=value))
+
+    def gen_IfStatement(self, node):
+        condition = self.generate(node.condition)
+        label_else = self.new_label()
+        label_end = self.new_label()
+        self.emit(Instr(Op.IF_FALSE, left=condition, label=label_else))
+        self.generate(node.true_block)
+        self.emit(Instr(Op.GOTO, label=label_end))
+        self.emit(Instr(Op.LABEL, label=label_else))
+        if node.false_block:
+            self.generate(node.false_block)
+        self.emit(Instr(Op.LABEL, label=label_end))
+
+    def gen_WhileStatement(self, node):
+        label_start = self.new_label()
+        label_end = self.new_label()
+        self.emit(Instr(Op.LABEL, label=label_start))
+        condition = self.generate(node.condition)
+        self.emit(Instr(Op.IF_FALSE, left=condition, label=label_end))
+        self.generate(node.body)
+        self.emit(Instr(Op.GOTO, label=label_start))
+        self.emit(Instr(Op.LABEL, label=label_end))
+
+    def gen_Block(self, node):
+        for stmt in node.statements:
+            self.generate(stmt)
+
+    def gen_BinaryOp(self, node):
+        left = self.generate(node.left)
+        right = self.generate(node.right)
+        temp = self.new_temp()
+        self.emit(Instr(Op.BINARY, temp, left, node.operator, right))
+        return temp
+
+
+# ==============================
+# Per-call getattr dispatch
+# ==============================
+
+class GetattrSemanticAnalyzer(RecursiveSemanticAnalyzer):
+    """SemanticAnalyzer dispatching through an f-string and getattr per node."""
+
+    def visit(self, node):
+        method_name = f"visit_{type(node).__name__}"
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node)
+
+
+class GetattrTACGenerator(RecursiveTACGenerator):
+    """TACGenerator dispatching through an f-string and getattr per node."""
+
+    def generate(self, node):
+        method_name = f"gen_{type(node).__name__}"
+        method = getattr(self, method_name, self.generic_gen)
+        return method(node)
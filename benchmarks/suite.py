@@ -0,0 +1,195 @@
+"""
+suite.py
+
+Runs each program shape through the pipeline, times every stage and the
+whole compilation, and compares the results with a stored baseline.
+Exits with status 1 if any timing regressed past the threshold.
+
+Run with: python -m benchmarks.suite [--quick] [--update-baseline]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from statistics import median
+
+from driver.instrumentation import Instrumentation
+from driver.pipeline import compile_source
+from benchmarks.generator import generate
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Slower than baseline by more than this factor counts as a regression.
+# Runs of the same tree on a shared host drift by up to 1.3x or so.
+DEFAULT_THRESHOLD = 1.5
+
+# Timings below this are too noisy to judge
+MIN_SECONDS = 0.1
+
+# Runs per case; each timing is the median over them
+DEFAULT_REPEATS = 9
+
+# (shape, lines, generator options)
+CASES = [
+    ("mixed", 20000, {}),
+    ("nested", 20000, {"depth": 50}),
+    ("expressions", 1000, {"terms": 60}),
+    ("declarations", 20000, {}),
+    ("loops", 20000, {}),
+]
+
+
+def calibrate(repeats=DEFAULT_REPEATS):
+    """
+    Time a fixed pure-Python workload, so that baselines recorded on a
+    faster or slower machine can be scaled before comparing.
+    """
+    def workload():
+        table = {}
+        total = 0
+        for i in range(200000):
+            table[i & 1023] = i
+            total += table.get((i * 7) & 1023, 0)
+        return total
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        workload()
+        times.append(time.perf_counter() - start)
+    return median(times)
+
+
+def measure(source, repeats):
+    """Median time of each stage and of the whole pipeline over `repeats` runs."""
+    stages = {}
+    totals = []
+    for _ in range(repeats):
+        # Start each run without garbage left over from the last one
+        gc.collect()
+        instrumentation = Instrumentation()
+        start = time.perf_counter()
+        result = compile_source(source, instrumentation=instrumentation)
+        totals.append(time.perf_counter() - start)
+        if not result.ok:
+            raise Exception(f"Benchmark program failed to compile: {result.error}")
+        for stats in instrumentation.stages:
+            stages.setdefault(stats.name, []).append(stats.seconds)
+    return {
+        "stages": {name: median(times) for name, times in stages.items()},
+        "total": median(totals),
+    }
+
+
+def run(quick=False, repeats=DEFAULT_REPEATS, seed=0):
+    calibration = calibrate()
+    cases = {}
+    for shape, lines, options in CASES:
+        if quick:
+            lines = max(100, lines // 10)
+        source = generate(shape, lines, seed, **options)
+        cases[f"{shape}:{lines}"] = measure(source, repeats)
+    return {
+        "python": platform.python_version(),
+        # Calibrate on both sides of the cases to smooth out load changes
+        "calibration": min(calibration, calibrate()),
+        "cases": cases,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns (rows, regressions). Baseline times are scaled by the ratio
+    of the two calibration runs before computing current / baseline.
+    """
+    scale = current["calibration"] / baseline["calibration"]
+    rows = []
+    regressions = []
+
+    for case, timings in current["cases"].items():
+        expected = baseline["cases"].get(case)
+        if expected is None:
+            rows.append((case, "total", None, timings["total"], None, "no baseline"))
+            continue
+        pairs = [(stage, expected["stages"].get(stage), seconds) for stage, seconds in timings["stages"].items()]
+        pairs.append(("total", expected["total"], timings["total"]))
+        for stage, before, after in pairs:
+            if before is None:
+                continue
+            before *= scale
+            ratio = after / before
+            flag = ""
+            if ratio > threshold and max(before, after) >= MIN_SECONDS:
+                flag = "REGRESSION"
+                regressions.append((case, stage, ratio))
+            elif ratio < 1 / threshold and max(before, after) >= MIN_SECONDS:
+                flag = "faster"
+            rows.append((case, stage, before, after, ratio, flag))
+
+    return rows, regressions
+
+
+def format_rows(rows):
+    lines = [f"{'case':<20}{'stage':<10}{'baseline':>11}{'current':>11}{'ratio':>8}"]
+    for case, stage, before, after, ratio, flag in rows:
+        before = "-" if before is None else f"{before * 1000:.1f}ms"
+        ratio = "-" if ratio is None else f"{ratio:.2f}"
+        lines.append(f"{case:<20}{stage:<10}{before:>11}{after * 1000:>9.1f}ms{ratio:>8}  {flag}".rstrip())
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run the pipeline benchmark suite.")
+    arg_parser.add_argument("--quick", action="store_true", help="programs a tenth of the normal size")
+    arg_parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    arg_parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    current = run(args.quick, args.repeats)
+    if args.json:
+        print(json.dumps(current))
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        # Keep entries for the other size, so quick and full runs share a file
+        if baseline is not None:
+            scale = current["calibration"] / baseline["calibration"]
+            for case, timings in baseline["cases"].items():
+                if case not in current["cases"]:
+                    current["cases"][case] = {
+                        "stages": {stage: seconds * scale for stage, seconds in timings["stages"].items()},
+                        "total": timings["total"] * scale,
+                    }
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+
+    rows, regressions = compare(current, baseline, args.threshold)
+    print(format_rows(rows))
+    if regressions:
+        print(f"\n{len(regressions)} timing(s) regressed by more than {args.threshold:.2f}x")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Compiler driver package
+
+Exposes:
+- CompilationCache
+- compile_batch, collect_sources
+- compile_source, CompilationResult
+- Instrumentation, StageStats
+"""
+
+from .cache import CompilationCache, COMPILER_VERSION
+from .batch import BatchReport, FileResult, collect_sources, compile_batch
+from .pipeline import CompilationResult, compile_source
+from .instrumentation import Instrumentation, StageStats
+
+__all__ = [
+    "CompilationCache", "COMPILER_VERSION", "BatchReport", "FileResult", "collect_sources", "compile_batch",
+    "CompilationResult", "compile_source", "Instrumentation", "StageStats",
+]
@@ -0,0 +1,218 @@
+# driver/batch.py
+
+import glob
+import heapq
+import os
+import pathlib
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import CompilationCache
+from .pipeline import compile_source, format_text, format_json
+from .instrumentation import Instrumentation, merge_stats
+
+
+SOURCE_SUFFIX = ".tc"
+
+# Outcome of compiling one file. `errors` is a list of messages; `tac`
+# is None when there are any. `output` is the file's rendered dump, when
+# an output format was requested, and `stats` the Instrumentation.to_dict()
+# of the file when stats were requested.
+FileResult = namedtuple("FileResult", "path tac errors lines cached output stats")
+
+
+class BatchReport:
+    """Results of a batch compilation, in the order the files were given."""
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.errors]
+
+    @property
+    def lines(self):
+        return sum(result.lines for result in self.results)
+
+    @property
+    def cache_hits(self):
+        return sum(result.cached for result in self.results)
+
+    @property
+    def stats(self):
+        """Per-stage stats summed over every file, or None if not collected."""
+        collected = [result.stats for result in self.results if result.stats is not None]
+        return merge_stats(collected) if collected else None
+
+    def summary(self):
+        files = len(self.results)
+        elapsed = self.elapsed or 1e-9
+        return (
+            f"Compiled {files} file(s), {len(self.failed)} failed, in {self.elapsed:.3f}s: "
+            f"{files / elapsed:.1f} files/sec, {self.lines / elapsed:.0f} lines/sec"
+        )
+
+
+# ---------------------------
+# Source Discovery
+# ---------------------------
+
+def collect_sources(patterns):
+    """
+    Expand files, directories (searched recursively for .tc files) and
+    glob patterns into a list of paths, without duplicates. Directory
+    and glob matches are sorted so the order never depends on the
+    file system.
+    """
+    paths = []
+    seen = set()
+
+    def add(path):
+        key = os.path.normpath(path)
+        if key not in seen:
+            seen.add(key)
+            paths.append(path)
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(SOURCE_SUFFIX):
+                        add(os.path.join(root, name))
+        elif os.path.exists(pattern):
+            add(pattern)
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise Exception(f"No source files match '{pattern}'")
+            for path in matches:
+                if os.path.isfile(path):
+                    add(path)
+
+    return paths
+
+
+# ---------------------------
+# Workers
+# ---------------------------
+
+# Per-process settings, set once by each worker
+_worker_cache = None
+_worker_emit = ("tac",)
+_worker_format = None
+_worker_stats = None
+_worker_optimize = False
+
+
+def _init_worker(cache_dir, emit=("tac",), output_format=None, stats=None, optimize=False):
+    global _worker_cache, _worker_emit, _worker_format, _worker_stats, _worker_optimize
+    _worker_cache = None if cache_dir is None else CompilationCache(cache_dir)
+    _worker_emit = emit
+    _worker_format = output_format
+    # None, "time", or "memory" to also trace allocations
+    _worker_stats = stats
+    _worker_optimize = optimize
+
+
+def compile_path(path):
+    """
+    Run the full pipeline on one file. Rendering, if any, happens here
+    too, so that it is spread across the workers.
+    """
+    instrumentation = None if _worker_stats is None else Instrumentation(trace_memory=_worker_stats == "memory")
+    try:
+        result = compile_source(pathlib.Path(path), _worker_emit, _worker_cache, instrumentation, _worker_optimize)
+    except (OSError, ValueError) as error:
+        # Reported as this file's error rather than stopping the batch
+        return FileResult(path, None, [str(error)], 0, False, None, None)
+
+    if result.diagnostics:
+        errors = [str(diagnostic) for diagnostic in result.diagnostics]
+    else:
+        errors = [] if result.ok else [result.error]
+
+    stats = None if instrumentation is None else instrumentation.to_dict()
+    if _worker_format == "json":
+        output = format_json(result, path=path)
+    elif _worker_format == "text":
+        # Text output only shows the batch totals
+        result.stats = None
+        output = format_text(result)
+    else:
+        output = None
+    return FileResult(path, result.tac, errors, result.lines, result.cached, output, stats)
+
+
+def _compile_chunk(paths):
+    return [compile_path(path) for path in paths]
+
+
+# ---------------------------
+# Scheduling
+# ---------------------------
+
+def schedule(paths, workers, chunks_per_worker=4):
+    """
+    Split `paths` into chunks of about equal total size. Files are dealt
+    largest first, each to the chunk with the least work so far, so the
+    large files are spread over the chunks rather than sharing one, and
+    chunks are returned heaviest first so the longest jobs start early.
+    Returns (chunk, original indices) pairs.
+    """
+    sizes = []
+    for index, path in enumerate(paths):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        sizes.append((-size, index))
+    sizes.sort()
+
+    count = min(len(paths), workers * chunks_per_worker)
+    loads = [(0, chunk) for chunk in range(count)]
+    members = [[] for _ in range(count)]
+    for size, index in sizes:
+        load, chunk = heapq.heappop(loads)
+        members[chunk].append(index)
+        # Every file costs something, even an empty one
+        heapq.heappush(loads, (load - size + 1, chunk))
+
+    order = sorted(loads, key=lambda load: -load[0])
+    return [([paths[index] for index in members[chunk]], members[chunk]) for _, chunk in order]
+
+
+def compile_batch(patterns, jobs=None, cache_dir=None, emit=("tac",), output_format=None, stats=None, optimize=False):
+    """
+    Compile every source matched by `patterns` across a process pool and
+    return a BatchReport. Files are scheduled largest first, but results
+    always come back in the order collect_sources gives them.
+
+    With an `output_format` ("text" or "json"), each result also carries
+    its rendered dump of the `emit` stages. `stats` is "time" or
+    "memory" to instrument every file; see BatchReport.stats. With
+    `optimize`, every file is compiled as by compile_source(optimize=True).
+    """
+    start = time.perf_counter()
+    paths = collect_sources(patterns)
+    workers = jobs or os.cpu_count() or 1
+    results = [None] * len(paths)
+
+    if workers == 1 or len(paths) <= 1:
+        _init_worker(cache_dir, emit, output_format, stats, optimize)
+        try:
+            results = _compile_chunk(paths)
+        finally:
+            _init_worker(None)
+    else:
+        chunks = schedule(paths, workers)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(cache_dir, emit, output_format, stats, optimize)) as executor:
+            futures = [(executor.submit(_compile_chunk, chunk), indices) for chunk, indices in chunks]
+            for future, indices in futures:
+                for index, result in zip(indices, future.result()):
+                    results[index] = result
+
+    return BatchReport(results, time.perf_counter() - start)
@@ -0,0 +1,207 @@
+# driver/cache.py
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+# Bump whenever the TAC for an unchanged source may differ
+COMPILER_VERSION = "1.0"
+
+DEFAULT_CACHE_DIR = ".tc_cache"
+DEFAULT_MAX_BYTES = 64 << 20
+
+# Packages whose code determines the compiled output
+_COMPILER_PACKAGES = ("lexer", "myparser", "semantic", "intermediate", "optimizer")
+
+_fingerprint = None
+
+
+def compiler_fingerprint():
+    """
+    Hash of COMPILER_VERSION and the compiler's own sources, so that
+    editing the compiler invalidates the cache even without a version bump.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256(COMPILER_VERSION.encode())
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for package in _COMPILER_PACKAGES:
+            directory = os.path.join(root, package)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    with open(os.path.join(directory, name), "rb") as f:
+                        digest.update(name.encode())
+                        digest.update(f.read())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+class CompilationCache:
+    """
+    On-disk cache of compiled TAC, and optionally pickled ASTs, keyed by
+    a hash of the source text and the compiler fingerprint.
+
+    Compiler options that change the output, such as optimization, are
+    passed as a `variant` string so that each combination gets its own
+    entries.
+
+    Entries live in `directory` as <key>.tac and <key>.ast files. Reading
+    an entry refreshes its modification time, and once the directory
+    grows past `max_bytes` the least recently used entries are removed.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, store_ast=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.store_ast = store_ast
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Total size of the directory, read on the first store
+        self.size = None
+
+    def key(self, source, variant=""):
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        digest = hashlib.sha256(compiler_fingerprint().encode())
+        digest.update(b"\0")
+        digest.update(variant.encode())
+        digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+
+    def load(self, source, variant="", with_ast=False):
+        """
+        Return the cached TAC lines for `source`, or None on a miss. With
+        `with_ast`, return (lines, ast) instead; an entry stored without
+        its AST is then a miss.
+        """
+        ast = None
+        if with_ast:
+            ast = self.load_ast(source, variant)
+            if ast is None:
+                self.misses += 1
+                return None
+
+        path = self.path(self.key(source, variant), ".tac")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        lines = text.split("\n") if text else []
+        return (lines, ast) if with_ast else lines
+
+    def load_ast(self, source, variant=""):
+        """
+        Return the cached AST for `source`, or None if none was stored.
+        """
+        path = self.path(self.key(source, variant), ".ast")
+        try:
+            with open(path, "rb") as f:
+                ast = pickle.load(f)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return ast
+
+    # ---------------------------
+    # Storage
+    # ---------------------------
+
+    def store(self, source, tac_code, ast=None, variant=""):
+        key = self.key(source, variant)
+        os.makedirs(self.directory, exist_ok=True)
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self._entries())
+
+        self._write(self.path(key, ".tac"), "\n".join(map(str, tac_code)).encode("utf-8"))
+
+        if self.store_ast and ast is not None:
+            # Very deep trees cannot be pickled recursively; keep the TAC
+            try:
+                data = pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)
+            except RecursionError:
+                data = None
+            if data is not None:
+                self._write(self.path(key, ".ast"), data)
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def _write(self, path, data):
+        # Write to a temporary file first so readers, including other
+        # processes sharing the directory, never see a partial entry
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        self.size += len(data) - old_size
+
+    def _entries(self):
+        try:
+            scan = list(os.scandir(self.directory))
+        except OSError:
+            return []
+        entries = []
+        for entry in scan:
+            if entry.name.endswith((".tac", ".ast")):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is at most
+        three quarters of `max_bytes`, leaving room before the next eviction.
+        """
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 3 // 4
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= entry_size
+            if path.endswith(".tac"):
+                self.evictions += 1
+        self.size = size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self.size = 0
+
+    def __repr__(self):
+        return f"CompilationCache({self.directory!r}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
@@ -0,0 +1,140 @@
+# driver/instrumentation.py
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Pipeline stages in the order they run
+PIPELINE_STAGES = ("lex", "parse", "semantic", "tac", "optimize")
+
+
+class StageStats:
+    """Measurements for one run of one pipeline stage."""
+
+    __slots__ = ("name", "seconds", "peak_bytes", "counts")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        # Peak traced allocation during the stage, None unless tracing
+        self.peak_bytes = None
+        self.counts = {}
+
+    def to_dict(self):
+        return {"stage": self.name, "seconds": self.seconds, "peak_bytes": self.peak_bytes, **self.counts}
+
+    def __repr__(self):
+        return f"StageStats({self.name}, {self.seconds:.6f}s, peak={self.peak_bytes}, {self.counts})"
+
+
+class Instrumentation:
+    """
+    Collects a StageStats for every stage compile_source runs.
+
+    Hooks are called with each StageStats as its stage finishes. With
+    `trace_memory`, stages run under tracemalloc, which slows them down
+    several times, so their times are not comparable with untraced runs.
+    With `profile_stage`, that stage runs under cProfile and the profile
+    is written to `profile_path`.
+    """
+
+    def __init__(self, trace_memory=False, profile_stage=None, profile_path=None, hooks=()):
+        if profile_stage is not None and profile_stage not in PIPELINE_STAGES:
+            raise Exception(f"Unknown stage '{profile_stage}', expected one of {', '.join(PIPELINE_STAGES)}")
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path or f"{profile_stage}.prof"
+        self.hooks = list(hooks)
+        self.stages = []
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name):
+        stats = StageStats(name)
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        profiler = None
+        if name == self.profile_stage:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.profile_path)
+            if self.trace_memory:
+                stats.peak_bytes = tracemalloc.get_traced_memory()[1] - baseline
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.stages.append(stats)
+            for hook in self.hooks:
+                hook(stats)
+
+    # ---------------------------
+    # Reporting
+    # ---------------------------
+
+    @property
+    def total_seconds(self):
+        return sum(stats.seconds for stats in self.stages)
+
+    def to_dict(self):
+        return {"stages": [stats.to_dict() for stats in self.stages], "total_seconds": self.total_seconds}
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def format_table(self):
+        return format_stats(self.to_dict())
+
+
+def format_stats(data):
+    """Render a to_dict() result as an aligned table, one stage per row."""
+    rows = []
+    for entry in data["stages"]:
+        peak = entry.get("peak_bytes")
+        peak = "" if peak is None else f"{peak / 1024:.1f} KiB"
+        counts = ", ".join(
+            f"{key}={value}" for key, value in entry.items() if key not in ("stage", "seconds", "peak_bytes")
+        )
+        rows.append(f"{entry['stage']:<9}{entry['seconds'] * 1000:10.3f} ms {peak:>14}  {counts}".rstrip())
+    rows.append(f"{'total':<9}{data['total_seconds'] * 1000:10.3f} ms")
+    return "\n".join(rows)
+
+
+def merge_stats(dicts):
+    """
+    Combine to_dict() results from many files: times and counts add up,
+    peaks (`peak_bytes` and `max_*` counts) take the maximum.
+    """
+    stages = {}
+    for data in dicts:
+        for entry in data["stages"]:
+            merged = stages.setdefault(entry["stage"], {"stage": entry["stage"], "seconds": 0.0, "peak_bytes": None})
+            for key, value in entry.items():
+                if key == "stage" or value is None:
+                    continue
+                if key == "peak_bytes" or key.startswith("max_"):
+                    merged[key] = max(merged.get(key) or 0, value)
+                else:
+                    merged[key] = merged.get(key, 0) + value
+    ordered = sorted(stages.values(), key=lambda entry: PIPELINE_STAGES.index(entry["stage"]))
+    return {"stages": ordered, "total_seconds": sum(entry["seconds"] for entry in ordered)}
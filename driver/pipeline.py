@@ -0,0 +1,308 @@
+# driver/pipeline.py
+
+import argparse
+import json
+import os
+from contextlib import nullcontext
+
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, format_code
+from optimizer import optimize as optimize_code
+
+
+# Stages that can be dumped, in output order
+STAGES = ("source", "tokens", "ast", "tac")
+
+# What compile_file has always printed
+DEFAULT_EMIT = ("source", "tokens", "tac")
+
+
+class CompilationResult:
+    """
+    Everything compile_source produced for one source.
+
+    `source` is the text when it was given or emitted, and otherwise
+    whatever compile_source was given. `lines` counts its lines.
+
+    `tokens` and `ast` are only kept when their stage was emitted. `tac`
+    is None if compilation failed, in which case `error` holds the
+    message and, for syntax errors, `diagnostics` the located errors.
+    `code` holds the TAC as Instr records, except on a cache hit, which
+    only has the printed lines.
+    """
+
+    def __init__(self, source, emit):
+        self.source = source
+        self.emit = emit
+        self.lines = 0
+        self.tokens = None
+        self.ast = None
+        self.tac = None
+        self.code = None
+        self.diagnostics = []
+        self.error = None
+        # Furthest stage that completed: None, "lex", "parse", "semantic", "tac"
+        self.stage = None
+        self.cached = False
+        # Instrumentation passed to compile_source, if any
+        self.stats = None
+
+    @property
+    def ok(self):
+        return self.tac is not None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"CompilationResult({status}, stage={self.stage}, cached={self.cached})"
+
+
+def parse_emit(value):
+    """
+    Turn a comma-separated --emit value into a tuple of stages. Raises
+    ArgumentTypeError, so argparse reports a bad value as a usage error.
+    """
+    stages = [stage.strip() for stage in value.split(",") if stage.strip()]
+    for stage in stages:
+        if stage not in STAGES:
+            raise argparse.ArgumentTypeError(f"Unknown stage '{stage}', expected one of {', '.join(STAGES)}")
+    return tuple(stage for stage in STAGES if stage in stages)
+
+
+def count_lines(text):
+    """Lines in a str or bytes-like source, a last line without a newline included."""
+    if isinstance(text, str):
+        return text.count("\n") + (not text.endswith("\n"))
+    # In slices, so that a memory-mapped file is never copied whole
+    step = 1 << 20
+    newlines = sum(bytes(text[at:at + step]).count(b"\n") for at in range(0, len(text), step))
+    return newlines + (text[-1:] != b"\n")
+
+
+def _open_source(source, emit):
+    # The Lexer for `source`, and its text if it is to be emitted. A
+    # path is lexed through a memory map unless its text is needed.
+    if isinstance(source, os.PathLike):
+        if "source" not in emit:
+            return Lexer.from_file(source), source
+        # Undecodable bytes become U+FFFD, as for bytes sources, and are
+        # reported by the lexer if they are outside a comment
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    elif "source" in emit and not isinstance(source, str):
+        return Lexer(source), str(source, "utf-8", "replace")
+    return Lexer(source), source
+
+
+def _unmeasured(name):
+    return nullcontext()
+
+
+def _lex(lexer, result, measure):
+    # The lex stage; also counts the source's lines into `result`
+    text = lexer.text
+    with measure("lex") as stats:
+        try:
+            tokens = lexer.tokenize()
+        except Exception:
+            if isinstance(text, str):
+                raise
+            # Identifiers outside ASCII only lex as text
+            lexer = Lexer(str(text, "utf-8", "replace"))
+            tokens = lexer.tokenize()
+        # The lexer ends on the last line, counted even when empty
+        result.lines = lexer.line - (text[-1:] in ("\n", b"\n"))
+        if stats is not None:
+            stats.counts["tokens"] = len(tokens) - 1
+            stats.counts["lines"] = result.lines
+    return tokens
+
+
+def compile_source(source, emit=("tac",), cache=None, instrumentation=None, optimize=False):
+    """
+    Run the pipeline on `source` and return a CompilationResult. Never
+    raises for errors in the source; check `result.ok`.
+
+    `source` is the text, a bytes-like object (bytes, memoryview, mmap)
+    or an os.PathLike path. Unless the "source" stage is emitted, a path
+    is lexed with Lexer.from_file, so the file is never read into a str.
+    Bytes sources that only lex as text, such as ones with non-ASCII
+    identifiers, are decoded and lexed again.
+
+    With `optimize`, the TAC goes through the optimizer passes before it
+    is formatted, in an extra "optimize" stage.
+
+    Tokens and the AST are only kept when their stage is emitted. A
+    cache hit skips every stage, except that the source is lexed again
+    when tokens are emitted. When the AST is emitted, only an entry
+    stored with its AST (CompilationCache's `store_ast`) is a hit.
+
+    With an Instrumentation, each stage that runs is measured, along
+    with counts of what it produced.
+    """
+    lexer, shown = _open_source(source, emit)
+    text = lexer.text
+    result = CompilationResult(shown, emit)
+    result.stats = instrumentation
+    keep_tokens = "tokens" in emit
+    keep_ast = "ast" in emit
+    measure = _unmeasured if instrumentation is None else instrumentation.stage
+    variant = "O" if optimize else ""
+
+    if cache is not None:
+        entry = cache.load(text, variant, with_ast=keep_ast)
+        if entry is not None:
+            result.tac, result.ast = entry if keep_ast else (entry, None)
+            if keep_tokens:
+                result.tokens = _lex(lexer, result, measure)
+            else:
+                result.lines = count_lines(text)
+            result.stage = "tac"
+            result.cached = True
+            return result
+
+    try:
+        tokens = _lex(lexer, result, measure)
+        result.stage = "lex"
+        if keep_tokens:
+            result.tokens = tokens
+
+        with measure("parse") as stats:
+            parser = Parser(tokens, recover=True)
+            ast = parser.parse()
+            del tokens
+            if stats is not None:
+                # Every node the parser builds gets exactly one span
+                stats.counts["nodes"] = len(parser.spans)
+                stats.counts["errors"] = len(parser.errors)
+        if keep_ast:
+            result.ast = ast
+        if parser.errors:
+            result.diagnostics = parser.errors
+            result.error = f"Parsing failed with {len(parser.errors)} syntax error(s)"
+            return result
+        result.stage = "parse"
+
+        with measure("semantic") as stats:
+            analyzer = SemanticAnalyzer()
+            analyzer.visit(ast)
+            if stats is not None:
+                stats.counts["symbols"] = len(analyzer.symbol_table.symbols)
+        result.stage = "semantic"
+
+        with measure("tac") as stats:
+            generator = TACGenerator(analyzer.symbol_table)
+            code = generator.generate(ast)
+            if not optimize:
+                tac_code = format_code(code)
+            if stats is not None:
+                stats.counts["instructions"] = len(code)
+                stats.counts["temps"] = generator.temp_count
+                stats.counts["labels"] = generator.label_count
+
+        if optimize:
+            with measure("optimize") as stats:
+                code, counts = optimize_code(code)
+                tac_code = format_code(code)
+                if stats is not None:
+                    stats.counts["instructions"] = len(code)
+                    stats.counts.update(counts)
+    except Exception as error:
+        result.error = str(error)
+        if result.stage is None:
+            result.lines = count_lines(text)
+        return result
+
+    result.tac = tac_code
+    result.code = code
+    result.stage = "tac"
+    if cache is not None:
+        cache.store(text, tac_code, ast, variant)
+    return result
+
+
+# ---------------------------
+# Output Formats
+# ---------------------------
+
+def format_text(result, emit=None):
+    """
+    Render the emitted stages as one string. With several stages this is
+    compile_file's traditional layout, section headers included; a single
+    stage is written bare, e.g. just the TAC lines.
+    """
+    emit = result.emit if emit is None else emit
+    headers = len(emit) > 1
+    out = []
+
+    def section(title):
+        if headers:
+            out.append(f"===== {title} =====" if not out else f"\n===== {title} =====")
+
+    if "source" in emit:
+        section("SOURCE CODE")
+        out.append(result.source)
+
+    if "tokens" in emit and result.tokens is not None:
+        section("TOKENS")
+        out.extend(map(repr, result.tokens))
+
+    if result.diagnostics:
+        headers = True
+        section("SYNTAX ERRORS")
+        out.extend(map(str, result.diagnostics))
+    elif result.stage not in (None, "lex") and (headers or "ast" in emit):
+        section("AST GENERATED")
+        if "ast" in emit:
+            out.append(repr(result.ast))
+        if headers and result.stage in ("semantic", "tac"):
+            out.append("Semantic Analysis Passed")
+
+    if "tac" in emit and result.tac is not None:
+        section("THREE ADDRESS CODE (cached)" if result.cached else "THREE ADDRESS CODE")
+        out.extend(result.tac)
+
+    if result.stats is not None:
+        headers = True
+        section("STATS")
+        out.append(result.stats.format_table())
+
+    return "\n".join(out) + "\n" if out else ""
+
+
+def format_json(result, emit=None, path=None):
+    """
+    Render the emitted stages as JSON lines, one object per stage plus
+    one for the outcome.
+    """
+    emit = result.emit if emit is None else emit
+    base = {} if path is None else {"file": path}
+    records = []
+
+    if "source" in emit:
+        records.append({**base, "stage": "source", "source": result.source})
+    if "tokens" in emit and result.tokens is not None:
+        column = result.tokens.locations.column
+        tokens = [
+            [token.type.name, token.value, token.line, column(index, token.line)]
+            for index, token in enumerate(result.tokens)
+        ]
+        records.append({**base, "stage": "tokens", "tokens": tokens})
+    if "ast" in emit and result.ast is not None:
+        records.append({**base, "stage": "ast", "ast": repr(result.ast)})
+    if "tac" in emit and result.tac is not None:
+        records.append({**base, "stage": "tac", "tac": result.tac, "cached": result.cached})
+
+    if result.stats is not None:
+        records.append({**base, "stage": "stats", **result.stats.to_dict()})
+
+    status = {**base, "stage": "result", "ok": result.ok}
+    if not result.ok:
+        status["error"] = result.error
+        status["diagnostics"] = [
+            {"line": d.line, "column": d.column, "message": d.message} for d in result.diagnostics
+        ]
+    records.append(status)
+
+    return "".join(json.dumps(record) + "\n" for record in records)
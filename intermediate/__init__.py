@@ -3,8 +3,11 @@ Intermediate Representation package
 
 Exposes:
 - TACGenerator
+- Instr, Op
+- format_code, parse_code
 """
 
+from .ir import Instr, Op, format_code, parse_code
 from .tac_generator import TACGenerator
 
-__all__ = ["TACGenerator"]
+__all__ = ["TACGenerator", "Instr", "Op", "format_code", "parse_code"]
@@ -0,0 +1,131 @@
+"""
+ir.py
+
+Three Address Code instructions, their text form, and a parser that
+reads the text form back
+"""
+
+import re
+from enum import IntEnum
+
+from semantic.symbol_table import TEMPORARY_NAME, Symbol, SymbolTable
+
+
+class Op(IntEnum):
+    COPY = 0        # dest = left
+    BINARY = 1      # dest = left operator right
+    PRINT = 2       # print left
+    LABEL = 3       # L<label>:
+    GOTO = 4        # goto L<label>
+    IF_FALSE = 5    # ifFalse left goto L<label>
+
+
+class Instr:
+    """
+    One TAC instruction.
+
+    Operands (`dest`, `left`, `right`) are Symbols for variables and
+    temporaries and ints for constants; labels are ints, printed as
+    `L<n>`. Fields an opcode does not use are None.
+    """
+
+    __slots__ = ("op", "dest", "left", "operator", "right", "label")
+
+    def __init__(self, op, dest=None, left=None, operator=None, right=None, label=None):
+        self.op = op
+        self.dest = dest
+        self.left = left
+        self.operator = operator
+        self.right = right
+        self.label = label
+
+    def format(self):
+        """The instruction as one line of the printed TAC."""
+        op = self.op
+        if op == Op.BINARY:
+            return f"{self.dest.unique_name} = {format_operand(self.left)} {self.operator} {format_operand(self.right)}"
+        if op == Op.COPY:
+            return f"{self.dest.unique_name} = {format_operand(self.left)}"
+        if op == Op.LABEL:
+            return f"L{self.label}:"
+        if op == Op.GOTO:
+            return f"goto L{self.label}"
+        if op == Op.IF_FALSE:
+            return f"ifFalse {format_operand(self.left)} goto L{self.label}"
+        return f"print {format_operand(self.left)}"
+
+    def __repr__(self):
+        return f"Instr({self.op.name}, {self.format()!r})"
+
+
+def format_operand(operand):
+    if isinstance(operand, Symbol):
+        return operand.unique_name
+    return str(operand)
+
+
+def format_code(code):
+    """The printed TAC lines for a list of instructions."""
+    return [instr.format() for instr in code]
+
+
+# ==============================
+# Text Form
+# ==============================
+
+_OPERAND = r"(-?\d+|[^\W\d]\w*(?:\.\d+)?)"
+_LINE_PATTERNS = (
+    (Op.BINARY, re.compile(rf"{_OPERAND} = {_OPERAND} (==|!=|<=|>=|<<|[-+*/%<>]) {_OPERAND}")),
+    (Op.COPY, re.compile(rf"{_OPERAND} = {_OPERAND}")),
+    (Op.LABEL, re.compile(r"L(\d+):")),
+    (Op.GOTO, re.compile(r"goto L(\d+)")),
+    (Op.IF_FALSE, re.compile(rf"ifFalse {_OPERAND} goto L(\d+)")),
+    (Op.PRINT, re.compile(rf"print {_OPERAND}")),
+)
+
+
+def parse_code(lines, symbol_table=None):
+    """
+    Read printed TAC back into instructions, the inverse of format_code.
+
+    Each distinct name becomes one Symbol in `symbol_table` (a new one by
+    default): `t<n>` names are temporaries, `x.2` is a second variable
+    called x. SymbolTable never prints a variable as `t<n>`, so a
+    variable called t1 reads back as `t1.2`, apart from the temporary.
+    """
+    if symbol_table is None:
+        symbol_table = SymbolTable()
+    symbols = {}
+
+    def operand(text):
+        if text[0].isdigit() or text[0] == "-":
+            return int(text)
+        symbol = symbols.get(text)
+        if symbol is None:
+            name = text.partition(".")[0]
+            symbol_type = "temp" if TEMPORARY_NAME.fullmatch(text) else "int"
+            symbol = symbols[text] = symbol_table.add(name, symbol_type, text)
+        return symbol
+
+    code = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        for op, pattern in _LINE_PATTERNS:
+            match = pattern.fullmatch(line)
+            if match:
+                break
+        else:
+            raise Exception(f"Invalid TAC at line {number}: {line!r}")
+
+        fields = match.groups()
+        if op == Op.BINARY:
+            code.append(Instr(op, operand(fields[0]), operand(fields[1]), fields[2], operand(fields[3])))
+        elif op == Op.COPY:
+            code.append(Instr(op, operand(fields[0]), operand(fields[1])))
+        elif op == Op.IF_FALSE:
+            code.append(Instr(op, left=operand(fields[0]), label=int(fields[1])))
+        elif op == Op.PRINT:
+            code.append(Instr(op, left=operand(fields[0])))
+        else:
+            code.append(Instr(op, label=int(fields[0])))
+    return code
@@ -4,8 +4,22 @@ tac_generator.py
 Generates Three Address Code (TAC) from AST
 """
 
-class TACGenerator:
-    def __init__(self):
+from myparser.ast_nodes import BinaryOp
+from myparser.visitor import NodeVisitor
+from semantic.symbol_table import SymbolTable
+from .ir import Instr, Op
+
+
+class TACGenerator(NodeVisitor):
+    method_prefix = "gen_"
+    fallback_method = "generic_gen"
+
+    def __init__(self, symbol_table=None):
+        # Temporaries must continue the ids of the SemanticAnalyzer's
+        # table. Without one, generate() takes it from the analyzed
+        # Program, or else starts a table in which names the analyzer
+        # did not resolve get one global Symbol each.
+        self.symbol_table = symbol_table
         self.temp_count = 0
         self.label_count = 0
         self.code = []
@@ -16,11 +30,21 @@ class TACGenerator:
 
     def new_temp(self):
         self.temp_count += 1
-        return f"t{self.temp_count}"
+        return self.symbol_table.temporary(f"t{self.temp_count}")
+
+    def symbol_for(self, node, name):
+        symbol = node.symbol
+        table = self.symbol_table
+        if symbol is None:
+            symbol = table.table.get(name) or table.declare(name, "int")
+        elif symbol.id >= len(table.symbols) or table.symbols[symbol.id] is not symbol:
+            # Its id would clash with the ids of this table's symbols
+            raise Exception(f"Symbol '{name}' was resolved in a different SymbolTable")
+        return symbol
 
     def new_label(self):
         self.label_count += 1
-        return f"L{self.label_count}"
+        return self.label_count
 
     def emit(self, instruction):
         self.code.append(instruction)
@@ -29,10 +53,13 @@ class TACGenerator:
     # Main Entry
     # ==============================
 
+    # Dispatches to the gen_* methods below; see NodeVisitor. Methods
+    # for nodes with children are generators that `yield` each child
+    # and receive the operand it produced
     def generate(self, node):
-        method_name = f"gen_{type(node).__name__}"
-        method = getattr(self, method_name, self.generic_gen)
-        return method(node)
+        if self.symbol_table is None:
+            self.symbol_table = getattr(node, "symbol_table", None) or SymbolTable()
+        return self.visit(node)
 
     def generic_gen(self, node):
         raise Exception(f"No TAC generator for {type(node).__name__}")
@@ -42,8 +69,11 @@ class TACGenerator:
     # ==============================
 
     def gen_Program(self, node):
+        for decl in node.declarations:
+            yield decl
+
         for stmt in node.statements:
-            self.generate(stmt)
+            yield stmt
         return self.code
 
     # ------------------------------
@@ -51,73 +81,102 @@ class TACGenerator:
     # ------------------------------
 
     def gen_Declaration(self, node):
-        # No TAC needed for simple int declaration
-        pass
+        # A plain `int x;` needs no TAC; an initializer is an assignment
+        if node.initializer is not None:
+            value = yield node.initializer
+            self.emit(Instr(Op.COPY, self.symbol_for(node, node.var_name), value))
 
     # ------------------------------
     # Statements
     # ------------------------------
 
     def gen_Assignment(self, node):
-        value = self.generate(node.expression)
-        self.emit(f"{node.var_name} = {value}")
+        value = yield node.expression
+        self.emit(Instr(Op.COPY, self.symbol_for(node, node.var_name), value))
 
     def gen_PrintStatement(self, node):
-        value = self.generate(node.expression)
-        self.emit(f"print {value}")
+        value = yield node.expression
+        self.emit(Instr(Op.PRINT, left=value))
 
     def gen_IfStatement(self, node):
-        condition = self.generate(node.condition)
+        condition = yield node.condition
 
         label_else = self.new_label()
         label_end = self.new_label()
 
-        self.emit(f"ifFalse {condition} goto {label_else}")
+        self.emit(Instr(Op.IF_FALSE, left=condition, label=label_else))
 
         # True block
-        self.generate(node.true_block)
+        yield node.true_block
 
-        self.emit(f"goto {label_end}")
-        self.emit(f"{label_else}:")
+        self.emit(Instr(Op.GOTO, label=label_end))
+        self.emit(Instr(Op.LABEL, label=label_else))
 
         # False block
         if node.false_block:
-            self.generate(node.false_block)
+            yield node.false_block
 
-        self.emit(f"{label_end}:")
+        self.emit(Instr(Op.LABEL, label=label_end))
 
     def gen_WhileStatement(self, node):
         label_start = self.new_label()
         label_end = self.new_label()
 
-        self.emit(f"{label_start}:")
+        self.emit(Instr(Op.LABEL, label=label_start))
 
-        condition = self.generate(node.condition)
-        self.emit(f"ifFalse {condition} goto {label_end}")
+        condition = yield node.condition
+        self.emit(Instr(Op.IF_FALSE, left=condition, label=label_end))
 
-        self.generate(node.body)
+        yield node.body
 
-        self.emit(f"goto {label_start}")
-        self.emit(f"{label_end}:")
+        self.emit(Instr(Op.GOTO, label=label_start))
+        self.emit(Instr(Op.LABEL, label=label_end))
 
     def gen_Block(self, node):
         for stmt in node.statements:
-            self.generate(stmt)
+            yield stmt
 
     # ==============================
     # Expressions
     # ==============================
 
     def gen_BinaryOp(self, node):
-        left = self.generate(node.left)
-        right = self.generate(node.right)
-
-        temp = self.new_temp()
-        self.emit(f"{temp} = {left} {node.operator} {right}")
-        return temp
+        # Operator trees are the largest and deepest part of most ASTs,
+        # so they are walked with an explicit stack instead of one
+        # generator per node. Operands and temps come out in the same
+        # left-to-right post-order as recursion would give.
+        operands = []
+        push_operand = operands.append
+        pop_operand = operands.pop
+        # None on the stack marks the operator below it as ready: both
+        # of its operands have been generated
+        stack = [node]
+        push = stack.append
+        pop = stack.pop
+        generate = self.visit
+        emit = self.code.append
+        binary = Op.BINARY
+
+        while stack:
+            current = pop()
+            if current is None:
+                current = pop()
+                right = pop_operand()
+                left = pop_operand()
+                temp = self.new_temp()
+                emit(Instr(binary, temp, left, current.operator, right))
+                push_operand(temp)
+            elif isinstance(current, BinaryOp):
+                push(current)
+                push(None)
+                push(current.right)
+                push(current.left)
+            else:
+                push_operand(generate(current))
+        return operands[0]
 
     def gen_Number(self, node):
         return node.value
 
     def gen_Identifier(self, node):
-        return node.name
+        return self.symbol_for(node, node.name)
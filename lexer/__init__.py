@@ -5,9 +5,13 @@ Exposes:
 - Lexer
 - Token
 - TokenType
+- TokenBuffer
+- TokenLocations
 """
 
 from .lexer import Lexer
 from .token import Token, TokenType
+from .token_buffer import TokenBuffer
+from .locations import TokenLocations
 
-__all__ = ["Lexer", "Token", "TokenType"]
+__all__ = ["Lexer", "Token", "TokenType", "TokenBuffer", "TokenLocations"]
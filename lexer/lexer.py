@@ -1,14 +1,105 @@
 # lexer/lexer.py
 
+import gc
+import mmap
+import re
+import sys
+from itertools import accumulate, compress
+from operator import sub
+
+from lexer.locations import TokenList, TokenLocations, TokenStream
 from lexer.token import Token, TokenType
+from lexer.token_buffer import TokenBuffer, TYPE_CODES, intern_ascii
+
+
+# --------------------------
+# Lexeme Patterns
+# --------------------------
+
+# Splits the source into lexemes in one C-level pass. Newlines are kept
+# as lexemes so that line numbers can be tracked without rescanning, all
+# other whitespace is skipped, and any remaining non-space character is
+# returned on its own so it can be reported as illegal.
+_LEXEME_PATTERN = re.compile(
+    r"[^\W\d]\w*"               # identifier / keyword
+    r"|\d+"                     # number
+    r"|[=!<>]="                 # two-character operators
+    r"|//[^\n]*"                # comment
+    r"|\n"                      # newline
+    r"|\S"                      # single-character operator or illegal
+)
+
+# The same lexemes over bytes-like sources. Byte patterns only know
+# ASCII, so identifiers here are ASCII-only.
+_BYTES_LEXEME_PATTERN = re.compile(
+    rb"[A-Za-z_]\w*"
+    rb"|\d+"
+    rb"|[=!<>]="
+    rb"|//[^\n]*"
+    rb"|\n"
+    rb"|\S"
+)
+
+# The same lexemes, each with the whitespace before it, so that the
+# pieces tile the source up to its last lexeme and each piece ends at
+# the sum of the lengths up to it. tokenize_buffer() uses these to lex
+# without a Python-level step per token.
+_TILING_PATTERN = re.compile(r"[^\S\n]*(?:[^\W\d]\w*|\d+|[=!<>]=|//[^\n]*|\n|\S)")
+_BYTES_TILING_PATTERN = re.compile(rb"[^\S\n]*(?:[A-Za-z_]\w*|\d+|[=!<>]=|//[^\n]*|\n|\S)")
+
+# Codes for pieces that are not tokens, above every token type code
+_ILLEGAL = 253
+_LINE_BREAK = 254
+_SKIPPED = 255
+
+# byte.translate() tables over piece codes: 1 for pieces that are
+# tokens, and 1 for line breaks
+_IS_TOKEN = bytes(code < _ILLEGAL for code in range(256))
+_IS_LINE_BREAK = bytes(code == _LINE_BREAK for code in range(256))
+
+_NEWLINE = re.compile(r"\n")
+_BYTES_NEWLINE = re.compile(rb"\n")
+
+# Characters scanned per batch by iter_tokens
+CHUNK_SIZE = 1 << 16
+
+# Lexemes whose token type is fully determined by their text
+_OPERATORS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MULTIPLY,
+    "/": TokenType.DIVIDE,
+    "%": TokenType.MOD,
+    "=": TokenType.ASSIGN,
+    "==": TokenType.EQUAL,
+    "!=": TokenType.NOT_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    ";": TokenType.SEMICOLON,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+}
 
 
 class Lexer:
     def __init__(self, text):
+        # `text` is either a str or a bytes-like object (bytes, memoryview,
+        # mmap). Bytes sources are scanned in place: only identifier and
+        # number lexemes are decoded, and offsets/columns count bytes.
+        #
+        # Identifier names are interned, so every occurrence of a name is
+        # the same str object and dict lookups on it (symbol table, TAC
+        # names) succeed on the identity check. Number values come from
+        # `constants`, a pool shared by everything this lexer scans.
         self.text = text
+        self.constants = {}
         self.position = 0
-        self.current_char = self.text[self.position] if self.text else None
         self.line = 1
+        self.line_start = 0
 
         self.keywords = {
             "int": TokenType.INT,
@@ -18,181 +109,253 @@ class Lexer:
             "print": TokenType.PRINT,
         }
 
-    # --------------------------
-    # Utility Methods
-    # --------------------------
-
-    def advance(self):
-        self.position += 1
-        if self.position < len(self.text):
-            self.current_char = self.text[self.position]
+        if isinstance(text, str):
+            self.pattern = _LEXEME_PATTERN
+            self.tiling = _TILING_PATTERN
+            self.newline = _NEWLINE
+            self.decode = sys.intern
         else:
-            self.current_char = None
-
-    def peek(self):
-        peek_pos = self.position + 1
-        if peek_pos < len(self.text):
-            return self.text[peek_pos]
-        return None
-
-    def skip_whitespace(self):
-        while self.current_char is not None and self.current_char.isspace():
-            if self.current_char == "\n":
-                self.line += 1
-            self.advance()
-
-    def skip_comment(self):
-        # Handles // single-line comments
-        while self.current_char is not None and self.current_char != "\n":
-            self.advance()
-
-    # --------------------------
-    # Token Generators
-    # --------------------------
-
-    def number(self):
-        result = ""
-        while self.current_char is not None and self.current_char.isdigit():
-            result += self.current_char
-            self.advance()
-        return Token(TokenType.NUMBER, int(result), self.line)
-
-    def identifier(self):
-        result = ""
-        while (
-            self.current_char is not None
-            and (self.current_char.isalnum() or self.current_char == "_")
-        ):
-            result += self.current_char
-            self.advance()
-
-        token_type = self.keywords.get(result, TokenType.IDENTIFIER)
-        return Token(token_type, result, self.line)
+            self.pattern = _BYTES_LEXEME_PATTERN
+            self.tiling = _BYTES_TILING_PATTERN
+            self.newline = _BYTES_NEWLINE
+            self.decode = intern_ascii
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Lex a file through a read-only memory map instead of reading it
+        into a str.
+        """
+        with open(path, "rb") as f:
+            try:
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                source = b""
+        return cls(source)
 
     # --------------------------
     # Main Tokenizer
     # --------------------------
 
-    def tokenize(self):
-        tokens = []
-
-        while self.current_char is not None:
-
-            # Skip whitespace
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-
-            # Skip comments
-            if self.current_char == "/" and self.peek() == "/":
-                self.advance()
-                self.advance()
-                self.skip_comment()
-                continue
-
-            # Numbers
-            if self.current_char.isdigit():
-                tokens.append(self.number())
-                continue
-
-            # Identifiers / Keywords
-            if self.current_char.isalpha() or self.current_char == "_":
-                tokens.append(self.identifier())
-                continue
-
-            # Operators
-            if self.current_char == "+":
-                tokens.append(Token(TokenType.PLUS, "+", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "-":
-                tokens.append(Token(TokenType.MINUS, "-", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "*":
-                tokens.append(Token(TokenType.MULTIPLY, "*", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "/":
-                tokens.append(Token(TokenType.DIVIDE, "/", self.line))
-                self.advance()
+    def tokenize(self, stop=None):
+        """
+        Scan from the current position to `stop` (the end of the source
+        by default) and return the tokens, ending with EOF, as a
+        TokenList carrying their locations.
+        """
+        locations = TokenLocations(self.line, self.line_start)
+        return self._scan_paused(len(self.text) if stop is None else stop, locations)
+
+    def iter_tokens(self, chunk_size=CHUNK_SIZE):
+        """
+        Return a TokenStream that yields tokens lazily, scanning the
+        source one chunk at a time.
+
+        Chunks always end just after a newline, and no lexeme spans a
+        newline, so splitting there never cuts a token in half.
+        """
+        locations = TokenLocations(self.line, self.line_start)
+        return TokenStream(self._stream(chunk_size, locations), locations)
+
+    def _stream(self, chunk_size, locations):
+        text = self.text
+        end = len(text)
+
+        while self.position < end:
+            newline = self.newline.search(text, self.position + chunk_size)
+            stop = end if newline is None else newline.end()
+            yield from self._scan_paused(stop, locations, eof=False)
+
+        yield self._eof_token(locations)
+
+    def tokenize_buffer(self):
+        """
+        Scan the whole source into a TokenBuffer without creating any
+        Token objects.
+
+        Each chunk is split into pieces by one findall() call, and every
+        later step runs in C over the whole chunk: piece codes and lexeme
+        widths come from dicts of the distinct pieces seen so far,
+        offsets from running sums of piece lengths, and line numbers from
+        running counts of line breaks. Python code only runs once per
+        distinct piece.
+        """
+        text = self.text
+        end = len(text)
+        buffer = TokenBuffer(text)
+        types, lines, starts, ends = buffer.types, buffer.lines, buffer.starts, buffer.ends
+        line_starts = buffer.line_starts
+        line = self.line
+        buffer.first_line = line
+        line_starts.append(self.line_start)
+        codes = {}
+        widths = {}
+        classify = self._classifier()
+        newline_lexeme = self._markers()[0]
+
+        while self.position < end:
+            # Chunks end just after a newline, as in iter_tokens()
+            position = self.position
+            newline = self.newline.search(text, position + CHUNK_SIZE)
+            stop = end if newline is None else newline.end()
+
+            pieces = self.tiling.findall(text, position, stop)
+            for piece in set(pieces).difference(codes):
+                lexeme = piece.lstrip() or newline_lexeme
+                codes[piece] = classify(lexeme)
+                widths[piece] = len(lexeme)
+            piece_codes = bytes(map(codes.__getitem__, pieces))
+            piece_ends = list(accumulate(map(len, pieces), initial=position))[1:]
+            is_token = piece_codes.translate(_IS_TOKEN)
+            is_line_break = piece_codes.translate(_IS_LINE_BREAK)
+
+            if _ILLEGAL in piece_codes:
+                index = piece_codes.index(_ILLEGAL)
+                self.line = line + is_line_break.count(1, 0, index)
+                lexeme = pieces[index].lstrip()
+                self.illegal(lexeme, piece_ends[index] - len(lexeme))
+
+            types.frombytes(bytes(compress(piece_codes, is_token)))
+            lines.extend(compress(accumulate(is_line_break, initial=line), is_token))
+            starts.extend(compress(map(sub, piece_ends, map(widths.__getitem__, pieces)), is_token))
+            ends.extend(compress(piece_ends, is_token))
+            line_starts.extend(compress(piece_ends, is_line_break))
+            line += is_line_break.count(1)
+            self.position = stop
+
+        self.line = line
+        self.line_start = line_starts[-1]
+        buffer.append(TYPE_CODES[TokenType.EOF], line, self.position, self.position)
+        return buffer
+
+    def _classifier(self):
+        # Maps a piece found by the tiling pattern to its type code, or
+        # to one of the codes for pieces that are not tokens
+        fixed = {
+            lexeme: TYPE_CODES[token_type]
+            for lexeme, token_type in self._fixed_lexemes().items()
+        }.get
+        number = TYPE_CODES[TokenType.NUMBER]
+        identifier = TYPE_CODES[TokenType.IDENTIFIER]
+        newline, comment, underscore = self._markers()
+
+        def classify(lexeme):
+            code = fixed(lexeme)
+            if code is not None:
+                return code
+            if lexeme == newline:
+                return _LINE_BREAK
+            first = lexeme[:1]
+            if first == underscore or first.isalpha():
+                return identifier
+            if first.isdigit():
+                return number
+            if lexeme.startswith(comment) or first.isspace():
+                return _SKIPPED
+            return _ILLEGAL
+
+        return classify
+
+    def _scan_paused(self, stop, locations, eof=True):
+        # Tokens never reference each other, so the cyclic collector has
+        # nothing to find while they are being built; pausing it avoids
+        # repeated full scans of the growing token list.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._scan(stop, locations, eof)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _scan(self, stop, locations, eof):
+        tokens = TokenList(locations=locations)
+        append = tokens.append
+        add_start = locations.starts.append
+        add_end = locations.ends.append
+        add_line = locations.line_starts.append
+        fixed = self._fixed_lexemes().get
+        spelling = {token_type: lexeme for lexeme, token_type in {**_OPERATORS, **self.keywords}.items()}
+        number = TokenType.NUMBER
+        identifier = TokenType.IDENTIFIER
+        newline, comment, underscore = self._markers()
+        decode = self.decode
+        constants = self.constants
+        line = self.line
+        line_start = self.line_start
+        # Tokens are built by filling in their slots here rather than
+        # through Token(), which would cost a Python-level __init__ call
+        # for every token
+        new_token = object.__new__
+
+        for match in self.pattern.finditer(self.text, self.position, stop):
+            lexeme = match[0]
+            token_type = fixed(lexeme)
+            if token_type is not None:
+                value = spelling[token_type]
+            elif lexeme == newline:
+                line += 1
+                line_start = match.end()
+                add_line(line_start)
                 continue
-
-            if self.current_char == "=":
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    tokens.append(Token(TokenType.EQUAL, "==", self.line))
-                else:
-                    tokens.append(Token(TokenType.ASSIGN, "=", self.line))
-                    self.advance()
-                continue
-
-            if self.current_char == "!":
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    tokens.append(Token(TokenType.NOT_EQUAL, "!=", self.line))
+            else:
+                first = lexeme[:1]
+                if first == underscore or first.isalpha():
+                    token_type = identifier
+                    value = decode(lexeme)
+                elif first.isdigit():
+                    token_type = number
+                    value = constants.get(lexeme)
+                    if value is None:
+                        value = constants[lexeme] = int(lexeme)
+                elif lexeme.startswith(comment):
                     continue
                 else:
-                    raise Exception(f"Unexpected character '!' at line {self.line}")
-
-            if self.current_char == "<":
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    tokens.append(Token(TokenType.LESS_EQUAL, "<=", self.line))
-                else:
-                    tokens.append(Token(TokenType.LESS, "<", self.line))
-                    self.advance()
-                continue
-
-            if self.current_char == ">":
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    tokens.append(Token(TokenType.GREATER_EQUAL, ">=", self.line))
-                else:
-                    tokens.append(Token(TokenType.GREATER, ">", self.line))
-                    self.advance()
-                continue
-
-            # Symbols
-            if self.current_char == ";":
-                tokens.append(Token(TokenType.SEMICOLON, ";", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "(":
-                tokens.append(Token(TokenType.LPAREN, "(", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == ")":
-                tokens.append(Token(TokenType.RPAREN, ")", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "{":
-                tokens.append(Token(TokenType.LBRACE, "{", self.line))
-                self.advance()
-                continue
-
-            if self.current_char == "}":
-                tokens.append(Token(TokenType.RBRACE, "}", self.line))
-                self.advance()
-                continue
-            
-            if self.current_char == '%':
-                tokens.append(Token(TokenType.MOD, '%', self.line))
-                self.advance()
-                continue
+                    self.line = line
+                    self.line_start = line_start
+                    self.illegal(lexeme, match.start())
+
+            start, end = match.span()
+            token = new_token(Token)
+            token.type = token_type
+            token.value = value
+            token.line = line
+            append(token)
+            add_start(start)
+            add_end(end)
+
+        self.position = stop
+        self.line = line
+        self.line_start = line_start
+        if eof:
+            append(self._eof_token(locations))
+        return tokens
 
-            # Unknown character
-            raise Exception(f"Illegal character '{self.current_char}' at line {self.line}")
+    # --------------------------
+    # Utility Methods
+    # --------------------------
 
-        tokens.append(Token(TokenType.EOF, line=self.line))
-        return tokens
+    def _fixed_lexemes(self):
+        lexemes = {**_OPERATORS, **self.keywords}
+        if isinstance(self.text, str):
+            return lexemes
+        return {lexeme.encode(): token_type for lexeme, token_type in lexemes.items()}
+
+    def _markers(self):
+        # Newline, comment prefix and underscore in the source's own type
+        if isinstance(self.text, str):
+            return "\n", "//", "_"
+        return b"\n", b"//", b"_"
+
+    def _eof_token(self, locations):
+        locations.append(self.position, self.position)
+        return Token(TokenType.EOF, None, self.line)
+
+    def illegal(self, lexeme, start):
+        if not isinstance(lexeme, str):
+            # Report the whole UTF-8 character, not just its first byte
+            lexeme = bytes(self.text[start:start + 4]).decode("utf-8", "replace")[:1]
+        if lexeme == "!":
+            raise Exception(f"Unexpected character '!' at line {self.line}")
+        raise Exception(f"Illegal character '{lexeme}' at line {self.line}")
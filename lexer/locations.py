@@ -0,0 +1,63 @@
+# lexer/locations.py
+
+from array import array
+
+
+class TokenLocations:
+    """
+    Source locations for the tokens of one scan.
+
+    Locations are kept here rather than on the tokens, the way SpanTable
+    keeps them for nodes: token i maps to row i across two parallel
+    columns holding the [start, end) offsets of its lexeme. Columns are
+    derived from a per-line table of line start offsets, as in
+    TokenBuffer, so a Token only carries its type, value and line.
+    """
+
+    def __init__(self, first_line=1, line_start=0):
+        self.starts = array("i")
+        self.ends = array("i")
+        self.first_line = first_line
+        self.line_starts = array("i", [line_start])
+
+    def append(self, start, end):
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def column(self, index, line):
+        """1-based column of token `index`, which is on `line`."""
+        return self.starts[index] - self.line_starts[line - self.first_line] + 1
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class TokenList(list):
+    """A list of tokens with the TokenLocations recorded for them."""
+
+    __slots__ = ("locations",)
+
+    def __init__(self, tokens=(), locations=None):
+        super().__init__(tokens)
+        self.locations = locations
+
+
+class TokenStream:
+    """
+    A lazy token stream with the TokenLocations filled in as it is read.
+
+    Iterating it returns the underlying generator itself, so a consumer
+    pulling tokens with next() pays nothing for the wrapper.
+    """
+
+    __slots__ = ("tokens", "locations")
+
+    def __init__(self, tokens, locations):
+        self.tokens = tokens
+        self.locations = locations
+
+    def __iter__(self):
+        return self.tokens
+
+    def __next__(self):
+        return next(self.tokens)
@@ -37,6 +37,10 @@ class TokenType(Enum):
 
 
 class Token:
+    # Offsets and columns live in the TokenLocations of the scan that
+    # produced the token, not here
+    __slots__ = ("type", "value", "line")
+
     def __init__(self, token_type, value=None, line=1):
         self.type = token_type
         self.value = value
@@ -0,0 +1,136 @@
+# lexer/token_buffer.py
+
+import sys
+from array import array
+
+from lexer.token import Token, TokenType
+
+
+# Dense integer code for every token type, stored in the type column
+TOKEN_TYPES = tuple(TokenType)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+_NUMBER = TYPE_CODES[TokenType.NUMBER]
+_IDENTIFIER = TYPE_CODES[TokenType.IDENTIFIER]
+_EOF = TYPE_CODES[TokenType.EOF]
+
+
+def decode_ascii(lexeme):
+    """Decode a lexeme sliced from a bytes-like source."""
+    return str(lexeme, "ascii")
+
+
+def intern_ascii(lexeme):
+    """Decode and intern an identifier sliced from a bytes-like source."""
+    return sys.intern(str(lexeme, "ascii"))
+
+
+class TokenBuffer:
+    """
+    Struct-of-arrays token store.
+
+    Each token is one row across four parallel columns: type code, line,
+    and the start/end offsets of its lexeme in the source, which may be
+    a str or a bytes-like object. Columns are
+    derived from a per-line table of line start offsets. Values are
+    sliced from the source only when asked for, and Token objects are
+    created only when a row is indexed.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.decode = str if isinstance(text, str) else decode_ascii
+        # Interned like Lexer tokens: names through sys.intern, numbers
+        # through a pool keyed by lexeme
+        self.constants = {}
+        self.types = array("B")
+        self.lines = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.first_line = 1
+        self.line_starts = array("i")
+
+    def append(self, code, line, start, end):
+        self.types.append(code)
+        self.lines.append(line)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def value(self, index):
+        code = self.types[index]
+        if code == _EOF:
+            return None
+        lexeme = self.text[self.starts[index]:self.ends[index]]
+        if code == _NUMBER:
+            return self.constant(lexeme)
+        return sys.intern(self.decode(lexeme))
+
+    def constant(self, lexeme):
+        lexeme = self.decode(lexeme)
+        value = self.constants.get(lexeme)
+        if value is None:
+            value = self.constants[lexeme] = int(lexeme)
+        return value
+
+    def column(self, index):
+        return self.starts[index] - self.line_starts[self.lines[index] - self.first_line] + 1
+
+    def cursor(self):
+        return TokenCursor(self)
+
+    def nbytes(self):
+        """Bytes held by the columns, excluding the source text."""
+        columns = (self.types, self.lines, self.starts, self.ends, self.line_starts)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        return Token(TOKEN_TYPES[self.types[index]], self.value(index), self.lines[index])
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+
+class TokenCursor:
+    """
+    A single reusable token view that walks a TokenBuffer in place.
+
+    It has the same fields as Token, but advance() overwrites them, so
+    callers must copy a field out before advancing if they still need it.
+    Offsets and columns are read from the buffer's columns at `index`.
+    """
+
+    __slots__ = ("buffer", "index", "type", "value", "line")
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.index = -1
+        self.advance()
+
+    def advance(self):
+        buffer = self.buffer
+        index = self.index + 1
+        if index >= len(buffer.types):
+            return
+        self.index = index
+        code = buffer.types[index]
+        start = buffer.starts[index]
+        end = buffer.ends[index]
+        self.type = TOKEN_TYPES[code]
+        self.line = buffer.lines[index]
+
+        # Same result as buffer.value(index), inlined for the parser's
+        # hot path
+        if code == _EOF:
+            self.value = None
+        elif code == _NUMBER:
+            self.value = buffer.constant(buffer.text[start:end])
+        else:
+            self.value = sys.intern(buffer.decode(buffer.text[start:end]))
+
+    __repr__ = Token.__repr__
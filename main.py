@@ -1,49 +1,117 @@
+import argparse
+import json
+import os
+import pathlib
 import sys
-from lexer import Lexer
-from myparser.parser import Parser
-from semantic import SemanticAnalyzer
-from intermediate import TACGenerator
+from driver.cache import CompilationCache, DEFAULT_CACHE_DIR
+from driver.batch import collect_sources, compile_batch
+from driver.pipeline import DEFAULT_EMIT, compile_source, format_text, format_json, parse_emit
+from driver.instrumentation import Instrumentation, PIPELINE_STAGES, format_stats
+from vm import run as run_program
 
 
-def compile_file(filepath):
-    with open(filepath, "r") as f:
-        source = f.read()
+def compile_file(filepath, cache=None, emit=DEFAULT_EMIT, output_format="text", instrumentation=None, optimize=False, run=False):
+    result = compile_source(pathlib.Path(filepath), emit, cache, instrumentation, optimize)
 
-    print("===== SOURCE CODE =====")
-    print(source)
+    # One write for the whole dump
+    if output_format == "json":
+        sys.stdout.write(format_json(result, path=filepath))
+    else:
+        sys.stdout.write(format_text(result))
 
-    # Lexing
-    lexer = Lexer(source)
-    tokens = lexer.tokenize()
+    if not result.ok:
+        raise Exception(result.error)
 
-    print("\n===== TOKENS =====")
-    for token in tokens:
-        print(token)
+    if run:
+        if emit:
+            sys.stdout.write("\n===== PROGRAM OUTPUT =====\n")
+        # The printed lines are all a cache hit has
+        run_program(result.tac if result.code is None else result.code, sys.stdout)
+    return result.tac
 
-    # Parsing
-    parser = Parser(tokens)
-    ast = parser.parse()
 
-    print("\n===== AST GENERATED =====")
+def compile_many(patterns, jobs=None, cache_dir=None, emit=("tac",), output_format="text", stats=None, optimize=False):
+    report = compile_batch(patterns, jobs, cache_dir, emit, output_format, stats, optimize)
+    totals = report.stats
 
-    # Semantic Analysis
-    semantic = SemanticAnalyzer()
-    semantic.visit(ast)
+    # One buffered write, in input order regardless of completion order
+    out = []
+    for result in report.results:
+        if output_format == "json":
+            out.append(result.output)
+        elif result.tac is not None:
+            out.append(f"===== {result.path} =====\n")
+            out.append(result.output)
 
-    print("Semantic Analysis Passed")
+    summary = [report.summary()]
+    if cache_dir is not None:
+        summary.append(f"Cache: {report.cache_hits} hit(s), {len(report.results) - report.cache_hits} miss(es)")
 
-    # TAC Generation
-    tac_gen = TACGenerator()
-    tac_code = tac_gen.generate(ast)
+    if output_format == "json":
+        if totals is not None:
+            out.append(json.dumps({"stage": "stats", "files": len(report.results), **totals}) + "\n")
+        sys.stdout.write("".join(out))
+        sys.stderr.write("".join(f"{result.path}: {message}\n" for result in report.failed for message in result.errors))
+        sys.stderr.write("\n".join(summary) + "\n")
+    else:
+        if report.failed:
+            out.append("===== ERRORS =====\n")
+            out.extend(f"{result.path}: {message}\n" for result in report.failed for message in result.errors)
+        if totals is not None:
+            out.append(f"===== STATS ({len(report.results)} files) =====\n{format_stats(totals)}\n")
+        out.append("\n".join(summary) + "\n")
+        sys.stdout.write("".join(out))
 
-    print("\n===== THREE ADDRESS CODE =====")
-    for line in tac_code:
-        print(line)
+    return report
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="Compile Tiny C source files to three-address code.")
+    arg_parser.add_argument("sources", nargs="+", help="source files, directories or glob patterns")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes for batch mode (default: CPU count)")
+    arg_parser.add_argument("--emit", type=parse_emit, default=None,
+                            help="comma-separated stages to dump: source,tokens,ast,tac "
+                                 "(default: source,tokens,tac for one file, tac in batch mode)")
+    arg_parser.add_argument("-O", "--optimize", action="store_true", help="optimize the three-address code")
+    arg_parser.add_argument("--run", action="store_true", help="run a single compiled file on the bytecode VM")
+    arg_parser.add_argument("--format", choices=("text", "json"), default="text", help="text, or JSON lines")
+    arg_parser.add_argument("--stats", action="store_true", help="report time and counts for each stage")
+    arg_parser.add_argument("--trace-memory", action="store_true", help="with --stats, also record peak memory per stage (slower)")
+    arg_parser.add_argument("--profile", choices=PIPELINE_STAGES, help="run one stage of a single file under cProfile")
+    arg_parser.add_argument("--profile-output", help="where to write the profile (default: <stage>.prof)")
+    arg_parser.add_argument("--no-cache", action="store_true", help="always run every compiler stage")
+    arg_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"compilation cache directory (default: {DEFAULT_CACHE_DIR})")
+    arg_parser.add_argument("--cache-ast", action="store_true", help="also cache the pickled AST, so --emit ast can hit the cache")
+    return arg_parser
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <source_file>")
-        sys.exit(1)
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args()
+    stats = args.stats or args.trace_memory
+    if args.run and args.format == "json":
+        arg_parser.error("--run only works with text output")
+
+    if len(args.sources) == 1 and os.path.isfile(args.sources[0]):
+        cache = None if args.no_cache else CompilationCache(args.cache_dir, store_ast=args.cache_ast)
+        emit = DEFAULT_EMIT if args.emit is None else args.emit
+        instrumentation = None
+        if stats or args.profile:
+            instrumentation = Instrumentation(args.trace_memory, args.profile, args.profile_output)
+        compile_file(args.sources[0], cache, emit, args.format, instrumentation, args.optimize, args.run)
 
-    compile_file(sys.argv[1])
+        if cache is not None and cache.hits + cache.misses and args.format == "text":
+            print(f"\nCache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    else:
+        if args.profile:
+            arg_parser.error("--profile only works on a single source file")
+        if args.run:
+            arg_parser.error("--run only works on a single source file")
+        try:
+            sources = collect_sources(args.sources)
+        except Exception as error:
+            arg_parser.error(str(error))
+        emit = ("tac",) if args.emit is None else args.emit
+        stats = ("memory" if args.trace_memory else "time") if stats else None
+        report = compile_many(sources, args.jobs, None if args.no_cache else args.cache_dir, emit, args.format, stats, args.optimize)
+        sys.exit(1 if report.failed else 0)
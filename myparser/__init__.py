@@ -4,9 +4,19 @@ Parser package
 Exposes:
 - Parser
 - AST node classes
+- SpanTable
+- ParseError, Diagnostic
+- IncrementalDocument
+- NodeVisitor
+- ASTArena
 """
 
 from .parser import Parser
 from .ast_nodes import *
+from .spans import Span, SpanTable
+from .errors import ParseError, Diagnostic
+from .incremental import IncrementalDocument
+from .visitor import NodeVisitor
+from .arena import ASTArena
 
-__all__ = ["Parser"]
+__all__ = ["Parser", "Span", "SpanTable", "ParseError", "Diagnostic", "IncrementalDocument", "NodeVisitor", "ASTArena"]
@@ -0,0 +1,303 @@
+# myparser/arena.py
+
+from array import array
+
+from .ast_nodes import (
+    Program, Declaration, Assignment, PrintStatement, IfStatement,
+    WhileStatement, Block, BinaryOp, Number, Identifier,
+)
+
+
+# Node kinds
+PROGRAM, DECLARATION, ASSIGNMENT, PRINT, IF, WHILE, BLOCK, BINARY, NUMBER, IDENTIFIER = range(10)
+
+# Missing child (no initializer, no else block)
+NO_NODE = -1
+
+
+class ASTArena:
+    """
+    An AST stored as parallel integer arrays instead of node objects.
+
+    Each node is a row: `kinds[row]` and three operand columns `a`, `b`
+    and `c`, whose meaning depends on the kind:
+
+        PROGRAM      a = first item, b = declaration count, c = statement count
+        DECLARATION  a = name id, b = initializer row or NO_NODE
+        ASSIGNMENT   a = name id, b = expression row
+        PRINT        a = expression row
+        IF           a = condition row, b = true block row, c = else row or NO_NODE
+        WHILE        a = condition row, b = body row
+        BLOCK        a = first item, b = statement count
+        BINARY       a = left row, b = operator id, c = right row
+        NUMBER       a = constant id
+        IDENTIFIER   a = name id
+
+    Names and operators are ids into `names`, number values ids into
+    `constants`. The children of programs and blocks are consecutive
+    rows of `items`. The Symbols SemanticAnalyzer resolves for names are
+    kept in `symbols`, keyed by row.
+
+    node(row) returns a view of a row, read-only apart from its resolved
+    symbol. Views are created on
+    demand and subclass the ordinary node classes, so anything that
+    dispatches on node type, including SemanticAnalyzer and
+    TACGenerator, walks an arena unchanged.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.a = array("i")
+        self.b = array("i")
+        self.c = array("i")
+        self.items = array("i")
+        self.names = []
+        self.constants = []
+        self.name_ids = {}
+        self.constant_ids = {}
+        self.symbols = {}
+        self.root = NO_NODE
+
+    def add(self, kind, a=0, b=0, c=0):
+        self.kinds.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        return len(self.kinds) - 1
+
+    def name_id(self, name):
+        try:
+            return self.name_ids[name]
+        except KeyError:
+            self.names.append(name)
+            self.name_ids[name] = len(self.names) - 1
+            return len(self.names) - 1
+
+    def constant_id(self, value):
+        try:
+            return self.constant_ids[value]
+        except KeyError:
+            self.constants.append(value)
+            self.constant_ids[value] = len(self.constants) - 1
+            return len(self.constants) - 1
+
+    def add_items(self, rows):
+        first = len(self.items)
+        self.items.extend(rows)
+        return first
+
+    # ---------------------------
+    # Conversion
+    # ---------------------------
+
+    @classmethod
+    def from_ast(cls, program):
+        """Copy an object AST into a new arena, children before parents."""
+        arena = cls()
+        rows = []
+        stack = [(program, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            if not ready:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children()))
+                continue
+
+            count = len(node.children())
+            children = rows[len(rows) - count:]
+            del rows[len(rows) - count:]
+            rows.append(arena._add_node(node, children))
+
+        arena.root = rows[0]
+        return arena
+
+    def _add_node(self, node, children):
+        if isinstance(node, BinaryOp):
+            return self.add(BINARY, children[0], self.name_id(node.operator), children[1])
+        if isinstance(node, Identifier):
+            return self.add(IDENTIFIER, self.name_id(node.name))
+        if isinstance(node, Number):
+            return self.add(NUMBER, self.constant_id(node.value))
+        if isinstance(node, Assignment):
+            return self.add(ASSIGNMENT, self.name_id(node.var_name), children[0])
+        if isinstance(node, Declaration):
+            initializer = children[0] if children else NO_NODE
+            return self.add(DECLARATION, self.name_id(node.var_name), initializer)
+        if isinstance(node, PrintStatement):
+            return self.add(PRINT, children[0])
+        if isinstance(node, IfStatement):
+            false_block = children[2] if len(children) > 2 else NO_NODE
+            return self.add(IF, children[0], children[1], false_block)
+        if isinstance(node, WhileStatement):
+            return self.add(WHILE, children[0], children[1])
+        if isinstance(node, Block):
+            return self.add(BLOCK, self.add_items(children), len(children))
+        if isinstance(node, Program):
+            declarations = len(node.declarations)
+            return self.add(PROGRAM, self.add_items(children), declarations, len(children) - declarations)
+        raise Exception(f"Cannot store {type(node).__name__} in an ASTArena")
+
+    def to_ast(self):
+        """Rebuild ordinary node objects from the arena."""
+        # Rows are stored children first, so one forward pass suffices
+        built = {}
+        for row, kind in enumerate(self.kinds):
+            a, b, c = self.a[row], self.b[row], self.c[row]
+            if kind == BINARY:
+                node = BinaryOp(built.pop(a), self.names[b], built.pop(c))
+            elif kind == IDENTIFIER:
+                node = Identifier(self.names[a])
+            elif kind == NUMBER:
+                node = Number(self.constants[a])
+            elif kind == ASSIGNMENT:
+                node = Assignment(self.names[a], built.pop(b))
+            elif kind == DECLARATION:
+                node = Declaration(self.names[a], None if b == NO_NODE else built.pop(b))
+            elif kind == PRINT:
+                node = PrintStatement(built.pop(a))
+            elif kind == IF:
+                node = IfStatement(built.pop(a), built.pop(b), None if c == NO_NODE else built.pop(c))
+            elif kind == WHILE:
+                node = WhileStatement(built.pop(a), built.pop(b))
+            elif kind == BLOCK:
+                node = Block([built.pop(item) for item in self.items[a:a + b]])
+            else:
+                items = [built.pop(item) for item in self.items[a:a + b + c]]
+                node = Program(items[:b], items[b:])
+            built[row] = node
+        return built[self.root]
+
+    # ---------------------------
+    # Views
+    # ---------------------------
+
+    def node(self, row):
+        if row == NO_NODE:
+            return None
+        return _VIEWS[self.kinds[row]](self, row)
+
+    def program(self):
+        return self.node(self.root)
+
+    def walk(self):
+        """Yield a view of every node, parents first, like ast_nodes.walk."""
+        stack = [self.root]
+        while stack:
+            node = self.node(stack.pop())
+            yield node
+            stack.extend(child.row for child in reversed(node.children()))
+
+    def nbytes(self):
+        """Bytes used by the node and item arrays."""
+        return sum(column.itemsize * len(column) for column in (self.kinds, self.a, self.b, self.c, self.items))
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+# ---------------------------
+# View Classes
+# ---------------------------
+
+_COLUMNS = {
+    "a": lambda arena: arena.a,
+    "b": lambda arena: arena.b,
+    "c": lambda arena: arena.c,
+}
+
+
+def _row_field(column):
+    # A child node stored as a row number in one of the operand columns
+    column = _COLUMNS[column]
+
+    def get(self):
+        arena = self.arena
+        return arena.node(column(arena)[self.row])
+    return property(get)
+
+
+def _name_field(column):
+    column = _COLUMNS[column]
+
+    def get(self):
+        arena = self.arena
+        return arena.names[column(arena)[self.row]]
+    return property(get)
+
+
+def _symbol_field():
+    # The resolved Symbol of a name; unlike the other fields it can be set
+    def get(self):
+        return self.arena.symbols.get(self.row)
+
+    def set(self, symbol):
+        self.arena.symbols[self.row] = symbol
+    return property(get, set)
+
+
+def _items_field(first, count):
+    # A list of child nodes stored as a run of `items`
+    def get(self):
+        arena = self.arena
+        start = arena.a[self.row] + first(arena, self.row)
+        node = arena.node
+        return [node(item) for item in arena.items[start:start + count(arena, self.row)]]
+    return property(get)
+
+
+class NodeView:
+    """
+    Mixin for arena views: a node identified by its arena and row. Every
+    access creates a fresh view, so views compare by position instead
+    of identity.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and self.arena is other.arena and self.row == other.row
+
+    def __hash__(self):
+        return hash((id(self.arena), self.row))
+
+
+def _view_class(node_class, **fields):
+    namespace = {"__slots__": ("arena", "row"), **fields}
+
+    def __init__(self, arena, row):
+        self.arena = arena
+        self.row = row
+
+    namespace["__init__"] = __init__
+    return type(node_class.__name__ + "View", (NodeView, node_class), namespace)
+
+
+ProgramView = _view_class(
+    Program,
+    declarations=_items_field(lambda arena, row: 0, lambda arena, row: arena.b[row]),
+    statements=_items_field(lambda arena, row: arena.b[row], lambda arena, row: arena.c[row]),
+    spans=property(lambda self: None),
+)
+DeclarationView = _view_class(Declaration, var_name=_name_field("a"), initializer=_row_field("b"), symbol=_symbol_field())
+AssignmentView = _view_class(Assignment, var_name=_name_field("a"), expression=_row_field("b"), symbol=_symbol_field())
+PrintStatementView = _view_class(PrintStatement, expression=_row_field("a"))
+IfStatementView = _view_class(IfStatement, condition=_row_field("a"), true_block=_row_field("b"), false_block=_row_field("c"))
+WhileStatementView = _view_class(WhileStatement, condition=_row_field("a"), body=_row_field("b"))
+BlockView = _view_class(Block, statements=_items_field(lambda arena, row: 0, lambda arena, row: arena.b[row]))
+BinaryOpView = _view_class(BinaryOp, left=_row_field("a"), operator=_name_field("b"), right=_row_field("c"))
+NumberView = _view_class(Number, value=property(lambda self: self.arena.constants[self.arena.a[self.row]]))
+IdentifierView = _view_class(Identifier, name=_name_field("a"), symbol=_symbol_field())
+
+_VIEWS = {
+    PROGRAM: ProgramView,
+    DECLARATION: DeclarationView,
+    ASSIGNMENT: AssignmentView,
+    PRINT: PrintStatementView,
+    IF: IfStatementView,
+    WHILE: WhileStatementView,
+    BLOCK: BlockView,
+    BINARY: BinaryOpView,
+    NUMBER: NumberView,
+    IDENTIFIER: IdentifierView,
+}
@@ -1,45 +1,88 @@
 ﻿class ASTNode:
-    pass
+    # Nodes are the most numerous objects in a compilation; no node
+    # class has a per-instance __dict__
+    __slots__ = ()
+
+    def children(self):
+        return ()
+
+
+def walk(node):
+    """Yield `node` and every node below it, parents first."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children()))
 
 
 # Program Structure
 class Program(ASTNode):
-    def __init__(self, declarations, statements):
+    __slots__ = ("declarations", "statements", "spans", "symbol_table")
+
+    def __init__(self, declarations, statements, spans=None):
         self.declarations = declarations
         self.statements = statements
+        # SpanTable with the source location of every node, when parsed
+        self.spans = spans
+        # Filled in by SemanticAnalyzer with the table its symbols are in
+        self.symbol_table = None
 
     def __repr__(self):
         return f"Program(declarations={self.declarations}, statements={self.statements})"
 
+    def children(self):
+        return (*self.declarations, *self.statements)
+
 
 class Declaration(ASTNode):
+    __slots__ = ("var_name", "initializer", "symbol")
+
     def __init__(self, var_name, initializer=None):
         self.var_name = var_name
         self.initializer = initializer
+        # Filled in by SemanticAnalyzer with the declared Symbol
+        self.symbol = None
 
     def __repr__(self):
         return f"Declaration({self.var_name}, init={self.initializer})"
 
+    def children(self):
+        return () if self.initializer is None else (self.initializer,)
+
 
 # Statements
 class Assignment(ASTNode):
+    __slots__ = ("var_name", "expression", "symbol")
+
     def __init__(self, var_name, expression):
         self.var_name = var_name
         self.expression = expression
+        self.symbol = None
 
     def __repr__(self):
         return f"Assignment({self.var_name}, {self.expression})"
 
+    def children(self):
+        return (self.expression,)
+
 
 class PrintStatement(ASTNode):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
 
     def __repr__(self):
         return f"Print({self.expression})"
 
+    def children(self):
+        return (self.expression,)
+
 
 class IfStatement(ASTNode):
+    __slots__ = ("condition", "true_block", "false_block")
+
     def __init__(self, condition, true_block, false_block=None):
         self.condition = condition
         self.true_block = true_block
@@ -48,8 +91,15 @@ class IfStatement(ASTNode):
     def __repr__(self):
         return f"If({self.condition}, {self.true_block}, else={self.false_block})"
 
+    def children(self):
+        if self.false_block is None:
+            return (self.condition, self.true_block)
+        return (self.condition, self.true_block, self.false_block)
+
 
 class WhileStatement(ASTNode):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -57,17 +107,27 @@ class WhileStatement(ASTNode):
     def __repr__(self):
         return f"While({self.condition}, {self.body})"
 
+    def children(self):
+        return (self.condition, self.body)
+
 
 class Block(ASTNode):
+    __slots__ = ("statements",)
+
     def __init__(self, statements):
         self.statements = statements
 
     def __repr__(self):
         return f"Block({self.statements})"
 
+    def children(self):
+        return tuple(self.statements)
+
 
 # Expressions
 class BinaryOp(ASTNode):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -76,8 +136,13 @@ class BinaryOp(ASTNode):
     def __repr__(self):
         return f"BinaryOp({self.left}, {self.operator}, {self.right})"
 
+    def children(self):
+        return (self.left, self.right)
+
 
 class Number(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -86,8 +151,11 @@ class Number(ASTNode):
 
 
 class Identifier(ASTNode):
+    __slots__ = ("name", "symbol")
+
     def __init__(self, name):
         self.name = name
+        self.symbol = None
 
     def __repr__(self):
         return f"Identifier({self.name})"
@@ -0,0 +1,24 @@
+# myparser/errors.py
+
+
+class Diagnostic:
+    """A located syntax error."""
+
+    def __init__(self, message, line, column, start, end):
+        self.message = message
+        self.line = line
+        self.column = column
+        self.start = start
+        self.end = end
+
+    def __str__(self):
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.line}:{self.column}, {self.message!r})"
+
+
+class ParseError(Exception):
+    def __init__(self, diagnostic):
+        super().__init__(diagnostic.message)
+        self.diagnostic = diagnostic
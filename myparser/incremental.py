@@ -0,0 +1,314 @@
+# myparser/incremental.py
+
+import bisect
+from array import array
+from collections import Counter
+
+from lexer.lexer import Lexer
+from semantic.symbol_table import SymbolTable
+from .ast_nodes import Declaration, Assignment, Identifier, Block, walk
+from .errors import Diagnostic
+from .item_index import ItemIndex
+from .parser import Parser
+
+
+def _global_names(item):
+    """
+    Yield (name, True) if the top-level `item` declares a global, then
+    (name, False) for each use inside it of a name that no enclosing
+    block of the use declares.
+    """
+    # Each entry carries the innermost block scope as a (names, outer)
+    # chain. A block-local declaration pushes its name below its own
+    # initializer, so the name is bound only once the initializer is done.
+    stack = [(item, None)]
+    while stack:
+        node, scope = stack.pop()
+        if isinstance(node, str):
+            scope[0].add(node)
+            continue
+
+        if isinstance(node, Declaration):
+            if scope is None:
+                yield node.var_name, True
+            else:
+                stack.append((node.var_name, scope))
+        elif isinstance(node, (Assignment, Identifier)):
+            name = node.var_name if isinstance(node, Assignment) else node.name
+            outer = scope
+            while outer is not None and name not in outer[0]:
+                outer = outer[1]
+            if outer is None:
+                yield name, False
+
+        if isinstance(node, Block):
+            scope = (set(), scope)
+        stack.extend((child, scope) for child in reversed(node.children()))
+
+
+class IncrementalDocument:
+    """
+    A parsed source file that can be edited in place.
+
+    An edit re-lexes and re-parses only the window of top-level
+    declarations and statements it touches. Every other top-level node,
+    and everything below it, is kept as the same object, and the symbol
+    table is updated only for declarations inside the window.
+
+    Edits never rewrite the spans of the nodes after them. The rows of
+    each top-level item keep the offsets and lines it was parsed at, and
+    an ItemIndex tracks where every item starts now; SpanTable.get()
+    adds the distance the item has moved since. An edit costs
+    O(log n) in the number of items on top of the window it reparses,
+    wherever in the file it is.
+
+    Anything the window cannot handle, such as an edit that unbalances
+    braces or a source with syntax errors, falls back to a full reparse.
+    Declaration order inside initializers (`int y = x; int x;`) and
+    errors among block-local names, such as declaring one twice in the
+    same block, are only checked by a full SemanticAnalyzer pass.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.reparse()
+
+    # ---------------------------
+    # Full Parse
+    # ---------------------------
+
+    def reparse(self):
+        self.program = None
+        self.items = ItemIndex([], [])
+        # Each item's rows start at anchor_rows[k], and were recorded at
+        # the offset and line in anchor_origins[k]
+        self.anchor_rows = array("i")
+        self.anchor_items = []
+        self.anchor_origins = []
+        self.anchor_of = {}
+        self.program_row = None
+        self.declaration_count = 0
+        self.errors = []
+        self.symbol_table = SymbolTable()
+        self.declared = Counter()
+        self.uses = Counter()
+        self.undeclared = set()
+        self.redeclared = set()
+        self.last_edit = "full"
+
+        lexer = Lexer(self.text)
+        try:
+            tokens = lexer.tokenize()
+        except Exception as error:
+            self.errors.append(Diagnostic(str(error), lexer.line, 0, lexer.position, lexer.position))
+            return None
+
+        parser = Parser(tokens, recover=True)
+        program = parser.parse()
+        self.program = program
+        self.errors = parser.errors
+        self.spans = program.spans
+        self.spans.shift = self._shift
+        self.program_row = self.spans.rows[program]
+
+        items = [*program.declarations, *program.statements]
+        self.items = ItemIndex(items, self._add_anchors(items, self.spans, 0))
+        self.declaration_count = len(program.declarations)
+        for item in items:
+            self._count_names(item, 1)
+
+        return program
+
+    # ---------------------------
+    # Edits
+    # ---------------------------
+
+    def edit(self, start, end, replacement):
+        """
+        Replace text[start:end] with `replacement` and bring the program,
+        spans and symbol table up to date. Returns the program.
+        """
+        old_text = self.text
+        self.text = old_text[:start] + replacement + old_text[end:]
+
+        if self.errors or not len(self.items) or not self._reparse_window(old_text, start, end, replacement):
+            return self.reparse()
+
+        self.last_edit = "incremental"
+        return self.program
+
+    def _reparse_window(self, old_text, start, end, replacement):
+        items = self.items
+        count = len(items)
+        text = self.text
+
+        # Items touching the edit, plus any that start later on the line
+        # where it ends, since a comment typed there would swallow them
+        newline = old_text.find("\n", end)
+        limit = len(old_text) if newline == -1 else newline
+        first = items.find(start) + 1
+        while first and self._bounds(first - 1)[1] >= start:
+            first -= 1
+        last = items.find(limit)
+
+        if first:
+            previous_start, window_start, previous_line = self._bounds(first - 1)
+            window_line = previous_line + old_text.count("\n", previous_start, window_start)
+        else:
+            window_start = 0
+            window_line = 1
+        delta = len(replacement) - (end - start)
+        line_delta = replacement.count("\n") - old_text.count("\n", start, end)
+        if last + 1 < count:
+            window_end = self._bounds(last + 1)[0] + delta
+        else:
+            window_end = len(text)
+
+        lexer = Lexer(text)
+        lexer.position = window_start
+        lexer.line = window_line
+        lexer.line_start = text.rfind("\n", 0, window_start) + 1
+        try:
+            parser = Parser(lexer.tokenize(window_end))
+            new_items = parser.parse_items()
+        except Exception:
+            return False
+
+        # A Program with no items left takes its span from EOF; let a full
+        # parse work that out
+        declaration_count = self._declaration_count(new_items, first, last)
+        if declaration_count is None or not (new_items or count - (last + 1 - first)):
+            return False
+
+        # Forget the replaced nodes, then splice in the new ones
+        spans = self.spans
+        old_items = [items[index] for index in range(first, last + 1)]
+        for item in old_items:
+            self._count_names(item, -1)
+            self.anchor_items[self.anchor_of.pop(item)] = None
+            for node in walk(item):
+                spans.remove(node)
+
+        offset = spans.merge(parser.spans)
+        positions = self._add_anchors(new_items, parser.spans, offset)
+        items.splice(first, last + 1, new_items, positions, (delta, line_delta))
+        for item in new_items:
+            self._count_names(item, 1)
+
+        # Splice the Program's lists the same way; declarations come first
+        program = self.program
+        old_count = self.declaration_count
+        declarations_start = min(first, old_count)
+        declarations_end = min(last + 1, old_count)
+        leading = declaration_count - old_count + declarations_end - declarations_start
+        program.declarations[declarations_start:declarations_end] = new_items[:leading]
+        program.statements[max(first - old_count, 0):max(last + 1 - old_count, 0)] = new_items[leading:]
+        self.declaration_count = declaration_count
+        self._update_program_span()
+        return True
+
+    def _declaration_count(self, new_items, first, last):
+        """
+        Number of leading declarations after splicing in `new_items`, or
+        None if a declaration would follow a statement.
+        """
+        count = self.declaration_count
+        leading = 0
+        while leading < len(new_items) and isinstance(new_items[leading], Declaration):
+            leading += 1
+        if any(isinstance(item, Declaration) for item in new_items[leading:]):
+            return None
+
+        after = max(0, count - (last + 1))
+        if leading and first > count:
+            return None
+        if leading < len(new_items) and after:
+            return None
+        return min(first, count) + leading + after
+
+    # ---------------------------
+    # Span Bookkeeping
+    # ---------------------------
+
+    def _add_anchors(self, items, spans, offset):
+        """
+        Record where the rows of each of `items` begin, the items having
+        been parsed into `spans` and merged at row `offset`. Returns the
+        (offset, line) each item starts at.
+        """
+        # A top-level item's nodes occupy consecutive rows ending with the
+        # item itself, so each item starts just after its predecessor
+        positions = []
+        next_row = 0
+        for item in items:
+            row = spans.rows[item]
+            origin = (spans.starts[row], spans.lines[row])
+            self.anchor_of[item] = len(self.anchor_items)
+            self.anchor_rows.append(next_row + offset)
+            self.anchor_items.append(item)
+            self.anchor_origins.append(origin)
+            positions.append(origin)
+            next_row = row + 1
+        return positions
+
+    def _shift(self, row):
+        # How far the item owning `row` has moved since it was parsed
+        if row == self.program_row:
+            return 0, 0
+        anchor = bisect.bisect_right(self.anchor_rows, row) - 1
+        offset, line = self.items.position_of(self.anchor_items[anchor])
+        origin_offset, origin_line = self.anchor_origins[anchor]
+        return offset - origin_offset, line - origin_line
+
+    def _bounds(self, index):
+        # (start, end, line) of the item at `index`
+        spans = self.spans
+        row = spans.rows[self.items[index]]
+        start, line = self.items.position(index)
+        return start, start + spans.ends[row] - spans.starts[row], line
+
+    def _update_program_span(self):
+        # The Program spans its items, and starts where the first one does
+        spans = self.spans
+        row = self.program_row
+        spans.starts[row], _, spans.lines[row] = self._bounds(0)
+        spans.ends[row] = self._bounds(len(self.items) - 1)[1]
+        spans.columns[row] = spans.columns[spans.rows[self.items[0]]]
+
+    # ---------------------------
+    # Symbol Bookkeeping
+    # ---------------------------
+
+    def _count_names(self, item, step):
+        changed = set()
+        for name, declared in _global_names(item):
+            if declared:
+                self.declared[name] += step
+            else:
+                self.uses[name] += step
+            changed.add(name)
+
+        for name in changed:
+            declared = self.declared[name]
+            if declared <= 0:
+                del self.declared[name]
+                self.symbol_table.remove(name)
+            elif name not in self.symbol_table.table:
+                self.symbol_table.declare(name, "int")
+            if self.uses[name] <= 0:
+                del self.uses[name]
+
+            if declared > 1:
+                self.redeclared.add(name)
+            else:
+                self.redeclared.discard(name)
+            if declared <= 0 and name in self.uses:
+                self.undeclared.add(name)
+            else:
+                self.undeclared.discard(name)
+
+    @property
+    def semantic_errors(self):
+        errors = [f"Semantic Error: Variable '{name}' already declared." for name in sorted(self.redeclared)]
+        errors += [f"Semantic Error: Variable '{name}' not declared." for name in sorted(self.undeclared)]
+        return errors
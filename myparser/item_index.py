@@ -0,0 +1,268 @@
+# myparser/item_index.py
+
+
+# Chunks are split once they hold twice this many items
+CHUNK_SIZE = 64
+
+
+class _Fenwick:
+    """Prefix sums over a list of ints, with O(log n) updates."""
+
+    def __init__(self, values):
+        tree = [0]
+        tree.extend(values)
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def add(self, index, delta):
+        tree = self.tree
+        index += 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Sum of the first `index` values."""
+        tree = self.tree
+        total = 0
+        while index:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+    def search(self, target):
+        """
+        The largest `index` whose prefix() is at most `target`, with that
+        prefix, for non-negative values.
+        """
+        tree = self.tree
+        index = 0
+        total = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            following = index + step
+            if following < len(tree) and total + tree[following] <= target:
+                index = following
+                total += tree[following]
+            step >>= 1
+        return index, total
+
+
+class _Chunk:
+    __slots__ = ("index", "items", "offsets", "lines", "count_total", "offset_total", "line_total")
+
+    def __init__(self, items, offsets, lines):
+        self.index = 0
+        self.items = items
+        # How far each item starts after the one before it
+        self.offsets = offsets
+        self.lines = lines
+        # What the trees last recorded for the chunk
+        self.count_total = len(items)
+        self.offset_total = sum(offsets)
+        self.line_total = sum(lines)
+
+
+class ItemIndex:
+    """
+    The top-level items of a document in source order, and the offset
+    and line each one starts at.
+
+    Items are stored in chunks, each holding for every item how far it
+    starts after the previous one. Fenwick trees over the chunks sum
+    their item counts and steps, so finding the i-th item or where an
+    item starts costs O(log n + CHUNK_SIZE), and an edit that moves
+    everything after it only changes the step of the next item.
+    Splitting a chunk renumbers the chunks, which is amortized over the
+    CHUNK_SIZE insertions it takes to fill one.
+    """
+
+    def __init__(self, items, positions):
+        self.chunks = []
+        self.chunk_of = {}
+        steps = self._steps(positions, (0, 0))
+        for at in range(0, len(items), CHUNK_SIZE):
+            chunk_steps = steps[at:at + CHUNK_SIZE]
+            self.chunks.append(_Chunk(
+                items[at:at + CHUNK_SIZE],
+                [offset for offset, _ in chunk_steps],
+                [line for _, line in chunk_steps],
+            ))
+        for chunk in self.chunks:
+            for item in chunk.items:
+                self.chunk_of[item] = chunk
+        self._rebuild()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        chunk, at = self._locate(index)
+        return chunk.items[at]
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk.items
+
+    # ---------------------------
+    # Positions
+    # ---------------------------
+
+    def position(self, index):
+        """(offset, line) where the item at `index` starts."""
+        chunk, at = self._locate(index)
+        return self._position(chunk, at)
+
+    def position_of(self, item):
+        """(offset, line) where `item` starts."""
+        chunk = self.chunk_of[item]
+        return self._position(chunk, chunk.items.index(item))
+
+    def find(self, offset):
+        """Index of the last item starting at or before `offset`, or -1."""
+        position, base = self.offsets.search(offset)
+        # Items of chunk `position` start after base, the start of the
+        # previous chunk's last item
+        at = -1
+        if position < len(self.chunks):
+            for step in self.chunks[position].offsets:
+                base += step
+                if base > offset:
+                    break
+                at += 1
+        return self.counts.prefix(position) + at
+
+    def _position(self, chunk, at):
+        offset = self.offsets.prefix(chunk.index) + sum(chunk.offsets[:at + 1])
+        line = self.lines.prefix(chunk.index) + sum(chunk.lines[:at + 1])
+        return offset, line
+
+    def _locate(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("item index out of range")
+        position, before = self.counts.search(index)
+        return self.chunks[position], index - before
+
+    @staticmethod
+    def _steps(positions, previous):
+        steps = []
+        previous_offset, previous_line = previous
+        for offset, line in positions:
+            steps.append((offset - previous_offset, line - previous_line))
+            previous_offset, previous_line = offset, line
+        return steps
+
+    # ---------------------------
+    # Edits
+    # ---------------------------
+
+    def splice(self, first, stop, items, positions, shift):
+        """
+        Replace the items in [first, stop) with `items`, which start at
+        `positions`, while every item after them moves by `shift`, an
+        (offset, line) pair.
+        """
+        count = self.count
+        following = None
+        if stop < count:
+            offset, line = self.position(stop)
+            following = (offset + shift[0], line + shift[1])
+        previous = self.position(first - 1) if first else (0, 0)
+
+        touched = []
+        if first < count:
+            chunk, at = self._locate(first)
+        else:
+            chunk = self.chunks[-1] if self.chunks else None
+            at = len(chunk.items) if chunk is not None else 0
+        if chunk is None:
+            chunk = _Chunk([], [], [])
+            self.chunks.append(chunk)
+            self._rebuild()
+
+        # Remove the old items, which may run across several chunks
+        remove = stop - first
+        position = chunk.index
+        insert_chunk, insert_at = chunk, at
+        while remove:
+            current = self.chunks[position]
+            taken = min(remove, len(current.items) - at)
+            for item in current.items[at:at + taken]:
+                del self.chunk_of[item]
+            del current.items[at:at + taken]
+            del current.offsets[at:at + taken]
+            del current.lines[at:at + taken]
+            touched.append(current)
+            remove -= taken
+            position += 1
+            at = 0
+
+        steps = self._steps(positions, previous)
+        insert_chunk.items[insert_at:insert_at] = items
+        insert_chunk.offsets[insert_at:insert_at] = [offset for offset, _ in steps]
+        insert_chunk.lines[insert_at:insert_at] = [line for _, line in steps]
+        for item in items:
+            self.chunk_of[item] = insert_chunk
+        touched.append(insert_chunk)
+
+        if following is not None:
+            # The first item after the new ones now starts `shift` later,
+            # measured from whichever item precedes it now
+            last = positions[-1] if positions else previous
+            next_chunk, next_at = self._next(insert_chunk, insert_at + len(items))
+            next_chunk.offsets[next_at] = following[0] - last[0]
+            next_chunk.lines[next_at] = following[1] - last[1]
+            touched.append(next_chunk)
+
+        self._update(touched)
+
+    def _next(self, chunk, at):
+        # The item at `at` in `chunk`, or the first one of a later chunk
+        while at == len(chunk.items):
+            chunk = self.chunks[chunk.index + 1]
+            at = 0
+        return chunk, at
+
+    def _update(self, touched):
+        if any(not chunk.items or len(chunk.items) > 2 * CHUNK_SIZE for chunk in touched):
+            chunks = []
+            for chunk in self.chunks:
+                if len(chunk.items) > 2 * CHUNK_SIZE:
+                    for at in range(0, len(chunk.items), CHUNK_SIZE):
+                        piece = _Chunk(chunk.items[at:at + CHUNK_SIZE], chunk.offsets[at:at + CHUNK_SIZE],
+                                       chunk.lines[at:at + CHUNK_SIZE])
+                        for item in piece.items:
+                            self.chunk_of[item] = piece
+                        chunks.append(piece)
+                elif chunk.items:
+                    chunks.append(chunk)
+            self.chunks = chunks
+            self._rebuild()
+            return
+
+        for chunk in set(touched):
+            count_total = len(chunk.items)
+            offset_total = sum(chunk.offsets)
+            line_total = sum(chunk.lines)
+            self.count += count_total - chunk.count_total
+            self.counts.add(chunk.index, count_total - chunk.count_total)
+            self.offsets.add(chunk.index, offset_total - chunk.offset_total)
+            self.lines.add(chunk.index, line_total - chunk.line_total)
+            chunk.count_total = count_total
+            chunk.offset_total = offset_total
+            chunk.line_total = line_total
+
+    def _rebuild(self):
+        # Renumber the chunks and rebuild the trees, O(n / CHUNK_SIZE)
+        for index, chunk in enumerate(self.chunks):
+            chunk.index = index
+            chunk.count_total = len(chunk.items)
+            chunk.offset_total = sum(chunk.offsets)
+            chunk.line_total = sum(chunk.lines)
+        self.count = sum(chunk.count_total for chunk in self.chunks)
+        self.counts = _Fenwick([chunk.count_total for chunk in self.chunks])
+        self.offsets = _Fenwick([chunk.offset_total for chunk in self.chunks])
+        self.lines = _Fenwick([chunk.line_total for chunk in self.chunks])
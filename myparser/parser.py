@@ -1,38 +1,254 @@
-﻿from lexer.token import TokenType
+﻿from types import GeneratorType
+
+from lexer.token import TokenType
+from lexer.token_buffer import TokenBuffer
 from .ast_nodes import *
+from .errors import Diagnostic, ParseError
+from .spans import SpanTable
+
+
+# Binding strength of each binary operator; higher binds tighter
+BINARY_PRECEDENCE = {
+    TokenType.EQUAL: 1,
+    TokenType.NOT_EQUAL: 1,
+    TokenType.GREATER: 2,
+    TokenType.GREATER_EQUAL: 2,
+    TokenType.LESS: 2,
+    TokenType.LESS_EQUAL: 2,
+    TokenType.PLUS: 3,
+    TokenType.MINUS: 3,
+    TokenType.MULTIPLY: 4,
+    TokenType.DIVIDE: 4,
+    TokenType.MOD: 4,
+}
+
+# Tokens that begin a statement or declaration; error recovery resumes
+# parsing when it reaches one of these
+STATEMENT_STARTS = {
+    TokenType.INT,
+    TokenType.IF,
+    TokenType.WHILE,
+    TokenType.PRINT,
+    TokenType.LBRACE,
+}
+
+# Default cap on syntax errors collected in recovery mode
+MAX_ERRORS = 100
+
+
+class _ErrorLimitReached(Exception):
+    pass
 
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, recover=False, max_errors=MAX_ERRORS, share_leaves=False):
+        # Tokens come from a Lexer: a list from tokenize(), or a lazy
+        # stream from iter_tokens(), pulled only as they are needed. Their
+        # offsets are read by position from the TokenLocations the lexer
+        # keeps beside them. A TokenBuffer is read in place through a
+        # single cursor, so no Token objects are created at all; in every
+        # mode, copy fields out of current_token before calling eat().
+        #
+        # With recover=True, a syntax error inside a declaration or
+        # statement is recorded in self.errors and parsing resumes at the
+        # next ";", "}" or statement keyword, so parse() returns a
+        # partial Program holding everything that did parse. Parsing
+        # stops early once max_errors errors have been collected.
+        #
+        # With share_leaves=True, every occurrence of the same number or
+        # name is one Number or Identifier node, so the AST becomes a DAG
+        # whose leaves may have several parents. Uses of a name are not
+        # shared across a block-local declaration of it. A shared leaf
+        # keeps the span of its first occurrence only, which is why the
+        # mode is off by default and not used for incremental editing.
         self.position = 0
-        self.current_token = self.tokens[self.position]
+        self.recover = recover
+        self.max_errors = max_errors
+        self.errors = []
+        self.block_depth = 0
+        self.spans = SpanTable()
+        self.share_leaves = share_leaves
+        self.numbers = {}
+        self.identifiers = {}
+        # End offset of the most recently eaten token
+        self.last_end = 0
+
+        if isinstance(tokens, TokenBuffer):
+            locations = tokens
+            self.tokens = None
+            self.current_token = tokens.cursor()
+            self._advance = self.current_token.advance
+        else:
+            locations = getattr(tokens, "locations", None)
+            if locations is None:
+                raise Exception("Parser needs tokens from a Lexer, which records their locations")
+            self.tokens = iter(tokens)
+            self.current_token = next(self.tokens)
+            self._advance = self._advance_stream
+
+        # Row `position` of these columns locates the current token
+        self.starts = locations.starts
+        self.ends = locations.ends
+        self.line_starts = locations.line_starts
+        self.first_line = locations.first_line
+
+    def _advance_stream(self):
+        self.current_token = next(self.tokens, self.current_token)
 
     def eat(self, token_type):
         if self.current_token.type == token_type:
+            self.last_end = self.ends[self.position]
             self.position += 1
-            if self.position < len(self.tokens):
-                self.current_token = self.tokens[self.position]
+            self._advance()
         else:
-            raise Exception(
-                f"Unexpected token {self.current_token.type}, expected {token_type}"
-            )
+            raise self.error(f"Unexpected token {self.current_token.type}, expected {token_type}")
+
+    def skip(self):
+        if self.current_token.type != TokenType.EOF:
+            self.last_end = self.ends[self.position]
+            self.position += 1
+            self._advance()
+
+    # Error handling
+    def error(self, message):
+        start, line, column = self.mark()
+        return ParseError(Diagnostic(message, line, column, start, self.ends[self.position]))
+
+    def parse_item(self, rule, items):
+        """
+        Parse one declaration or statement with `rule` into `items`,
+        recovering from a syntax error when in recovery mode. A generator
+        for _run(), like the rules that contain blocks.
+        """
+        if not self.recover:
+            items.append((yield rule))
+            return
+
+        position = self.position
+        try:
+            items.append((yield rule))
+        except ParseError as error:
+            self.errors.append(error.diagnostic)
+            if len(self.errors) >= self.max_errors:
+                raise _ErrorLimitReached()
+            self.synchronize(position)
+
+    def synchronize(self, position):
+        """Skip ahead to a point where parsing can resume."""
+        # Always make progress, even when the error was at the first token
+        if self.position == position:
+            self.skip()
+
+        while True:
+            token_type = self.current_token.type
+            if token_type == TokenType.EOF or token_type in STATEMENT_STARTS:
+                return
+            if token_type == TokenType.SEMICOLON:
+                self.skip()
+                return
+            if token_type == TokenType.RBRACE:
+                if self.block_depth:
+                    # Leave it to close the enclosing block
+                    return
+                self.skip()
+                return
+            self.skip()
+
+    # Source spans
+    def mark(self):
+        """Location of the current token, to open a node's span."""
+        line = self.current_token.line
+        start = self.starts[self.position]
+        return start, line, start - self.line_starts[line - self.first_line] + 1
+
+    def finish(self, node, mark):
+        """Close a span opened by mark() at the last eaten token."""
+        start, line, column = mark
+        return self.spans.add(node, start, self.last_end, line, column)
 
     # Entry point
     def parse(self):
+        return self._run(self.program)
+
+    def parse_items(self):
+        """
+        Parse declarations and statements in any order up to EOF, without
+        wrapping them in a Program. Used to reparse part of a file.
+        """
+        items = []
+        while self.current_token.type != TokenType.EOF:
+            items.append(self._run(self.item))
+        return items
+
+    # Statements are parsed without recursion, like expressions. A rule
+    # that contains a block is a generator: it yields the rule for each
+    # nested part and is sent back the node parsed. _run() drives these
+    # generators from an explicit stack, so nesting depth only costs
+    # heap. A syntax error is thrown into the generator that asked for
+    # the failing part, as it would propagate out of a recursive call.
+
+    def _run(self, rule):
+        value = rule()
+        if type(value) is not GeneratorType:
+            return value
+
+        stack = [value]
+        value = None
+        error = None
+        while stack:
+            generator = stack[-1]
+            try:
+                if error is None:
+                    request = generator.send(value)
+                else:
+                    thrown, error = error, None
+                    request = generator.throw(thrown)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            except Exception as raised:
+                stack.pop()
+                if not stack:
+                    raise
+                error = raised
+                continue
+
+            try:
+                value = request()
+            except Exception as raised:
+                error = raised
+                continue
+            if type(value) is GeneratorType:
+                stack.append(value)
+                value = None
+        return value
+
+    def program(self):
+        start = self.mark()
         declarations = []
         statements = []
 
-        while self.current_token.type == TokenType.INT:
-            declarations.append(self.declaration())
+        try:
+            while self.current_token.type == TokenType.INT:
+                yield from self.parse_item(self.declaration, declarations)
 
-        while self.current_token.type != TokenType.EOF:
-            statements.append(self.statement())
+            while self.current_token.type != TokenType.EOF:
+                yield from self.parse_item(self.statement, statements)
+        except _ErrorLimitReached:
+            pass
 
-        return Program(declarations, statements)
+        return self.finish(Program(declarations, statements, self.spans), start)
+
+    def item(self):
+        """A declaration or a statement, as allowed inside a block."""
+        if self.current_token.type == TokenType.INT:
+            return self.declaration()
+        return self.statement()
 
     # Declarations
     def declaration(self):
+        start = self.mark()
         self.eat(TokenType.INT)
         var_name = self.current_token.value
         self.eat(TokenType.IDENTIFIER)
@@ -43,7 +259,11 @@ class Parser:
             initializer = self.expression()
 
         self.eat(TokenType.SEMICOLON)
-        return Declaration(var_name, initializer)
+        if self.share_leaves and self.block_depth:
+            # Later uses name the new local, so they must not share a
+            # leaf with uses of the name it shadows
+            self.identifiers.pop(var_name, None)
+        return self.finish(Declaration(var_name, initializer), start)
 
     # Statements
     def statement(self):
@@ -58,131 +278,161 @@ class Parser:
         elif self.current_token.type == TokenType.LBRACE:
             return self.block()
         else:
-            raise Exception(f"Invalid statement at token {self.current_token}")
+            raise self.error(f"Invalid statement at token {self.current_token}")
 
     def assignment(self):
+        start = self.mark()
         var_name = self.current_token.value
         self.eat(TokenType.IDENTIFIER)
         self.eat(TokenType.ASSIGN)
         expr = self.expression()
         self.eat(TokenType.SEMICOLON)
-        return Assignment(var_name, expr)
+        return self.finish(Assignment(var_name, expr), start)
 
     def print_statement(self):
+        start = self.mark()
         self.eat(TokenType.PRINT)
         self.eat(TokenType.LPAREN)
         expr = self.expression()
         self.eat(TokenType.RPAREN)
         self.eat(TokenType.SEMICOLON)
-        return PrintStatement(expr)
+        return self.finish(PrintStatement(expr), start)
 
     def if_statement(self):
+        start = self.mark()
         self.eat(TokenType.IF)
         self.eat(TokenType.LPAREN)
         condition = self.expression()
         self.eat(TokenType.RPAREN)
 
-        true_block = self.block()
+        true_block = yield self.block
 
         false_block = None
         if self.current_token.type == TokenType.ELSE:
             self.eat(TokenType.ELSE)
-            false_block = self.block()
+            false_block = yield self.block
 
-        return IfStatement(condition, true_block, false_block)
+        return self.finish(IfStatement(condition, true_block, false_block), start)
 
     def while_statement(self):
+        start = self.mark()
         self.eat(TokenType.WHILE)
         self.eat(TokenType.LPAREN)
         condition = self.expression()
         self.eat(TokenType.RPAREN)
-        body = self.block()
-        return WhileStatement(condition, body)
+        body = yield self.block
+        return self.finish(WhileStatement(condition, body), start)
 
     def block(self):
+        start = self.mark()
         self.eat(TokenType.LBRACE)
         statements = []
 
-        while self.current_token.type != TokenType.RBRACE:
-            statements.append(self.statement())
+        # Declarations may appear anywhere in a block and are local to it
+        self.block_depth += 1
+        try:
+            while self.current_token.type not in (TokenType.RBRACE, TokenType.EOF):
+                yield from self.parse_item(self.item, statements)
+        finally:
+            self.block_depth -= 1
+            if self.share_leaves:
+                self.forget_locals(statements)
 
         self.eat(TokenType.RBRACE)
-        return Block(statements)
+        return self.finish(Block(statements), start)
 
-    # Expression parsing with precedence:
-    # equality -> relational -> additive -> multiplicative -> factor
+    # Expression parsing by precedence climbing over BINARY_PRECEDENCE.
+    # Operands and pending operators live on explicit stacks, so neither
+    # long operator chains nor deep parenthesis nesting grow the Python
+    # call stack. All binary operators are left-associative.
 
     def expression(self):
-        return self.equality()
-
-    def equality(self):
-        node = self.relational()
-        while self.current_token.type in (TokenType.EQUAL, TokenType.NOT_EQUAL):
-            operator = self.current_token.value
-            if self.current_token.type == TokenType.EQUAL:
-                self.eat(TokenType.EQUAL)
-            else:
-                self.eat(TokenType.NOT_EQUAL)
-            node = BinaryOp(node, operator, self.relational())
-        return node
-
-    def relational(self):
-        node = self.additive()
-        while self.current_token.type in (
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.current_token.value
-            if self.current_token.type == TokenType.GREATER:
-                self.eat(TokenType.GREATER)
-            elif self.current_token.type == TokenType.GREATER_EQUAL:
-                self.eat(TokenType.GREATER_EQUAL)
-            elif self.current_token.type == TokenType.LESS:
-                self.eat(TokenType.LESS)
-            else:
-                self.eat(TokenType.LESS_EQUAL)
-            node = BinaryOp(node, operator, self.additive())
-        return node
-
-    def additive(self):
-        node = self.term()
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            operator = self.current_token.value
-            if self.current_token.type == TokenType.PLUS:
-                self.eat(TokenType.PLUS)
-            else:
-                self.eat(TokenType.MINUS)
-            node = BinaryOp(node, operator, self.term())
-        return node
-
-    def term(self):
-        node = self.factor()
-        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MOD):
-            operator = self.current_token.value
-            if self.current_token.type == TokenType.MULTIPLY:
-                self.eat(TokenType.MULTIPLY)
-            elif self.current_token.type == TokenType.DIVIDE:
-                self.eat(TokenType.DIVIDE)
-            else:
-                self.eat(TokenType.MOD)
-            node = BinaryOp(node, operator, self.factor())
-        return node
-
-    def factor(self):
+        precedence_of = BINARY_PRECEDENCE.get
+        operands = []       # expression nodes
+        starts = []         # mark() of each operand, parentheses excluded
+        ends = []           # end offset of each operand, parentheses included
+        operators = []      # (precedence, operator), or None for an open "("
+
+        def reduce():
+            right = operands.pop()
+            starts.pop()
+            end = ends.pop()
+            left = operands.pop()
+            operator = operators.pop()[1]
+            start, line, column = starts[-1]
+            operands.append(self.spans.add(BinaryOp(left, operator, right), start, end, line, column))
+            ends[-1] = end
+
+        open_parens = 0
+        while True:
+            # Operand position: any number of "(", then a primary
+            while self.current_token.type == TokenType.LPAREN:
+                self.eat(TokenType.LPAREN)
+                operators.append(None)
+                open_parens += 1
+            starts.append(self.mark())
+            operands.append(self.primary())
+            ends.append(self.last_end)
+
+            # Operator position: close groups until a binary operator
+            # continues the expression, or anything else ends it
+            while True:
+                token_type = self.current_token.type
+                precedence = precedence_of(token_type)
+
+                if precedence is not None:
+                    while operators and operators[-1] is not None and operators[-1][0] >= precedence:
+                        reduce()
+                    operators.append((precedence, self.current_token.value))
+                    self.eat(token_type)
+                    break
+
+                if token_type == TokenType.RPAREN and open_parens:
+                    while operators[-1] is not None:
+                        reduce()
+                    operators.pop()
+                    open_parens -= 1
+                    self.eat(TokenType.RPAREN)
+                    ends[-1] = self.last_end
+                    continue
+
+                if open_parens:
+                    # Reports the missing ")" against the current token
+                    self.eat(TokenType.RPAREN)
+
+                while operators:
+                    reduce()
+                return operands[0]
+
+    def primary(self):
         token = self.current_token
 
         if token.type == TokenType.NUMBER:
+            start = self.mark()
+            value = token.value
             self.eat(TokenType.NUMBER)
-            return Number(token.value)
+            if self.share_leaves:
+                return self.shared_leaf(self.numbers, value, Number, start)
+            return self.finish(Number(value), start)
         elif token.type == TokenType.IDENTIFIER:
+            start = self.mark()
+            name = token.value
             self.eat(TokenType.IDENTIFIER)
-            return Identifier(token.value)
-        elif token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
-            node = self.expression()
-            self.eat(TokenType.RPAREN)
-            return node
+            if self.share_leaves:
+                return self.shared_leaf(self.identifiers, name, Identifier, start)
+            return self.finish(Identifier(name), start)
         else:
-            raise Exception(f"Invalid expression at token {token}")
+            raise self.error(f"Invalid expression at token {token}")
+
+    def forget_locals(self, statements):
+        # Identifiers used inside a block after one of its declarations
+        # name the local, not whatever the name means outside the block
+        for statement in statements:
+            if isinstance(statement, Declaration):
+                self.identifiers.pop(statement.var_name, None)
+
+    def shared_leaf(self, pool, key, node_type, start):
+        node = pool.get(key)
+        if node is None:
+            node = pool[key] = self.finish(node_type(key), start)
+        return node
@@ -0,0 +1,83 @@
+# myparser/spans.py
+
+from array import array
+from collections import namedtuple
+
+
+Span = namedtuple("Span", ["start", "end", "line", "column"])
+
+
+class SpanTable:
+    """
+    Source locations for AST nodes.
+
+    Spans are kept here rather than on the nodes: each node maps to one
+    row across parallel integer columns holding the [start, end) offsets
+    of its text and the line and column it starts at.
+
+    An owner that moves nodes without rewriting their rows, such as
+    IncrementalDocument after an edit before them, sets `shift` to a
+    function from a row to the (offset, line) distance it has moved,
+    which get() adds in.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.starts = array("i")
+        self.ends = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        self.shift = None
+
+    def add(self, node, start, end, line, column):
+        self.rows[node] = len(self.starts)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.columns.append(column)
+        return node
+
+    def extend(self, node, first, end):
+        """Record a span for `node` that starts where `first` starts."""
+        row = self.rows[first]
+        return self.add(node, self.starts[row], end, self.lines[row], self.columns[row])
+
+    def get(self, node):
+        row = self.rows.get(node)
+        if row is None:
+            return None
+
+        start, end, line = self.starts[row], self.ends[row], self.lines[row]
+        if self.shift is not None:
+            offset, lines = self.shift(row)
+            start += offset
+            end += offset
+            line += lines
+        return Span(start, end, line, self.columns[row])
+
+    def remove(self, node):
+        """Forget a node; its row is left in place but unreachable."""
+        del self.rows[node]
+
+    def merge(self, other):
+        """Append every row of `other`, keeping its node mapping."""
+        offset = len(self.starts)
+        self.starts.extend(other.starts)
+        self.ends.extend(other.ends)
+        self.lines.extend(other.lines)
+        self.columns.extend(other.columns)
+        for node, row in other.rows.items():
+            self.rows[node] = row + offset
+        return offset
+
+    def nbytes(self):
+        """Approximate bytes held by the table, including its node index."""
+        columns = (self.starts, self.ends, self.lines, self.columns)
+        size = sum(column.buffer_info()[1] * column.itemsize for column in columns)
+        return size + self.rows.__sizeof__()
+
+    def __contains__(self, node):
+        return node in self.rows
+
+    def __len__(self):
+        return len(self.starts)
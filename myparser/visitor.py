@@ -0,0 +1,77 @@
+# myparser/visitor.py
+
+from types import GeneratorType
+
+
+class NodeVisitor:
+    """
+    Base class for passes over the AST.
+
+    visit(node) calls the method named `method_prefix` + the node's class
+    name, e.g. visit_BinaryOp, falling back to methods for the node's
+    base classes and finally to `fallback_method`. Each subclass keeps a
+    table from node type to function, so the method name is only built
+    and looked up the first time a type is seen.
+
+    A method may be a generator instead of recursing into children
+    itself: each `yield child` visits the child and sends back its
+    result, and the generator's return value is the method's result.
+    visit() runs such methods on an explicit stack, so the depth of the
+    tree is not limited by Python's recursion limit. Methods for leaves
+    can stay plain functions, which is cheaper. A method must not return
+    a generator as its result.
+    """
+
+    method_prefix = "visit_"
+    fallback_method = "generic_visit"
+
+    # Filled in lazily; every subclass gets its own table
+    _dispatch_table = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = {}
+
+    def visit(self, node):
+        table = self._dispatch_table
+        try:
+            method = table[type(node)]
+        except KeyError:
+            method = table[type(node)] = self.resolve(type(node))
+        value = method(self, node)
+        if type(value) is not GeneratorType:
+            return value
+
+        # Trampoline: each generator on the stack is waiting for the
+        # result of the child it last yielded
+        stack = [value]
+        value = None
+        while stack:
+            try:
+                node = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+
+            try:
+                method = table[type(node)]
+            except KeyError:
+                method = table[type(node)] = self.resolve(type(node))
+            value = method(self, node)
+            if type(value) is GeneratorType:
+                stack.append(value)
+                value = None
+        return value
+
+    @classmethod
+    def resolve(cls, node_type):
+        """Find the function that visits nodes of `node_type`."""
+        for klass in node_type.__mro__:
+            method = getattr(cls, cls.method_prefix + klass.__name__, None)
+            if method is not None:
+                return method
+        return getattr(cls, cls.fallback_method)
+
+    def generic_visit(self, node):
+        raise Exception(f"No {self.method_prefix}{type(node).__name__} method defined")
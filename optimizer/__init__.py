@@ -0,0 +1,33 @@
+"""
+Optimization package
+
+Exposes:
+- optimize
+- ConstantFolder, ValueNumbering, DeadCodeElimination, TempAllocator
+- BasicBlock, split_blocks, ControlFlowGraph
+- live_variables, live_intervals
+- evaluate
+"""
+
+from .folding import ConstantFolder, evaluate
+from .blocks import BasicBlock, split_blocks
+from .cfg import ControlFlowGraph
+from .dead_code import DeadCodeElimination
+from .liveness import live_variables, live_intervals
+from .allocation import TempAllocator
+from .passes import optimize
+from .value_numbering import ValueNumbering
+
+__all__ = [
+    "optimize",
+    "ConstantFolder",
+    "ValueNumbering",
+    "DeadCodeElimination",
+    "TempAllocator",
+    "BasicBlock",
+    "split_blocks",
+    "ControlFlowGraph",
+    "live_variables",
+    "live_intervals",
+    "evaluate",
+]
@@ -0,0 +1,73 @@
+# optimizer/allocation.py
+
+import heapq
+
+from intermediate.ir import Instr
+from semantic.symbol_table import Symbol
+from .liveness import live_intervals
+
+
+class TempAllocator:
+    """
+    Linear-scan allocation of temporaries onto a reusable pool.
+
+    TACGenerator gives every operation a new temporary, but few are live
+    at once. Taking the live intervals in order of their start, each
+    temporary reuses the name of one whose interval has ended, or keeps
+    its own if none has, so the pool grows to exactly the largest number
+    of temporaries live at the same point. An instruction reads its
+    operands before writing its result, so `t2 = t1 + 1` may write the
+    t1 it reads.
+    """
+
+    def __init__(self):
+        self.max_live_temps = 0
+        self.reused_temps = 0
+
+    def counts(self):
+        return {
+            "max_live_temps": self.max_live_temps,
+            "reused_temps": self.reused_temps,
+        }
+
+    def run(self, code):
+        symbols = {}
+        for instr in code:
+            for operand in (instr.dest, instr.left, instr.right):
+                if isinstance(operand, Symbol) and operand.type == "temp":
+                    symbols[operand.id] = operand
+        if not symbols:
+            return code
+
+        intervals = live_intervals(code)
+        # Active intervals as (end, id of the pooled symbol) in a heap,
+        # and pooled symbols whose intervals have ended
+        active = []
+        free = []
+        assigned = {}
+        for symbol_id, (start, end) in sorted(intervals.items(), key=lambda item: item[1][0]):
+            while active and active[0][0] < start:
+                free.append(heapq.heappop(active)[1])
+            if free:
+                pooled = free.pop()
+                self.reused_temps += 1
+            else:
+                pooled = symbol_id
+            assigned[symbol_id] = symbols[pooled]
+            heapq.heappush(active, (end, pooled))
+            self.max_live_temps = max(self.max_live_temps, len(active))
+
+        def rename(operand):
+            if isinstance(operand, Symbol) and operand.type == "temp":
+                return assigned[operand.id]
+            return operand
+
+        out = []
+        for instr in code:
+            dest = rename(instr.dest)
+            left = rename(instr.left)
+            right = rename(instr.right)
+            if dest is not instr.dest or left is not instr.left or right is not instr.right:
+                instr = Instr(instr.op, dest, left, instr.operator, right, instr.label)
+            out.append(instr)
+        return out
@@ -0,0 +1,56 @@
+# optimizer/blocks.py
+
+from intermediate.ir import Op
+
+
+class BasicBlock:
+    """
+    A maximal run of TAC instructions that is only entered at its first
+    instruction and only left after its last.
+
+    A block starts at a label or after a jump, so any label is its first
+    instruction and any `goto` or `ifFalse` its last. `successors` and
+    `predecessors` are filled in by ControlFlowGraph.
+    """
+
+    __slots__ = ("index", "code", "successors", "predecessors")
+
+    def __init__(self, index, code):
+        self.index = index
+        self.code = code
+        self.successors = []
+        self.predecessors = []
+
+    @property
+    def label(self):
+        """The label that starts the block, or None."""
+        code = self.code
+        if code and code[0].op == Op.LABEL:
+            return code[0].label
+        return None
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {len(self.code)} instructions)"
+
+
+def split_blocks(code):
+    """Split a list of TAC instructions into a list of BasicBlocks."""
+    blocks = []
+    current = []
+    for instr in code:
+        op = instr.op
+        if op == Op.LABEL and current:
+            blocks.append(BasicBlock(len(blocks), current))
+            current = []
+        current.append(instr)
+        if op == Op.GOTO or op == Op.IF_FALSE:
+            blocks.append(BasicBlock(len(blocks), current))
+            current = []
+    if current:
+        blocks.append(BasicBlock(len(blocks), current))
+    return blocks
+
+
+def join_blocks(blocks):
+    """The instructions of `blocks`, in order, as one list."""
+    return [instr for block in blocks for instr in block.code]
@@ -0,0 +1,46 @@
+# optimizer/cfg.py
+
+from intermediate.ir import Op
+from .blocks import split_blocks, join_blocks
+
+
+class ControlFlowGraph:
+    """
+    The basic blocks of a TAC list and the jumps between them.
+
+    `blocks` are in program order, with blocks[0] the entry. A block's
+    successors are the block it falls through to, unless it ends in a
+    `goto`, and the block an ending `goto` or `ifFalse` jumps to.
+    """
+
+    def __init__(self, code):
+        self.blocks = blocks = split_blocks(code)
+        self.block_of_label = {block.label: block for block in blocks if block.label is not None}
+
+        for index, block in enumerate(blocks):
+            last = block.code[-1]
+            successors = block.successors
+            if last.op != Op.GOTO and index + 1 < len(blocks):
+                successors.append(blocks[index + 1])
+            if last.op == Op.GOTO or last.op == Op.IF_FALSE:
+                target = self.block_of_label.get(last.label)
+                if target is None:
+                    raise Exception(f"Jump to undefined label L{last.label}")
+                if target not in successors:
+                    successors.append(target)
+            for successor in successors:
+                successor.predecessors.append(block)
+
+    def reachable(self):
+        """Indexes of the blocks some path from the entry reaches."""
+        seen = set()
+        stack = self.blocks[:1]
+        while stack:
+            block = stack.pop()
+            if block.index not in seen:
+                seen.add(block.index)
+                stack.extend(block.successors)
+        return seen
+
+    def code(self):
+        return join_blocks(self.blocks)
@@ -0,0 +1,166 @@
+# optimizer/dead_code.py
+
+from intermediate.ir import Instr, Op
+from semantic.symbol_table import Symbol
+from .cfg import ControlFlowGraph
+from .folding import may_trap
+from .liveness import live_variables
+
+
+class DeadCodeElimination:
+    """
+    Control-flow cleanup and dead-store elimination over the CFG.
+
+    Conditional jumps on constants are first resolved, and jumps are
+    threaded: a jump to a label that only leads on to another jump or
+    label goes straight to the final target. Jumps to the instruction
+    that follows anyway, blocks no path from the entry reaches and
+    labels nothing jumps to are then removed, repeating until none are
+    left.
+
+    Last, liveness analysis finds stores whose value no later
+    instruction can read, and removes them. Operations cannot fail
+    except by dividing by zero, so a division or remainder that may_trap()
+    stays, dead or not, and -O never removes a run-time error.
+    """
+
+    def __init__(self):
+        self.branches = 0
+        self.threaded = 0
+        self.jumps = 0
+        self.unreachable = 0
+        self.dead_stores = 0
+
+    def counts(self):
+        return {
+            "branches": self.branches,
+            "threaded": self.threaded,
+            "jumps": self.jumps,
+            "unreachable": self.unreachable,
+            "dead_stores": self.dead_stores,
+        }
+
+    def run(self, code):
+        if not code:
+            return code
+        changed = True
+        while changed:
+            before = len(code)
+            code = self.thread_jumps(code)
+            code = self.remove_unreachable(code)
+            code = self.remove_unused_labels(code)
+            changed = len(code) != before
+        return self.remove_dead_stores(code)
+
+    # ---------------------------
+    # Jumps
+    # ---------------------------
+
+    def thread_jumps(self, code):
+        cfg = ControlFlowGraph(code)
+        targets = {}
+
+        def final_target(label):
+            # Follow blocks made of a label and at most a goto: either
+            # they fall through to the next block, which starts with a
+            # label, or they jump on
+            target = targets.get(label)
+            if target is not None:
+                return target
+            block = cfg.block_of_label[label]
+            seen = set()
+            while len(block.code) <= 2 and block.successors and block.index not in seen:
+                if len(block.code) == 2 and block.code[1].op != Op.GOTO:
+                    break
+                seen.add(block.index)
+                block = block.successors[0]
+            target = targets[label] = block.label
+            return target
+
+        out = []
+        for index, instr in enumerate(code):
+            op = instr.op
+            if op == Op.IF_FALSE and type(instr.left) is int:
+                # A condition an earlier pass made constant
+                self.branches += 1
+                if instr.left:
+                    continue
+                op = Op.GOTO
+                instr = Instr(op, label=instr.label)
+            if op == Op.GOTO or op == Op.IF_FALSE:
+                label = final_target(instr.label)
+                if _falls_through_to(code, index + 1, label, final_target):
+                    self.jumps += 1
+                    continue
+                if label != instr.label:
+                    self.threaded += 1
+                    instr = Instr(op, left=instr.left, label=label)
+            out.append(instr)
+        return out
+
+    def remove_unreachable(self, code):
+        cfg = ControlFlowGraph(code)
+        reachable = cfg.reachable()
+        if len(reachable) == len(cfg.blocks):
+            return code
+        kept = []
+        for block in cfg.blocks:
+            if block.index in reachable:
+                kept.extend(block.code)
+            else:
+                self.unreachable += len(block.code)
+        return kept
+
+    def remove_unused_labels(self, code):
+        used = {instr.label for instr in code if instr.op == Op.GOTO or instr.op == Op.IF_FALSE}
+        return [instr for instr in code if instr.op != Op.LABEL or instr.label in used]
+
+    # ---------------------------
+    # Stores
+    # ---------------------------
+
+    def remove_dead_stores(self, code):
+        # A removed store can leave the stores feeding it dead in other
+        # blocks, so repeat until a round removes nothing. Removing
+        # stores never changes the shape of the graph.
+        cfg = ControlFlowGraph(code)
+        removed = True
+        while removed:
+            removed = False
+            _, live_out = live_variables(cfg)
+            for block in cfg.blocks:
+                # Changes within the block go in a dict by id, which is
+                # cheaper than shifting the bits of temporaries with
+                # large ids in and out of the bitset
+                live_at_end = live_out[block.index]
+                live = {}
+                kept = []
+                for instr in reversed(block.code):
+                    dest = instr.dest
+                    if dest is not None:
+                        symbol_id = dest.id
+                        is_live = live.get(symbol_id)
+                        if is_live is None:
+                            is_live = live_at_end >> symbol_id & 1
+                        if not is_live and not may_trap(instr):
+                            self.dead_stores += 1
+                            removed = True
+                            continue
+                        live[symbol_id] = False
+                    for operand in (instr.left, instr.right):
+                        if isinstance(operand, Symbol):
+                            live[operand.id] = True
+                    kept.append(instr)
+                kept.reverse()
+                block.code = kept
+        return cfg.code()
+
+
+def _falls_through_to(code, index, label, final_target):
+    # Whether control reaches label `label` from code[index] anyway: only
+    # labels stand in between, and one of them leads to the same place
+    while index < len(code) and code[index].op == Op.LABEL:
+        if final_target(code[index].label) == label:
+            return True
+        index += 1
+    return False
@@ -0,0 +1,274 @@
+# optimizer/folding.py
+
+from intermediate.ir import Instr, Op
+from semantic.symbol_table import Symbol
+
+
+def evaluate(operator, left, right):
+    """
+    The value of `left operator right` as the target language computes
+    it: `/` truncates toward zero and `%` takes the sign of the dividend,
+    as in C, and comparisons give 1 or 0. Returns None for a division or
+    remainder by zero, which is left for run time.
+    """
+    if operator == "+":
+        return left + right
+    if operator == "-":
+        return left - right
+    if operator == "*":
+        return left * right
+    if operator == "/" or operator == "%":
+        if right == 0:
+            return None
+        quotient = abs(left) // abs(right)
+        if (left < 0) != (right < 0):
+            quotient = -quotient
+        return quotient if operator == "/" else left - right * quotient
+    if operator == "<<":
+        return left << right
+    if operator == "==":
+        return int(left == right)
+    if operator == "!=":
+        return int(left != right)
+    if operator == "<":
+        return int(left < right)
+    if operator == "<=":
+        return int(left <= right)
+    if operator == ">":
+        return int(left > right)
+    if operator == ">=":
+        return int(left >= right)
+    raise Exception(f"Unknown operator '{operator}'")
+
+
+# Folded values stay within a signed 64-bit word. Beyond it, chains of
+# multiplications would build ever larger ints at compile time, so the
+# operation is left for run time instead.
+FOLD_LIMIT = 1 << 63
+
+
+def fold(operator, left, right):
+    """evaluate(), or None if the value is out of the folding range."""
+    value = evaluate(operator, left, right)
+    if value is not None and not -FOLD_LIMIT <= value < FOLD_LIMIT:
+        return None
+    return value
+
+
+def _is(operand, constant):
+    return type(operand) is int and operand == constant
+
+
+# Comparisons of an operand with itself
+_SELF_COMPARISONS = {"==": 1, "<=": 1, ">=": 1, "!=": 0, "<": 0, ">": 0}
+
+
+def simplify(operator, left, right):
+    """
+    The single operand `left operator right` reduces to by an algebraic
+    identity, such as `x + 0` or `x * 0`, or None. Operands are never
+    expressions, so dropping one cannot drop a side effect.
+    """
+    if operator == "+":
+        if _is(right, 0):
+            return left
+        if _is(left, 0):
+            return right
+    elif operator == "-":
+        if _is(right, 0):
+            return left
+        if left is right:
+            return 0
+    elif operator == "*":
+        if _is(right, 1):
+            return left
+        if _is(left, 1):
+            return right
+        if _is(left, 0) or _is(right, 0):
+            return 0
+    elif operator == "/":
+        if _is(right, 1):
+            return left
+    elif operator == "%":
+        if _is(right, 1):
+            return 0
+    elif left is right:
+        return _SELF_COMPARISONS.get(operator)
+    return None
+
+
+def strength_reduce(operator, left, right):
+    """
+    A cheaper (operator, left, right) for a multiplication by a power of
+    two: `x + x` for 2, a shift for larger powers. None otherwise.
+    """
+    if operator != "*":
+        return None
+    if type(left) is int:
+        left, right = right, left
+    if type(right) is not int or right < 2 or right & (right - 1):
+        return None
+    if right == 2:
+        return "+", left, left
+    return "<<", left, right.bit_length() - 1
+
+
+class ConstantFolder:
+    """
+    Folds constants through a list of TAC instructions.
+
+    Within each straight-line run of code, an instruction whose operands
+    are all known constants is replaced by its value, identities such as
+    `x * 1` collapse to a copy, and multiplications by powers of two are
+    strength-reduced. Temporaries defined by a constant or a copy are
+    substituted into the instructions that read them, and temporaries
+    nothing reads any more are removed. A conditional jump on a constant
+    becomes a `goto` or disappears; DeadCodeElimination then removes the
+    code it can no longer reach.
+
+    Counts of each kind of rewrite are kept on the instance.
+    """
+
+    def __init__(self):
+        self.folded = 0
+        self.simplified = 0
+        self.reduced = 0
+        self.branches = 0
+
+    def counts(self):
+        return {
+            "folded": self.folded,
+            "simplified": self.simplified,
+            "reduced": self.reduced,
+            "branches": self.branches,
+        }
+
+    def run(self, code):
+        return remove_unused_temps(self.propagate(code))
+
+    def propagate(self, code):
+        out = []
+        emit = out.append
+        # Known value of a temporary by symbol id: an int or a Symbol it
+        # copies. A value is only valid until the next label, and a copy
+        # only until its source is assigned again.
+        values = {}
+        copies_of = {}
+
+        def value(operand):
+            if isinstance(operand, Symbol):
+                return values.get(operand.id, operand)
+            return operand
+
+        def assign(dest, operand):
+            # Forget temporaries that copy the symbol being overwritten,
+            # then record its new value if it is a known temporary
+            for temp in copies_of.pop(dest.id, ()):
+                if values.get(temp) is dest:
+                    del values[temp]
+            values.pop(dest.id, None)
+            if operand is None or dest.type != "temp":
+                return
+            values[dest.id] = operand
+            if isinstance(operand, Symbol):
+                copies_of.setdefault(operand.id, []).append(dest.id)
+
+        for instr in code:
+            op = instr.op
+            if op == Op.BINARY:
+                left = value(instr.left)
+                right = value(instr.right)
+                operator = instr.operator
+                dest = instr.dest
+                result = None
+                if type(left) is int and type(right) is int:
+                    result = fold(operator, left, right)
+                    if result is not None:
+                        self.folded += 1
+                if result is None:
+                    result = simplify(operator, left, right)
+                    if result is not None:
+                        self.simplified += 1
+                if result is not None:
+                    emit(Instr(Op.COPY, dest, result))
+                    assign(dest, result)
+                    continue
+
+                reduced = strength_reduce(operator, left, right)
+                if reduced is not None:
+                    self.reduced += 1
+                    operator, left, right = reduced
+                if left is not instr.left or right is not instr.right or operator is not instr.operator:
+                    instr = Instr(Op.BINARY, dest, left, operator, right)
+                emit(instr)
+                assign(dest, None)
+
+            elif op == Op.COPY:
+                left = value(instr.left)
+                if left is not instr.left:
+                    instr = Instr(Op.COPY, instr.dest, left)
+                emit(instr)
+                assign(instr.dest, left)
+
+            elif op == Op.IF_FALSE:
+                condition = value(instr.left)
+                if type(condition) is int:
+                    self.branches += 1
+                    if condition == 0:
+                        emit(Instr(Op.GOTO, label=instr.label))
+                    continue
+                if condition is not instr.left:
+                    instr = Instr(Op.IF_FALSE, left=condition, label=instr.label)
+                emit(instr)
+
+            elif op == Op.PRINT:
+                left = value(instr.left)
+                if left is not instr.left:
+                    instr = Instr(Op.PRINT, left=left)
+                emit(instr)
+
+            else:
+                if op == Op.LABEL:
+                    values.clear()
+                    copies_of.clear()
+                emit(instr)
+        return out
+
+
+def may_trap(instr):
+    """
+    Whether `instr` divides, or takes a remainder, by anything but a
+    non-zero constant. It may stop the program at run time, so it is
+    kept even when nothing reads its result.
+    """
+    return (
+        instr.op == Op.BINARY
+        and (instr.operator == "/" or instr.operator == "%")
+        and not (type(instr.right) is int and instr.right != 0)
+    )
+
+
+def remove_unused_temps(code):
+    """
+    Drop definitions of temporaries that no instruction reads, except
+    ones that may_trap().
+    """
+    uses = {}
+    for instr in code:
+        for operand in (instr.left, instr.right):
+            if isinstance(operand, Symbol):
+                uses[operand.id] = uses.get(operand.id, 0) + 1
+
+    # Backwards, so that dropping a definition can free the temporaries
+    # it read
+    kept = []
+    for instr in reversed(code):
+        dest = instr.dest
+        if dest is not None and dest.type == "temp" and not uses.get(dest.id) and not may_trap(instr):
+            for operand in (instr.left, instr.right):
+                if isinstance(operand, Symbol):
+                    uses[operand.id] -= 1
+            continue
+        kept.append(instr)
+    kept.reverse()
+    return kept
@@ -0,0 +1,114 @@
+# optimizer/liveness.py
+
+from semantic.symbol_table import Symbol
+from .cfg import ControlFlowGraph
+
+
+# Sets of symbols are Python ints with bit `symbol.id` set for each
+# member, so union, difference and comparison are single int operations
+# however many symbols a program has.
+
+def uses_and_definitions(block):
+    """
+    The symbols `block` reads before writing them, and the symbols it
+    writes, as bitsets.
+    """
+    uses = set()
+    definitions = set()
+    for instr in block.code:
+        for operand in (instr.left, instr.right):
+            if isinstance(operand, Symbol) and operand.id not in definitions:
+                uses.add(operand.id)
+        if instr.dest is not None:
+            definitions.add(instr.dest.id)
+    return bitset(uses), bitset(definitions)
+
+
+def live_variables(cfg):
+    """
+    Solve liveness over a ControlFlowGraph. Returns two lists indexed by
+    block index: the bitsets of symbols live on entry to each block and
+    on exit from it. Only `print` observes values, so nothing is live
+    at the end of the program.
+    """
+    blocks = cfg.blocks
+    summaries = [uses_and_definitions(block) for block in blocks]
+    live_in = [0] * len(blocks)
+    live_out = [0] * len(blocks)
+
+    # Liveness flows backwards, so visiting blocks last to first settles
+    # straight-line code in one round; loops take a few more
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(blocks):
+            index = block.index
+            out = 0
+            for successor in block.successors:
+                out |= live_in[successor.index]
+            uses, definitions = summaries[index]
+            entry = uses | (out & ~definitions)
+            if entry != live_in[index] or out != live_out[index]:
+                live_in[index] = entry
+                live_out[index] = out
+                changed = True
+    return live_in, live_out
+
+
+def bitset(ids):
+    """The bitset with bit `id` set for each of `ids`."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    # Setting bits one at a time would copy the growing int each time
+    bits = bytearray((max(ids) >> 3) + 1)
+    for symbol_id in ids:
+        bits[symbol_id >> 3] |= 1 << (symbol_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def live_intervals(code):
+    """
+    The live interval of each temporary in `code`, as a dict from symbol
+    id to [first, last] point. Instruction i reads its operands at point
+    2 * i and writes its result at point 2 * i + 1. An interval runs
+    from the temporary's first definition to its last use, and covers
+    whole blocks it is live across, such as a loop it is carried around.
+    """
+    cfg = ControlFlowGraph(code)
+    live_in, live_out = live_variables(cfg)
+    intervals = {}
+
+    point = 0
+    for block in cfg.blocks:
+        for instr in block.code:
+            for operand, at in ((instr.left, point), (instr.right, point), (instr.dest, point + 1)):
+                if type(operand) is Symbol and operand.type == "temp":
+                    interval = intervals.get(operand.id)
+                    if interval is None:
+                        intervals[operand.id] = [at, at]
+                    else:
+                        interval[1] = at
+            point += 2
+
+    # Temporaries are nearly always used in the block that defines them,
+    # so the boundaries rarely hold any
+    temps = bitset(intervals)
+    point = 0
+    for block in cfg.blocks:
+        first = point
+        point += 2 * len(block.code)
+        for symbol_id in _members(live_in[block.index] & temps):
+            interval = intervals[symbol_id]
+            interval[0] = min(interval[0], first)
+        for symbol_id in _members(live_out[block.index] & temps):
+            interval = intervals[symbol_id]
+            interval[1] = max(interval[1], point - 1)
+    return intervals
+
+
+def _members(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
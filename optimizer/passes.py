@@ -0,0 +1,47 @@
+# optimizer/passes.py
+
+from semantic.symbol_table import Symbol
+from .allocation import TempAllocator
+from .dead_code import DeadCodeElimination
+from .folding import ConstantFolder
+from .value_numbering import ValueNumbering
+
+
+# Passes run by optimize(), in order. Each is a class whose run(code)
+# returns the rewritten instruction list and whose counts() reports
+# what it changed.
+PASSES = (ConstantFolder, ValueNumbering, DeadCodeElimination, TempAllocator)
+
+
+def check_symbol_ids(code):
+    """
+    Raise if two different Symbols in `code` share an id. The passes
+    keep per-symbol values, liveness bits and names by id, so such code
+    would be silently miscompiled.
+    """
+    by_id = {}
+    for instr in code:
+        for operand in (instr.dest, instr.left, instr.right):
+            if isinstance(operand, Symbol) and by_id.setdefault(operand.id, operand) is not operand:
+                other = by_id[operand.id]
+                raise Exception(
+                    f"Symbols '{other.unique_name}' and '{operand.unique_name}' share id {operand.id}"
+                )
+
+
+def optimize(code, passes=PASSES):
+    """
+    Run every pass over a list of TAC instructions. Returns the new
+    list and a dict of counts summed over all passes, plus `removed`,
+    the number of instructions fewer than before.
+    """
+    check_symbol_ids(code)
+    before = len(code)
+    counts = {}
+    for pass_class in passes:
+        optimizer = pass_class()
+        code = optimizer.run(code)
+        for name, count in optimizer.counts().items():
+            counts[name] = counts.get(name, 0) + count
+    counts["removed"] = before - len(code)
+    return code, counts
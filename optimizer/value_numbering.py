@@ -0,0 +1,167 @@
+# optimizer/value_numbering.py
+
+from intermediate.ir import Instr, Op
+from semantic.symbol_table import Symbol
+from .blocks import split_blocks, join_blocks
+from .folding import fold, remove_unused_temps
+
+
+# Operators whose operands can be swapped without changing the value
+COMMUTATIVE = frozenset(("+", "*", "==", "!="))
+
+
+class ValueNumbering:
+    """
+    Local value numbering over the basic blocks of a TAC list.
+
+    Inside each block, every operand and every computed value gets a
+    number, so that two expressions with the same operator applied to
+    the same values share a number however the values were reached. A
+    binary operation whose number already has a holder becomes a copy
+    of it, and a store of a value a variable already holds is dropped.
+    Each read is rewritten to the preferred holder of its value: a
+    constant, then a variable, then the oldest temporary. This
+    propagates copies through `x = t1` chains and leaves the temporaries
+    in between unused, so they are removed. Last, a temporary that is
+    only computed to be copied into a variable on the next line is
+    computed into the variable directly.
+    """
+
+    def __init__(self):
+        self.eliminated = 0
+        self.propagated = 0
+        self.folded = 0
+        self.coalesced = 0
+
+    def counts(self):
+        return {
+            "eliminated": self.eliminated,
+            "propagated": self.propagated,
+            "folded": self.folded,
+            "coalesced": self.coalesced,
+        }
+
+    def run(self, code):
+        blocks = split_blocks(code)
+        for block in blocks:
+            block.code = self.number(block.code)
+        code = remove_unused_temps(join_blocks(blocks))
+        return self.coalesce(code)
+
+    def number(self, code):
+        out = []
+        emit = out.append
+        # Value number of each operand (a Symbol or an int), the value
+        # number of each (operator, left, right), and for each value
+        # number the operands that currently hold it, preferred first
+        numbers = {}
+        expressions = {}
+        holders = []
+
+        def number_of(operand):
+            number = numbers.get(operand)
+            if number is None:
+                number = numbers[operand] = len(holders)
+                holders.append([operand])
+            return number
+
+        def canonical(operand):
+            number = numbers.get(operand)
+            if number is None:
+                return operand
+            return holders[number][0]
+
+        def assign(dest, number):
+            old = numbers.get(dest)
+            if old is not None:
+                holders[old].remove(dest)
+            numbers[dest] = number
+            held = holders[number]
+            if dest.type != "temp" and held and isinstance(held[0], Symbol) and held[0].type == "temp":
+                held.insert(0, dest)
+            else:
+                held.append(dest)
+
+        for instr in code:
+            op = instr.op
+            if op == Op.BINARY:
+                operator = instr.operator
+                dest = instr.dest
+                left = canonical(instr.left)
+                right = canonical(instr.right)
+                if left is not instr.left or right is not instr.right:
+                    self.propagated += 1
+
+                if type(left) is int and type(right) is int:
+                    value = fold(operator, left, right)
+                    if value is not None:
+                        self.folded += 1
+                        emit(Instr(Op.COPY, dest, value))
+                        assign(dest, number_of(value))
+                        continue
+
+                left_number = number_of(left)
+                right_number = number_of(right)
+                if operator in COMMUTATIVE and left_number > right_number:
+                    key = (operator, right_number, left_number)
+                else:
+                    key = (operator, left_number, right_number)
+                number = expressions.get(key)
+                if number is not None and holders[number]:
+                    self.eliminated += 1
+                    emit(Instr(Op.COPY, dest, holders[number][0]))
+                    assign(dest, number)
+                    continue
+
+                if left is not instr.left or right is not instr.right:
+                    instr = Instr(Op.BINARY, dest, left, operator, right)
+                emit(instr)
+                number = expressions[key] = len(holders)
+                holders.append([])
+                assign(dest, number)
+
+            elif op == Op.COPY:
+                left = canonical(instr.left)
+                number = number_of(left)
+                if numbers.get(instr.dest) == number:
+                    self.eliminated += 1
+                    continue
+                if left is not instr.left:
+                    self.propagated += 1
+                    instr = Instr(Op.COPY, instr.dest, left)
+                emit(instr)
+                assign(instr.dest, number)
+
+            elif op == Op.PRINT or op == Op.IF_FALSE:
+                left = canonical(instr.left)
+                if left is not instr.left:
+                    self.propagated += 1
+                    instr = Instr(op, left=left, label=instr.label)
+                emit(instr)
+
+            else:
+                emit(instr)
+        return out
+
+    def coalesce(self, code):
+        """
+        Rewrite `t1 = a op b; x = t1` into `x = a op b` when nothing
+        else reads t1.
+        """
+        uses = {}
+        for instr in code:
+            for operand in (instr.left, instr.right):
+                if isinstance(operand, Symbol):
+                    uses[operand.id] = uses.get(operand.id, 0) + 1
+
+        out = []
+        for instr in code:
+            left = instr.left
+            if (instr.op == Op.COPY and out and isinstance(left, Symbol) and left.type == "temp"
+                    and uses[left.id] == 1 and out[-1].dest is left):
+                previous = out[-1]
+                out[-1] = Instr(previous.op, instr.dest, previous.left, previous.operator, previous.right)
+                self.coalesced += 1
+                continue
+            out.append(instr)
+        return out
@@ -2,9 +2,10 @@
 
 from semantic.symbol_table import SymbolTable
 from myparser.ast_nodes import *
+from myparser.visitor import NodeVisitor
 
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(NodeVisitor):
     def __init__(self):
         self.symbol_table = SymbolTable()
 
@@ -12,13 +13,9 @@ class SemanticAnalyzer:
     # Visitor Dispatcher
     # ---------------------------
 
-    def visit(self, node):
-        """
-        Main visitor entry (used by main.py)
-        """
-        method_name = f"visit_{type(node).__name__}"
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+    # visit(node) is inherited from NodeVisitor and dispatches to the
+    # visit_* methods below through a per-class table; methods that
+    # `yield` a child are run without recursion (see NodeVisitor)
 
     # Optional compatibility method
     def analyze(self, node):
@@ -32,11 +29,12 @@ class SemanticAnalyzer:
     # ---------------------------
 
     def visit_Program(self, node):
+        node.symbol_table = self.symbol_table
         for decl in node.declarations:
-            self.visit(decl)
+            yield decl
 
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
 
     # ---------------------------
     # Declarations
@@ -44,8 +42,8 @@ class SemanticAnalyzer:
 
     def visit_Declaration(self, node):
         if getattr(node, "initializer", None):
-            self.visit(node.initializer)
-        self.symbol_table.declare(node.var_name, "int")
+            yield node.initializer
+        node.symbol = self.symbol_table.declare(node.var_name, "int")
 
     # ---------------------------
     # Statements
@@ -53,39 +51,53 @@ class SemanticAnalyzer:
 
     def visit_Assignment(self, node):
         # Ensure variable is declared
-        self.symbol_table.lookup(node.var_name)
+        node.symbol = self.symbol_table.lookup(node.var_name)
 
         # Check expression
-        self.visit(node.expression)
+        yield node.expression
 
     def visit_PrintStatement(self, node):
-        self.visit(node.expression)
+        yield node.expression
 
     def visit_IfStatement(self, node):
-        self.visit(node.condition)
-        self.visit(node.true_block)
+        yield node.condition
+        yield node.true_block
 
         if node.false_block:
-            self.visit(node.false_block)
+            yield node.false_block
 
     def visit_WhileStatement(self, node):
-        self.visit(node.condition)
-        self.visit(node.body)
+        yield node.condition
+        yield node.body
 
     def visit_Block(self, node):
+        # Declarations inside the block are visible until its end
+        self.symbol_table.enter_scope()
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
+        self.symbol_table.exit_scope()
 
     # ---------------------------
     # Expressions
     # ---------------------------
 
     def visit_BinaryOp(self, node):
-        self.visit(node.left)
-        self.visit(node.right)
+        # Walk the whole operator tree here, left operand first, so long
+        # expressions cost no generator per operator
+        stack = [node]
+        push = stack.append
+        pop = stack.pop
+        visit = self.visit
+        while stack:
+            current = pop()
+            if isinstance(current, BinaryOp):
+                push(current.right)
+                push(current.left)
+            else:
+                visit(current)
 
     def visit_Number(self, node):
         pass  # Numbers are always valid
 
     def visit_Identifier(self, node):
-        self.symbol_table.lookup(node.name)
+        node.symbol = self.symbol_table.lookup(node.name)
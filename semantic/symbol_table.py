@@ -1,24 +1,103 @@
 # semantic/symbol_table.py
 
+import re
+
+
+# Names TACGenerator gives its temporaries; a variable with one of these
+# names always prints with a suffix, so printed TAC never confuses them
+TEMPORARY_NAME = re.compile(r"t\d+")
+
 
 class Symbol:
-    def __init__(self, name, symbol_type):
+    __slots__ = ("name", "type", "depth", "id", "unique_name")
+
+    def __init__(self, name, symbol_type, depth=0, symbol_id=0, unique_name=None):
         self.name = name
         self.type = symbol_type
+        # Number of block scopes enclosing the declaration
+        self.depth = depth
+        # Dense index into SymbolTable.symbols
+        self.id = symbol_id
+        # Name used in printed TAC: `x` for the first variable called x,
+        # then `x.2`, `x.3` for later ones that shadow or follow it.
+        # Variables named like a temporary start at `t1.2`
+        self.unique_name = name if unique_name is None else unique_name
 
     def __repr__(self):
         return f"Symbol(name={self.name}, type={self.type})"
 
 
 class SymbolTable:
+    """
+    Variables visible at the current point of a program.
+
+    `table` maps every visible name straight to its innermost Symbol, so
+    a lookup is one dict access at any nesting depth. Each open block
+    scope keeps an undo log of the bindings its declarations replaced;
+    leaving the scope replays it, so entering and leaving cost
+    O(declarations in the scope) rather than a copy of the table.
+
+    Names come from the lexer interned, so lookups find their entry on
+    the dict's identity check without comparing characters.
+
+    Every Symbol created, including ones whose scope has closed and the
+    temporaries of TACGenerator, stays in `symbols` at the index given
+    by its id, so later passes can keep per-symbol data in lists and
+    bitsets rather than dicts keyed by name.
+    """
+
     def __init__(self):
         self.table = {}
+        # One list of (name, shadowed Symbol or None) per open block
+        self.scopes = []
+        self.symbols = []
+        self.name_counts = {}
 
-    # Declare a new variable
+    @property
+    def depth(self):
+        return len(self.scopes)
+
+    # Scopes
+    def enter_scope(self):
+        self.scopes.append([])
+
+    def exit_scope(self):
+        table = self.table
+        for name, shadowed in reversed(self.scopes.pop()):
+            if shadowed is None:
+                del table[name]
+            else:
+                table[name] = shadowed
+
+    # Declare a new variable in the innermost scope; it may shadow one
+    # declared in an enclosing scope
     def declare(self, name, symbol_type):
-        if name in self.table:
+        depth = len(self.scopes)
+        shadowed = self.table.get(name)
+        if shadowed is not None and shadowed.depth == depth:
             raise Exception(f"Semantic Error: Variable '{name}' already declared.")
-        self.table[name] = Symbol(name, symbol_type)
+        if depth:
+            self.scopes[-1].append((name, shadowed))
+
+        count = self.name_counts.get(name)
+        if count is None:
+            count = 1 if TEMPORARY_NAME.fullmatch(name) else 0
+        count += 1
+        self.name_counts[name] = count
+        unique_name = name if count == 1 else f"{name}.{count}"
+        symbol = self.table[name] = Symbol(name, symbol_type, depth, len(self.symbols), unique_name)
+        self.symbols.append(symbol)
+        return symbol
+
+    # A compiler-generated variable that no source name refers to
+    def temporary(self, name):
+        return self.add(name, "temp")
+
+    # A Symbol that gets an id but is not bound to its name in any scope
+    def add(self, name, symbol_type, unique_name=None):
+        symbol = Symbol(name, symbol_type, self.depth, len(self.symbols), unique_name)
+        self.symbols.append(symbol)
+        return symbol
 
     # Lookup variable
     def lookup(self, name):
@@ -26,5 +105,9 @@ class SymbolTable:
             raise Exception(f"Semantic Error: Variable '{name}' not declared.")
         return self.table[name]
 
+    # Remove a variable, e.g. when its declaration is edited away
+    def remove(self, name):
+        self.table.pop(name, None)
+
     def __repr__(self):
         return str(self.table)
@@ -0,0 +1,88 @@
+"""
+test_arena.py
+
+Unit tests for slotted AST nodes and ASTArena
+Run with: pytest tests/
+"""
+
+import pytest
+from lexer import Lexer
+from myparser.parser import Parser
+from myparser.ast_nodes import ASTNode, BinaryOp, Identifier, Number, Program, walk
+from myparser.arena import ASTArena, NUMBER, NO_NODE
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, format_code
+
+
+SOURCE = """int x = 5;
+int y;
+while (x > 0) {
+    if (x % 2 == 0) { print(x); } else { y = x * 3 + (x - 1); print(y); }
+    x = x - 1;
+}
+print(x + 5);
+"""
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def test_nodes_have_no_instance_dict():
+    for node in walk(parse(SOURCE)):
+        assert not hasattr(node, "__dict__")
+
+
+def test_round_trip():
+    ast = parse(SOURCE)
+    arena = ASTArena.from_ast(ast)
+
+    assert len(arena) == sum(1 for _ in walk(ast))
+    assert repr(arena.program()) == repr(ast)
+    assert repr(arena.to_ast()) == repr(ast)
+    assert [repr(node) for node in arena.walk()] == [repr(node) for node in walk(ast)]
+
+
+def test_rows_share_names_and_constants():
+    arena = ASTArena.from_ast(parse("int x; x = x + 5 + x + 5;"))
+
+    assert arena.names == ["x", "+"]
+    assert arena.constants == [5]
+    numbers = [row for row in range(len(arena)) if arena.kinds[row] == NUMBER]
+    assert [arena.a[row] for row in numbers] == [0, 0]
+    assert arena.b[arena.items[0]] == NO_NODE
+
+
+def test_views_are_node_subclasses():
+    arena = ASTArena.from_ast(parse(SOURCE))
+    program = arena.program()
+    expression = program.statements[-1].expression
+
+    assert isinstance(program, Program)
+    assert isinstance(expression, BinaryOp)
+    assert isinstance(expression.left, Identifier) and expression.left.name == "x"
+    assert isinstance(expression.right, Number) and expression.right.value == 5
+    assert program.declarations[1].initializer is None
+    assert expression.left == program.statements[-1].expression.left
+
+    with pytest.raises(AttributeError):
+        expression.operator = "-"
+
+
+def test_passes_walk_the_arena():
+    ast = parse(SOURCE)
+    arena = ASTArena.from_ast(ast)
+
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(arena.program())
+    assert arena.program().declarations[0].symbol is analyzer.symbol_table.table["x"]
+    expected = format_code(TACGenerator().generate(ast))
+    assert format_code(TACGenerator(analyzer.symbol_table).generate(arena.program())) == expected
+
+    with pytest.raises(Exception, match="Variable 'z' not declared"):
+        SemanticAnalyzer().visit(ASTArena.from_ast(parse("int x; x = z;")).program())
+
+
+def test_unknown_nodes_are_rejected():
+    with pytest.raises(Exception, match="Cannot store ASTNode in an ASTArena"):
+        ASTArena.from_ast(Program([], [ASTNode()]))
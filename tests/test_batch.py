@@ -0,0 +1,99 @@
+"""
+test_batch.py
+
+Unit tests for the batch compilation driver
+Run with: pytest tests/
+"""
+
+import os
+
+import pytest
+from driver.batch import collect_sources, compile_batch, schedule
+
+
+def make_tree(tmp_path):
+    (tmp_path / "src" / "nested").mkdir(parents=True)
+    files = {
+        "src/a.tc": "int a = 1;\nprint(a);\n",
+        "src/nested/b.tc": "int b;\nb = 2 * 3;\nwhile (b > 0) { b = b - 1; }\n",
+        "src/nested/notes.txt": "not a source",
+        "c.tc": "int c = 4;\n" + "c = c + 1;\n" * 50,
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    return tmp_path
+
+
+def test_collect_sources_expands_directories_and_globs(tmp_path):
+    root = make_tree(tmp_path)
+    paths = collect_sources([str(root / "src"), str(root / "*.tc"), str(root / "src" / "a.tc")])
+
+    names = [os.path.relpath(path, root) for path in paths]
+    assert names == ["src/a.tc", os.path.join("src", "nested", "b.tc"), "c.tc"]
+
+    with pytest.raises(Exception, match="No source files match"):
+        collect_sources([str(root / "missing" / "*.tc")])
+
+
+def test_schedule_puts_largest_files_first(tmp_path):
+    root = make_tree(tmp_path)
+    paths = collect_sources([str(root)])
+    chunks = schedule(paths, workers=1, chunks_per_worker=3)
+
+    assert [len(chunk) for chunk, _ in chunks] == [1, 1, 1]
+    assert chunks[0][0] == [str(root / "c.tc")]
+    assert sorted(index for _, indices in chunks for index in indices) == [0, 1, 2]
+
+
+def test_schedule_spreads_large_files(tmp_path):
+    paths = []
+    for index in range(400):
+        path = tmp_path / f"{index:03}.tc"
+        path.write_text("x" * (10000 if index % 25 == 0 else 10))
+        paths.append(str(path))
+    chunks = schedule(paths, workers=4)
+
+    assert len(chunks) == 16
+    large = [sum(os.path.getsize(path) > 100 for path in chunk) for chunk, _ in chunks]
+    assert large == [1] * 16
+    assert sorted(index for _, indices in chunks for index in indices) == list(range(400))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_results_keep_input_order(tmp_path, jobs):
+    root = make_tree(tmp_path)
+    (root / "src" / "bad.tc").write_text("int x;\ny = 1;\nprint(x +);\n")
+
+    report = compile_batch([str(root)], jobs=jobs)
+
+    names = [os.path.basename(result.path) for result in report.results]
+    assert names == ["c.tc", "a.tc", "bad.tc", "b.tc"]
+    assert report.results[1].tac == ["a = 1", "print a"]
+    assert report.results[0].lines == 51
+    assert [os.path.basename(result.path) for result in report.failed] == ["bad.tc"]
+    assert report.failed[0].errors == ["line 3, column 10: Invalid expression at token RPAREN())"]
+    assert "4 file(s), 1 failed" in report.summary()
+
+
+@pytest.mark.parametrize("emit", [("tac",), ("source", "tac")])
+def test_undecodable_file_fails_alone(tmp_path, emit):
+    root = make_tree(tmp_path)
+    (root / "src" / "latin1.tc").write_bytes("int x;\n// caf\xe9\nx = 1;\nprint(\xe9);\n".encode("latin-1"))
+
+    report = compile_batch([str(root / "src")], jobs=1, emit=emit)
+
+    assert [os.path.basename(result.path) for result in report.failed] == ["latin1.tc"]
+    assert report.failed[0].errors == ["Illegal character '\ufffd' at line 4"]
+    assert len(report.results) == 3 and all(result.tac for result in report.results if result.errors == [])
+
+
+def test_batch_uses_cache(tmp_path):
+    root = make_tree(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+
+    first = compile_batch([str(root / "src")], jobs=1, cache_dir=cache_dir)
+    second = compile_batch([str(root / "src")], jobs=1, cache_dir=cache_dir)
+
+    assert first.cache_hits == 0
+    assert second.cache_hits == 2
+    assert [result.tac for result in first.results] == [result.tac for result in second.results]
@@ -0,0 +1,135 @@
+"""
+test_cache.py
+
+Unit tests for the compilation cache
+Run with: pytest tests/
+"""
+
+import os
+import pathlib
+
+import pytest
+import main
+from driver import cache as cache_module
+from driver import pipeline
+from driver.cache import CompilationCache
+
+
+SOURCE = """int x = 3;
+while (x > 0) {
+    print(x);
+    x = x - 1;
+}
+"""
+
+EMIT = ("source", "tac")
+
+
+def write_source(tmp_path, text=SOURCE, name="prog.tc"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_hit_skips_every_stage(tmp_path, monkeypatch, capsys):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    path = write_source(tmp_path)
+
+    first = main.compile_file(path, cache, EMIT)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("stage ran on a cache hit")
+
+    # The source is opened for its hash, but never lexed
+    monkeypatch.setattr(pipeline.Lexer, "tokenize", fail)
+    for stage in ("Parser", "SemanticAnalyzer", "TACGenerator"):
+        monkeypatch.setattr(pipeline, stage, fail)
+
+    capsys.readouterr()
+    assert main.compile_file(path, cache, EMIT) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "print x" in capsys.readouterr().out
+
+
+def test_hit_lexes_again_for_the_tokens(tmp_path, monkeypatch, capsys):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    path = write_source(tmp_path)
+    outputs = []
+
+    main.compile_file(path, cache)
+    outputs.append(capsys.readouterr().out)
+    for stage in ("Parser", "SemanticAnalyzer", "TACGenerator"):
+        monkeypatch.setattr(pipeline, stage, None)
+    main.compile_file(path, cache)
+    outputs.append(capsys.readouterr().out)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert outputs[1] == outputs[0].replace("THREE ADDRESS CODE", "THREE ADDRESS CODE (cached)")
+    assert "===== TOKENS =====" in outputs[1] and "Semantic Analysis Passed" in outputs[1]
+
+
+def test_ast_is_served_from_the_cache(tmp_path):
+    path = pathlib.Path(write_source(tmp_path))
+    plain = CompilationCache(str(tmp_path / "plain"))
+    with_ast = CompilationCache(str(tmp_path / "ast"), store_ast=True)
+
+    for cache in (plain, with_ast):
+        results = [pipeline.compile_source(path, ("ast", "tac"), cache) for _ in range(2)]
+        assert repr(results[1].ast) == repr(results[0].ast) != "None"
+        assert results[1].tac == results[0].tac
+
+    # Without a stored AST, emitting the AST cannot be served from the cache
+    assert (plain.hits, plain.misses) == (0, 2)
+    assert (with_ast.hits, with_ast.misses) == (1, 1)
+    assert results[1].cached and results[1].ast.spans.get(results[1].ast.statements[0]).line == 2
+
+
+def test_source_and_compiler_changes_miss(tmp_path, monkeypatch):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    main.compile_file(write_source(tmp_path), cache, EMIT)
+
+    assert cache.load(SOURCE + "\n") is None
+    assert cache.load(SOURCE) is not None
+
+    monkeypatch.setattr(cache_module, "_fingerprint", "another compiler")
+    assert cache.load(SOURCE) is None
+
+
+def test_failed_compilation_is_not_cached(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    path = write_source(tmp_path, "x = 1;")
+
+    with pytest.raises(Exception, match="not declared"):
+        main.compile_file(path, cache, EMIT)
+    assert cache.load("x = 1;") is None
+
+
+def test_ast_is_cached_when_enabled(tmp_path):
+    path = write_source(tmp_path)
+    plain = CompilationCache(str(tmp_path / "plain"))
+    with_ast = CompilationCache(str(tmp_path / "ast"), store_ast=True)
+
+    main.compile_file(path, plain, EMIT)
+    main.compile_file(path, with_ast, EMIT)
+
+    assert plain.load_ast(SOURCE) is None
+    ast = with_ast.load_ast(SOURCE)
+    assert "Declaration(x, init=Number(3))" in repr(ast)
+    assert ast.spans.get(ast.statements[0]).line == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"), max_bytes=200)
+    sources = [f"int x{i}; x{i} = {i};" for i in range(12)]
+
+    for age, source in enumerate(sources):
+        cache.store(source, ["x = 1"] * 8)
+        os.utime(cache.path(cache.key(source), ".tac"), (age, age))
+        # The first source keeps being used, so it must survive eviction
+        os.utime(cache.path(cache.key(sources[0]), ".tac"), (age + 0.5, age + 0.5))
+
+    assert cache.evictions > 0
+    assert cache.size <= 200
+    assert cache.load(sources[0]) is not None
+    assert cache.load(sources[1]) is None
@@ -0,0 +1,160 @@
+"""
+test_incremental.py
+
+Unit tests for incremental reparsing
+Run with: pytest tests/
+"""
+
+import random
+
+from lexer.lexer import Lexer
+from myparser.parser import Parser
+from myparser.ast_nodes import walk
+from myparser import item_index
+from myparser.incremental import IncrementalDocument
+
+
+SOURCE = """int x = 1;
+int y;
+
+x = x + 2; y = x * 3;
+print(y); // show y
+while (x > 0) {
+    x = x - 1;
+    if (x % 2 == 0) { print(x); } else { print(y); }
+}
+print(x + y);
+"""
+
+
+def assert_matches_full_parse(document):
+    full = Parser(Lexer(document.text).tokenize()).parse()
+
+    assert repr(document.program) == repr(full)
+    for node, expected in zip(walk(document.program), walk(full)):
+        assert document.spans.get(node) == full.spans.get(expected)
+    assert set(document.symbol_table.table) == {d.var_name for d in full.declarations}
+
+
+def replace(document, old, new, occurrence=0):
+    start = -1
+    for _ in range(occurrence + 1):
+        start = document.text.index(old, start + 1)
+    return document.edit(start, start + len(old), new)
+
+
+def test_edit_reuses_untouched_statements():
+    document = IncrementalDocument(SOURCE)
+    before = list(document.program.statements)
+
+    replace(document, "print(y); // show y", "print(y + 1);")
+
+    assert document.last_edit == "incremental"
+    after = document.program.statements
+    assert after[0] is before[0] and after[1] is before[1]
+    assert after[2] is not before[2]
+    assert all(a is b for a, b in zip(after[3:], before[3:]))
+    assert_matches_full_parse(document)
+
+
+def test_edits_keep_spans_and_symbols_in_sync():
+    document = IncrementalDocument(SOURCE)
+
+    replace(document, "x - 1", "x - 10")
+    replace(document, "int y;", "int y;\nint z = 4;")
+    replace(document, "print(x + y);", "print(x + y + z);\nz = z * 2;")
+    replace(document, "x = x + 2; ", "")
+    replace(document, "// show y", "// show y\n")
+
+    assert document.last_edit == "incremental"
+    assert_matches_full_parse(document)
+    assert document.semantic_errors == []
+
+
+def test_comment_typed_mid_line_hides_rest_of_line():
+    document = IncrementalDocument(SOURCE)
+
+    replace(document, "x = x + 2;", "x = x + 2; //")
+
+    assert_matches_full_parse(document)
+    assert "Assignment(y" not in repr(document.program)
+
+
+def test_random_edits_match_full_parse():
+    rng = random.Random(7)
+    document = IncrementalDocument(SOURCE * 3)
+
+    for _ in range(60):
+        start = rng.randrange(len(document.text))
+        end = min(len(document.text), start + rng.randrange(4))
+        document.edit(start, end, rng.choice(["1", " ", "\n", "x", "+ y", ";", ""]))
+        if not document.errors:
+            assert_matches_full_parse(document)
+
+
+def test_edit_before_everything_moves_the_program_span():
+    document = IncrementalDocument(SOURCE)
+
+    document.edit(0, 0, "// c\n")
+    assert document.last_edit == "incremental"
+    assert document.spans.get(document.program).line == 2
+    assert_matches_full_parse(document)
+
+
+def test_edits_across_many_chunks(monkeypatch):
+    monkeypatch.setattr(item_index, "CHUNK_SIZE", 2)
+    rng = random.Random(3)
+    document = IncrementalDocument("int x = 0;\n" + "x = x + 1;\nprint(x);\n" * 40)
+
+    for _ in range(60):
+        lines = document.text.split("\n")
+        index = rng.randrange(2, len(lines) - 1)
+        position = sum(len(line) + 1 for line in lines[:index])
+        if rng.random() < 0.6 or not lines[index]:
+            document.edit(position, position, rng.choice(["print(x);\n", "x = 2; x = 3;\n", "// c\n", "\n"]))
+        else:
+            document.edit(position, position + len(lines[index]) + 1, "")
+        assert document.last_edit == "incremental"
+    assert len(document.items.chunks) > 20
+    assert_matches_full_parse(document)
+
+
+def test_unbalanced_edit_falls_back_to_full_parse():
+    document = IncrementalDocument(SOURCE)
+
+    replace(document, "print(x); }", "print(x);")
+    assert document.last_edit == "full"
+    assert document.errors
+
+    replace(document, "print(x);", "print(x); }")
+    assert not document.errors
+    assert_matches_full_parse(document)
+
+
+def test_semantic_errors_follow_declarations():
+    document = IncrementalDocument(SOURCE)
+
+    replace(document, "int y;", "")
+    assert document.semantic_errors == ["Semantic Error: Variable 'y' not declared."]
+
+    replace(document, "int x = 1;", "int x = 1;\nint x;")
+    assert "Semantic Error: Variable 'x' already declared." in document.semantic_errors
+
+    replace(document, "int x;", "int y;")
+    assert document.semantic_errors == []
+
+
+def test_block_locals_stay_out_of_the_global_symbols():
+    document = IncrementalDocument(SOURCE)
+
+    replace(document, "x = x - 1;", "int z = x; x = z - 1;")
+    assert document.last_edit == "incremental"
+    assert_matches_full_parse(document)
+    assert "z" not in document.symbol_table.table
+    assert document.semantic_errors == []
+
+    # Still in scope inside the loop body, but not after it
+    replace(document, "print(y); }", "print(z); }")
+    assert document.semantic_errors == []
+    replace(document, "print(x + y);", "print(x + z);")
+    assert document.semantic_errors == ["Semantic Error: Variable 'z' not declared."]
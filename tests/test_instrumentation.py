@@ -0,0 +1,103 @@
+"""
+test_instrumentation.py
+
+Unit tests for per-stage pipeline instrumentation
+Run with: pytest tests/
+"""
+
+import json
+import pstats
+
+import pytest
+from myparser.ast_nodes import walk
+from driver.batch import compile_batch
+from driver.instrumentation import Instrumentation, merge_stats
+from driver.pipeline import compile_source, format_json, format_text
+
+
+SOURCE = """int x = 5;
+while (x > 0) {
+    if (x % 2 == 0) { print(x); } else { print(x + 100); }
+    x = x - 1;
+}
+"""
+
+
+def test_stages_and_counts():
+    instrumentation = Instrumentation()
+    result = compile_source(SOURCE, emit=("ast", "tac"), instrumentation=instrumentation)
+
+    stages = {stats.name: stats for stats in instrumentation.stages}
+    assert list(stages) == ["lex", "parse", "semantic", "tac"]
+    assert stages["lex"].counts == {"tokens": 44, "lines": 5}
+    assert stages["parse"].counts == {"nodes": sum(1 for _ in walk(result.ast)), "errors": 0}
+    assert stages["semantic"].counts == {"symbols": 1}
+    assert stages["tac"].counts == {"instructions": 17, "temps": 5, "labels": 4}
+    assert all(stats.seconds > 0 and stats.peak_bytes is None for stats in stages.values())
+
+
+def test_hooks_see_each_stage_as_it_finishes():
+    seen = []
+    instrumentation = Instrumentation(hooks=[lambda stats: seen.append((stats.name, dict(stats.counts)))])
+    instrumentation.add_hook(lambda stats: seen.append(stats.name))
+
+    compile_source("int x;\nprint(y);", instrumentation=instrumentation)
+
+    assert seen == [
+        ("lex", {"tokens": 8, "lines": 2}), "lex",
+        ("parse", {"nodes": 4, "errors": 0}), "parse",
+        ("semantic", {}), "semantic",
+    ]
+
+
+def test_memory_and_profile(tmp_path):
+    path = tmp_path / "tac.prof"
+    instrumentation = Instrumentation(trace_memory=True, profile_stage="tac", profile_path=str(path))
+    compile_source("int x;\n" + "x = x + 1;\n" * 200, instrumentation=instrumentation)
+
+    assert all(stats.peak_bytes > 0 for stats in instrumentation.stages)
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "gen_Assignment" in functions and "parse" not in functions
+
+    with pytest.raises(Exception, match="Unknown stage 'codegen'"):
+        Instrumentation(profile_stage="codegen")
+
+
+def test_stats_are_machine_readable():
+    instrumentation = Instrumentation()
+    result = compile_source(SOURCE, instrumentation=instrumentation)
+
+    records = [json.loads(line) for line in format_json(result).splitlines()]
+    stats = records[-2]
+    assert stats["stage"] == "stats"
+    assert [entry["stage"] for entry in stats["stages"]] == ["lex", "parse", "semantic", "tac"]
+    assert stats["stages"][3]["temps"] == 5
+    assert "\n===== STATS =====\nlex " in format_text(result)
+
+
+def test_uninstrumented_results_have_no_stats():
+    result = compile_source(SOURCE)
+    assert result.stats is None
+    assert "STATS" not in format_text(result)
+
+
+def test_batch_stats_are_merged(tmp_path):
+    for i in range(3):
+        (tmp_path / f"p{i}.tc").write_text(SOURCE)
+    report = compile_batch([str(tmp_path)], jobs=1, stats="memory")
+
+    totals = report.stats
+    assert [entry["stage"] for entry in totals["stages"]] == ["lex", "parse", "semantic", "tac"]
+    assert totals["stages"][0]["tokens"] == 3 * 44
+    assert totals["stages"][3]["labels"] == 12
+    assert totals["stages"][0]["peak_bytes"] == max(r.stats["stages"][0]["peak_bytes"] for r in report.results)
+    assert merge_stats([]) == {"stages": [], "total_seconds": 0}
+
+
+def test_merged_maximums_are_not_summed():
+    stats = [
+        {"stages": [{"stage": "optimize", "seconds": 1.0, "peak_bytes": None, "removed": 2, "max_live_temps": live}]}
+        for live in (3, 5, 4)
+    ]
+    optimize = merge_stats(stats)["stages"][0]
+    assert optimize["removed"] == 6 and optimize["max_live_temps"] == 5
@@ -0,0 +1,85 @@
+"""
+test_ir.py
+
+Unit tests for the TAC instruction IR and its text form
+Run with: pytest tests/
+"""
+
+import os
+
+import pytest
+from lexer.lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, Instr, Op, format_code, parse_code
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def compile_code(source):
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(program)
+    return TACGenerator(analyzer.symbol_table).generate(program)
+
+
+SOURCE = """int x = 10;
+while (x > 0) {
+    int x = 3;
+    if (x % 2 == 0) { print(x); } else { print(x * 2); }
+}
+"""
+
+
+def test_instructions_and_text():
+    code = compile_code(SOURCE)
+
+    assert [instr.op for instr in code[:4]] == [Op.COPY, Op.LABEL, Op.BINARY, Op.IF_FALSE]
+    assert code[2].operator == ">" and code[2].right == 0 and code[3].label == 2
+    assert format_code(code) == [
+        "x = 10",
+        "L1:",
+        "t1 = x > 0",
+        "ifFalse t1 goto L2",
+        "x.2 = 3",
+        "t2 = x.2 % 2",
+        "t3 = t2 == 0",
+        "ifFalse t3 goto L3",
+        "print x.2",
+        "goto L4",
+        "L3:",
+        "t4 = x.2 * 2",
+        "print t4",
+        "L4:",
+        "goto L1",
+        "L2:",
+    ]
+
+
+@pytest.mark.parametrize("name", ["sample1.tc", "sample2.tc", None])
+def test_text_round_trip(name):
+    if name is None:
+        source = SOURCE
+    else:
+        with open(os.path.join(EXAMPLES, name)) as f:
+            source = f.read()
+    text = format_code(compile_code(source))
+    code = parse_code(text)
+    assert format_code(code) == text
+
+
+def test_parsed_symbols():
+    code = parse_code(["x = 1", "x.2 = x", "t1 = x.2 - -4", "print t1"])
+
+    x, shadow, temp = code[0].dest, code[1].dest, code[2].dest
+    assert code[1].left is x and code[2].left is shadow and code[3].left is temp
+    assert (shadow.name, shadow.unique_name, shadow.type) == ("x", "x.2", "int")
+    assert temp.type == "temp" and code[2].right == -4
+    assert [symbol.id for symbol in (x, shadow, temp)] == [0, 1, 2]
+
+    with pytest.raises(Exception, match="Invalid TAC at line 2"):
+        parse_code(["x = 1", "x = 1 ** 2"])
+
+
+def test_repr():
+    assert repr(Instr(Op.GOTO, label=3)) == "Instr(GOTO, 'goto L3')"
@@ -6,6 +6,7 @@ Run with: pytest tests/
 """
 
 import pytest
+from lexer import lexer as lexer_module
 from lexer.lexer import Lexer
 from lexer.token import TokenType
 
@@ -56,3 +57,114 @@ def test_while_statement():
     assert tokens[2].value == "x"
     assert tokens[3].type == TokenType.GREATER
     assert tokens[4].value == 0        # ✅ int
+
+
+def test_comments_and_line_numbers():
+    source = "int x; // first\n\nx = 1; // second\nprint(x);"
+    lexer = Lexer(source)
+    tokens = lexer.tokenize()
+
+    assert [t.type for t in tokens[:3]] == [TokenType.INT, TokenType.IDENTIFIER, TokenType.SEMICOLON]
+    assert tokens[3].value == "x"
+    assert tokens[3].line == 3
+    assert tokens[-2].line == 4
+    assert tokens[-1].type == TokenType.EOF
+
+
+def test_illegal_characters():
+    with pytest.raises(Exception, match="Unexpected character '!' at line 2"):
+        Lexer("int x;\nx = !x;").tokenize()
+
+    with pytest.raises(Exception, match="Illegal character '@' at line 1"):
+        Lexer("x = @;").tokenize()
+
+
+def test_iter_tokens_matches_tokenize():
+    source = "int x = 5; // set\nwhile (x > 0) {\n  x = x - 1;\n}\nprint(x);\n"
+    expected = [(t.type, t.value, t.line) for t in Lexer(source).tokenize()]
+
+    for chunk_size in (1, 7, 1 << 16):
+        streamed = Lexer(source).iter_tokens(chunk_size)
+        assert [(t.type, t.value, t.line) for t in streamed] == expected
+
+
+def test_token_buffer_matches_tokenize():
+    source = "int x = 42; // set\nif (x >= 10) {\n  print(x % 3);\n}\n"
+    expected = [(t.type, t.value, t.line) for t in Lexer(source).tokenize()]
+    buffer = Lexer(source).tokenize_buffer()
+
+    assert len(buffer) == len(expected)
+    assert [(t.type, t.value, t.line) for t in buffer] == expected
+    assert source[buffer.starts[1]:buffer.ends[1]] == "x"
+
+
+def located(tokens):
+    # Each token with the column and offsets its scan recorded for it
+    table = tokens.locations
+    return [
+        (t.type, t.value, t.line, table.column(index, t.line), table.starts[index], table.ends[index])
+        for index, t in enumerate(tokens)
+    ]
+
+
+def test_token_buffer_across_chunks(monkeypatch):
+    monkeypatch.setattr(lexer_module, "CHUNK_SIZE", 8)
+    source = "int x = 42;  // set\n\n  if (x >= 10) {\n\tprint(x % 3);\n}  "
+    expected = located(Lexer(source).tokenize())
+    buffer = Lexer(source).tokenize_buffer()
+
+    assert [
+        (t.type, t.value, t.line, buffer.column(index), buffer.starts[index], buffer.ends[index])
+        for index, t in enumerate(buffer)
+    ] == expected
+
+    with pytest.raises(Exception, match="Illegal character '@' at line 3"):
+        Lexer("int x;\nx = 1;\n  x = @;").tokenize_buffer()
+    with pytest.raises(Exception, match="Unexpected character '!' at line 2"):
+        Lexer("int x;\nx = !x;").tokenize_buffer()
+
+
+def test_token_columns_and_offsets():
+    source = "int x;\n  x = 12;"
+    tokens = located(Lexer(source).tokenize())
+    buffer = Lexer(source).tokenize_buffer()
+
+    _, _, line, column, start, end = tokens[5]
+    assert (line, column) == (2, 7)
+    assert source[start:end] == "12"
+    assert [row[3:] for row in tokens] == [
+        (buffer.column(index), buffer.starts[index], buffer.ends[index]) for index in range(len(buffer))
+    ]
+
+
+def test_bytes_and_mmap_sources(tmp_path):
+    source = "int x = 42; // set\nwhile (x >= 10) {\n  x = x - 1;\n}\n"
+    expected = located(Lexer(source).tokenize())
+
+    path = tmp_path / "input.tc"
+    path.write_bytes(source.encode())
+
+    for lexer in (Lexer(source.encode()), Lexer(memoryview(source.encode())), Lexer.from_file(path)):
+        assert located(lexer.iter_tokens(8)) == expected
+
+    buffered = Lexer.from_file(path).tokenize_buffer()
+    assert [(t.type, t.value, t.line) for t in buffered] == [row[:3] for row in expected]
+
+    with pytest.raises(Exception, match="Illegal character 'é' at line 2"):
+        Lexer("x = 1;\n é = 2;".encode()).tokenize()
+
+
+def test_names_and_numbers_are_interned(tmp_path):
+    source = "int counter = 100000;\ncounter = counter + 100000;\nprint(counter);\n"
+    path = tmp_path / "input.tc"
+    path.write_bytes(source.encode())
+
+    for tokens in (Lexer(source).tokenize(), Lexer.from_file(path).tokenize(), list(Lexer(source).tokenize_buffer())):
+        names = [t.value for t in tokens if t.type == TokenType.IDENTIFIER]
+        numbers = [t.value for t in tokens if t.type == TokenType.NUMBER]
+        assert len(names) == 4 and all(name is names[0] for name in names)
+        assert len(numbers) == 2 and numbers[0] is numbers[1]
+
+    # Streamed chunks share one pool
+    numbers = [t.value for t in Lexer(source).iter_tokens(1) if t.type == TokenType.NUMBER]
+    assert numbers[0] is numbers[1]
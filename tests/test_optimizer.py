@@ -0,0 +1,289 @@
+"""
+test_optimizer.py
+
+Unit tests for the TAC optimizer passes
+Run with: pytest tests/
+"""
+
+import pytest
+import main
+from driver.cache import CompilationCache
+from driver.instrumentation import Instrumentation
+from driver.pipeline import compile_source
+from intermediate import format_code, parse_code
+from intermediate.ir import Instr, Op
+from semantic.symbol_table import Symbol
+from optimizer import (
+    ConstantFolder, ValueNumbering, DeadCodeElimination, TempAllocator, ControlFlowGraph,
+    optimize, evaluate, split_blocks, live_variables, live_intervals,
+)
+
+
+def run(lines, passes=(ConstantFolder,)):
+    code, counts = optimize(parse_code(lines), passes)
+    return format_code(code), counts
+
+
+def test_evaluate_follows_c():
+    assert evaluate("/", -7, 2) == -3 and evaluate("%", -7, 2) == -1
+    assert evaluate("/", 7, -2) == -3 and evaluate("%", 7, -2) == 1
+    assert evaluate("/", 1, 0) is None and evaluate("%", 1, 0) is None
+    assert evaluate("<=", 2, 2) == 1 and evaluate("!=", 2, 2) == 0
+    assert evaluate("<<", 3, 4) == 48
+
+    with pytest.raises(Exception, match="Unknown operator '\\*\\*'"):
+        evaluate("**", 2, 3)
+
+
+def test_constants_are_folded_and_propagated():
+    code, counts = run([
+        "t1 = 2 * 3",
+        "t2 = t1 + 4",
+        "x = t2",
+        "t3 = x / 0",
+        "print t3",
+    ])
+
+    assert code == ["x = 10", "t3 = x / 0", "print t3"]
+    assert counts["folded"] == 2 and counts["removed"] == 2
+
+
+def test_identities_and_strength_reduction():
+    code, counts = run([
+        "t1 = x + 0",
+        "t2 = t1 * 1",
+        "t3 = t2 - t2",
+        "print t3",
+        "t4 = y * 8",
+        "t5 = 2 * y",
+        "t6 = t4 + t5",
+        "t7 = y / 2",
+        "print t6",
+        "print t7",
+    ])
+
+    assert code == [
+        "print 0",
+        "t4 = y << 3",
+        "t5 = y + y",
+        "t6 = t4 + t5",
+        "t7 = y / 2",
+        "print t6",
+        "print t7",
+    ]
+    assert (counts["simplified"], counts["reduced"]) == (3, 2)
+
+
+def test_copies_are_forgotten_when_their_source_changes():
+    code, _ = run(["t1 = x", "x = 5", "print t1", "L1:", "t2 = 1", "print x"])
+    assert code == ["t1 = x", "x = 5", "print t1", "L1:", "print x"]
+
+
+def test_constant_branches_are_removed():
+    code, counts = run([
+        "t1 = 1 < 2",
+        "ifFalse t1 goto L1",
+        "print 1",
+        "goto L2",
+        "L1:",
+        "print 2",
+        "L2:",
+        "L3:",
+        "t2 = 0 > 1",
+        "ifFalse t2 goto L4",
+        "print 3",
+        "goto L3",
+        "L4:",
+        "print 4",
+    ], (ConstantFolder, DeadCodeElimination))
+
+    assert code == ["print 1", "print 4"]
+    assert counts["branches"] == 2
+
+
+def test_folder_leaves_unknown_branches_alone():
+    code = parse_code(["L1:", "t1 = x > 0", "ifFalse t1 goto L2", "print x", "goto L1", "L2:"])
+    folder = ConstantFolder()
+
+    assert format_code(folder.run(code)) == format_code(code)
+    assert folder.counts() == {"folded": 0, "simplified": 0, "reduced": 0, "branches": 0}
+
+
+def test_blocks_split_at_labels_and_jumps():
+    code = parse_code(["x = 1", "L1:", "t1 = x > 0", "ifFalse t1 goto L2", "print x", "goto L1", "L2:", "print 0"])
+    blocks = split_blocks(code)
+
+    assert [len(block.code) for block in blocks] == [1, 3, 2, 2]
+    assert [block.label for block in blocks] == [None, 1, None, 2]
+    assert [instr for block in blocks for instr in block.code] == code
+
+
+def test_common_subexpressions_are_reused():
+    code, counts = run([
+        "t1 = a * b",
+        "t2 = b * a",
+        "t3 = t1 + t2",
+        "x = t3",
+        "t4 = a * b",
+        "t5 = x - t4",
+        "print t5",
+        "a = 2",
+        "t6 = a * b",
+        "print t6",
+    ], (ValueNumbering,))
+
+    assert code == [
+        "t1 = a * b",
+        "x = t1 + t1",
+        "t5 = x - t1",
+        "print t5",
+        "a = 2",
+        "t6 = 2 * b",
+        "print t6",
+    ]
+    assert counts["eliminated"] == 2
+
+
+def test_copy_chains_are_propagated():
+    code, counts = run(["t1 = y", "t2 = t1", "x = t2", "t3 = x + 1", "y = t3", "t4 = y", "x = t4", "print x"], (ValueNumbering,))
+
+    assert code == ["x = y", "y = y + 1", "x = y", "print y"]
+    assert counts["coalesced"] == 1
+
+
+def test_values_are_forgotten_between_blocks():
+    lines = ["t1 = a + b", "x = t1", "L1:", "t2 = a + b", "print t2"]
+    code, counts = run(lines, (ValueNumbering,))
+
+    assert code == ["x = a + b", "L1:", "t2 = a + b", "print t2"]
+    assert counts["eliminated"] == 0
+
+
+LOOP = ["x = 1", "y = 2", "L1:", "t1 = x > 0", "ifFalse t1 goto L2", "x = x - 1", "y = x", "goto L1", "L2:", "print x"]
+
+
+def test_control_flow_graph_and_liveness():
+    code = parse_code(LOOP)
+    cfg = ControlFlowGraph(code)
+
+    assert [[successor.index for successor in block.successors] for block in cfg.blocks] == [[1], [2, 3], [1], []]
+    assert [[predecessor.index for predecessor in block.predecessors] for block in cfg.blocks] == [[], [0, 2], [1], [1]]
+    assert cfg.reachable() == {0, 1, 2, 3}
+
+    x, y, t1 = code[0].dest, code[1].dest, code[3].dest
+    live_in, live_out = live_variables(cfg)
+    assert live_in == [0, 1 << x.id, 1 << x.id, 1 << x.id]
+    assert live_out == [1 << x.id, 1 << x.id, 1 << x.id, 0]
+    assert t1.id not in [bit.bit_length() - 1 for bit in live_out]
+
+
+def test_dead_stores_are_removed():
+    code, counts = run(LOOP, (DeadCodeElimination,))
+
+    assert code == ["x = 1", "L1:", "t1 = x > 0", "ifFalse t1 goto L2", "x = x - 1", "goto L1", "L2:", "print x"]
+    assert counts["dead_stores"] == 2
+
+
+def test_jumps_are_threaded_and_unreachable_code_removed():
+    code, counts = run([
+        "ifFalse c goto L1",
+        "print 1",
+        "goto L4",
+        "L1:",
+        "goto L2",
+        "print 9",
+        "L2:",
+        "goto L3",
+        "L3:",
+        "print 2",
+        "L4:",
+        "print 3",
+    ], (DeadCodeElimination,))
+
+    assert code == ["ifFalse c goto L3", "print 1", "goto L4", "L3:", "print 2", "L4:", "print 3"]
+    assert counts["unreachable"] == 4 and counts["threaded"] >= 1
+
+
+def test_if_without_else_needs_no_jump():
+    code, counts = run(["ifFalse c goto L1", "print 1", "goto L2", "L1:", "L2:", "print 2"], (DeadCodeElimination,))
+
+    assert code == ["ifFalse c goto L2", "print 1", "L2:", "print 2"]
+    assert counts["jumps"] == 1
+
+
+CARRIED = ["t1 = 5", "L1:", "t2 = t1 * 2", "print t2", "t3 = t1 - 1", "t1 = t3", "ifFalse t1 goto L2", "goto L1", "L2:"]
+
+
+def test_live_intervals():
+    code = parse_code(CARRIED)
+    t1, t2, t3 = code[0].dest, code[2].dest, code[4].dest
+
+    # Instruction i reads at 2 * i and writes at 2 * i + 1; t1 is live
+    # around the whole loop
+    assert live_intervals(code) == {t1.id: [1, 15], t2.id: [5, 6], t3.id: [9, 10]}
+
+
+def test_temps_share_names_once_dead():
+    code, counts = run(["t1 = a * b", "t2 = c * d", "t3 = t1 + t2", "print t3", "t4 = a - 1", "print t4"], (TempAllocator,))
+
+    assert code == ["t1 = a * b", "t2 = c * d", "t2 = t1 + t2", "print t2", "t2 = a - 1", "print t2"]
+    assert counts["max_live_temps"] == 2 and counts["reused_temps"] == 2
+
+
+def test_temps_live_around_a_loop_keep_their_names():
+    code, counts = run(CARRIED, (TempAllocator,))
+
+    assert code[2:6] == ["t2 = t1 * 2", "print t2", "t2 = t1 - 1", "t1 = t2"]
+    assert counts["max_live_temps"] == 2
+
+
+SOURCE = """int x = 2 * 3;
+int y = x;
+if (1 < 2) { print(x * 4); } else { print(y); }
+"""
+
+
+def test_symbols_sharing_an_id_are_rejected():
+    x = Symbol("x", "int", symbol_id=0)
+    temp = Symbol("t1", "temp", symbol_id=0)
+    code = [Instr(Op.COPY, x, 4), Instr(Op.BINARY, temp, x, "*", x), Instr(Op.PRINT, left=temp)]
+
+    with pytest.raises(Exception, match="Symbols 'x' and 't1' share id 0"):
+        optimize(code)
+
+
+def test_pipeline_flag_and_stats():
+    instrumentation = Instrumentation()
+    result = compile_source(SOURCE, optimize=True, instrumentation=instrumentation)
+
+    assert result.tac == ["print 24"]
+    stages = {stats.name: stats for stats in instrumentation.stages}
+    assert list(stages) == ["lex", "parse", "semantic", "tac", "optimize"]
+    assert stages["tac"].counts["instructions"] == 11
+    assert stages["optimize"].counts["instructions"] == 1
+    assert stages["optimize"].counts["removed"] == 10
+
+    assert compile_source(SOURCE).tac[0] == "t1 = 2 * 3"
+
+
+def test_optimized_programs_use_few_temps():
+    source = "int x = 9;\nwhile (x > 0) {\n" + "    print(x * x + (x - 1) * (x + 1));\n" * 50 + "    x = x - 1;\n}\n"
+    instrumentation = Instrumentation()
+    result = compile_source(source, optimize=True, instrumentation=instrumentation)
+
+    temps = {line.split(" = ")[0] for line in result.tac if line.startswith("t")}
+    assert len(temps) == 3
+    assert instrumentation.stages[-1].counts["max_live_temps"] == 3
+    assert instrumentation.stages[-2].counts["temps"] == 252
+
+
+def test_optimized_code_is_cached_separately(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    path = tmp_path / "prog.tc"
+    path.write_text(SOURCE)
+
+    plain = main.compile_file(str(path), cache, ("tac",))
+    optimized = main.compile_file(str(path), cache, ("tac",), optimize=True)
+    assert plain != optimized
+    assert main.compile_file(str(path), cache, ("tac",), optimize=True) == optimized
+    assert (cache.hits, cache.misses) == (1, 2)
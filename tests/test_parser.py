@@ -8,6 +8,9 @@ Run with: pytest tests/
 import pytest
 from lexer.lexer import Lexer
 from myparser.parser import Parser
+from myparser.errors import ParseError
+from semantic import SemanticAnalyzer
+from driver.pipeline import compile_source
 from myparser.ast_nodes import (
     Program,
     Declaration,
@@ -15,6 +18,7 @@ from myparser.ast_nodes import (
     PrintStatement,
     WhileStatement,
     IfStatement,
+    BinaryOp,
 )
 
 
@@ -98,3 +102,189 @@ def test_parse_if_else():
 
     assert len(ast.statements) == 1
     assert isinstance(ast.statements[0], IfStatement)
+
+
+# ---------------------------
+# Streaming
+# ---------------------------
+
+def test_parse_from_token_stream():
+    source = """
+    int x = 3;
+    while (x > 0) {
+        if (x % 2 == 0) { print(x); } else { print(x + 100); }
+        x = x - 1;
+    }
+    """
+    streamed = Parser(Lexer(source).iter_tokens(chunk_size=8)).parse()
+
+    assert repr(streamed) == repr(parse_source(source))
+
+
+def test_parse_from_token_buffer():
+    source = """
+    int x = 3;
+    while (x > 0) {
+        if (x % 2 == 0) { print(x); } else { print((x + 1) * 100); }
+        x = x - 1;
+    }
+    """
+    buffered = Parser(Lexer(source).tokenize_buffer()).parse()
+
+    assert repr(buffered) == repr(parse_source(source))
+
+
+# ---------------------------
+# Source spans
+# ---------------------------
+
+def test_node_spans():
+    source = "int x;\nx = 1 +\n  x * 2;"
+    ast = parse_source(source)
+    assignment = ast.statements[0]
+    expr = assignment.expression
+
+    assert isinstance(expr, BinaryOp)
+    assert ast.spans.get(assignment) == (7, len(source), 2, 1)
+    assert source[ast.spans.get(expr).start:ast.spans.get(expr).end] == "1 +\n  x * 2"
+
+    product = ast.spans.get(expr.right)
+    assert (product.line, product.column) == (3, 3)
+
+
+def test_shared_leaves():
+    source = "int x;\nx = (x + 1) * (x + 1);\nprint(x);"
+    parser = Parser(Lexer(source).tokenize(), share_leaves=True)
+    ast = parser.parse()
+    expr = ast.statements[0].expression
+
+    assert expr.left is not expr.right
+    assert expr.left.left is expr.right.left is ast.statements[1].expression
+    assert expr.left.right is expr.right.right
+
+    # Operators keep their own spans; a shared leaf keeps its first
+    assert ast.spans.get(expr.right) == (22, 27, 2, 16)
+    assert ast.spans.get(expr.right.left) == (12, 13, 2, 6)
+    assert str(ast) == str(parse_source(source))
+
+
+def test_shared_leaves_respect_block_declarations():
+    source = "int x;\nx = x;\n{ print(x); int x = 1; print(x); }\nprint(x);"
+    ast = Parser(Lexer(source).tokenize(), share_leaves=True).parse()
+    outer = ast.statements[0].expression
+    block = ast.statements[1]
+
+    assert block.statements[0].expression is outer
+    assert block.statements[2].expression is not outer
+    assert ast.statements[2].expression is not block.statements[2].expression
+
+
+# ---------------------------
+# Expressions
+# ---------------------------
+
+def test_expression_precedence_and_associativity():
+    ast = parse_source("int x; x = 1 - 2 - 3 * (4 + x) % 5 == 6 < 7;")
+    expr = ast.statements[0].expression
+
+    assert repr(expr) == (
+        "BinaryOp(BinaryOp(BinaryOp(Number(1), -, Number(2)), -, "
+        "BinaryOp(BinaryOp(Number(3), *, BinaryOp(Number(4), +, Identifier(x))), %, Number(5))), "
+        "==, BinaryOp(Number(6), <, Number(7)))"
+    )
+
+
+def test_deeply_nested_expressions():
+    depth = 5000
+    ast = parse_source(f"int x; x = {'(' * depth}x + 1{')' * depth}; print(x);")
+    assert isinstance(ast.statements[0].expression, BinaryOp)
+
+    chain = " + ".join(["x"] * depth)
+    ast = parse_source(f"int x; x = {chain};")
+    node = ast.statements[0].expression
+    for _ in range(depth - 1):
+        node = node.left
+    assert node.name == "x"
+
+
+def test_deeply_nested_blocks():
+    depth = 5000
+    source = f"int x; {'while (x > 0) { if (x) { ' * depth}x = ;{' } else { print(x); } }' * depth} print(x);"
+    parser = Parser(Lexer(source).tokenize(), recover=True)
+    ast = parser.parse()
+
+    # The error at the bottom is recovered from in the innermost block
+    assert [error.line for error in parser.errors] == [1]
+    node = ast.statements[0]
+    for _ in range(depth - 1):
+        node = node.body.statements[0].true_block.statements[0]
+    assert isinstance(node, WhileStatement) and node.body.statements[0].true_block.statements == []
+    assert isinstance(ast.statements[1], PrintStatement)
+
+    result = compile_source(source.replace("x = ;", "x = x - 1;"))
+    assert result.ok and len(result.tac) > 4 * depth
+
+
+def test_expression_errors():
+    with pytest.raises(Exception, match="expected TokenType.RPAREN"):
+        parse_source("int x; x = (1 + 2;")
+
+    with pytest.raises(Exception, match="Invalid expression"):
+        parse_source("int x; x = 1 + ;")
+
+
+# ---------------------------
+# Error recovery
+# ---------------------------
+
+def parse_recovering(source, **options):
+    parser = Parser(Lexer(source).tokenize(), recover=True, **options)
+    return parser.parse(), parser.errors
+
+
+def test_first_error_raises_without_recovery():
+    with pytest.raises(ParseError) as error:
+        parse_source("int x;\nx = 1\nprint(x);")
+
+    assert error.value.diagnostic.line == 3
+    assert "expected TokenType.SEMICOLON" in str(error.value)
+
+
+def test_recovery_reports_every_error():
+    source = """
+    int x;
+    int = 5;
+    x = 1 +;
+    print(x);
+    while (x > 0) {
+        x = x - ;
+        print(x);
+    }
+    if (x > ) { print(x); }
+    x = 2;
+    """
+    ast, errors = parse_recovering(source)
+
+    assert [d.line for d in errors] == [3, 4, 7, 10]
+    assert len(ast.declarations) == 1
+    kinds = [type(stmt).__name__ for stmt in ast.statements]
+    assert kinds == ["PrintStatement", "WhileStatement", "Block", "Assignment"]
+    assert len(ast.statements[1].body.statements) == 1
+
+
+def test_recovery_partial_program_passes_semantic_analysis():
+    ast, errors = parse_recovering("int x; int y;\nx = ;\ny = x + 1;\n} print(y);")
+
+    assert len(errors) == 2
+    SemanticAnalyzer().visit(ast)
+    assert len(ast.statements) == 2
+
+
+def test_recovery_error_cap():
+    source = "int x;\n" + "x = ;\n" * 50 + "{ print(x);"
+    ast, errors = parse_recovering(source, max_errors=10)
+    assert len(errors) == 10
+
+    ast, errors = parse_recovering(source)
+    assert len(errors) == 51
+    assert "expected TokenType.RBRACE" in errors[-1].message
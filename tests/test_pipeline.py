@@ -0,0 +1,129 @@
+"""
+test_pipeline.py
+
+Unit tests for compile_source and its output formats
+Run with: pytest tests/
+"""
+
+import argparse
+import io
+import json
+from pathlib import Path
+
+import pytest
+import main
+from lexer import Lexer
+from lexer.token import Token
+from driver.pipeline import compile_source, format_text, format_json, parse_emit
+
+
+SOURCE = "int x = 2;\nwhile (x > 0) { x = x - 1; }\nprint(x);\n"
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def test_compile_source_returns_result():
+    result = compile_source(SOURCE)
+
+    assert result.ok
+    assert result.stage == "tac"
+    assert result.tac == ["x = 2", "L1:", "t1 = x > 0", "ifFalse t1 goto L2", "t2 = x - 1", "x = t2", "goto L1", "L2:", "print x"]
+    assert result.tokens is None and result.ast is None
+
+
+def test_samples_compile_their_initializers():
+    # Declaration initializers used to be dropped, so this TAC began at
+    # the first statement
+    sample1 = compile_source(EXAMPLES / "sample1.tc", emit=("tac",))
+    assert sample1.tac == ["x = 10", "y = 20", "t1 = x + y", "z = t1", "print z"]
+
+    sample2 = compile_source(EXAMPLES / "sample2.tc", emit=("tac",))
+    assert sample2.tac[:3] == ["x = 5", "L1:", "t1 = x > 0"]
+
+
+def test_suppressed_stages_are_never_formatted(monkeypatch):
+    def fail(self):
+        raise AssertionError("token formatted")
+
+    monkeypatch.setattr(Token, "__repr__", fail)
+    result = compile_source(SOURCE, emit=("tac",))
+
+    assert format_text(result) == "\n".join(result.tac) + "\n"
+    assert '"stage": "tac"' in format_json(result)
+
+
+def test_parse_emit():
+    assert parse_emit("tac, tokens") == ("tokens", "tac")
+    with pytest.raises(argparse.ArgumentTypeError, match="Unknown stage 'ir'"):
+        parse_emit("ast,ir")
+
+    with pytest.raises(SystemExit):
+        main.build_arg_parser().parse_args(["--emit=ir", "a.tc"])
+
+
+def test_text_layout_with_several_stages():
+    result = compile_source(SOURCE, emit=("tokens", "ast", "tac"))
+    text = format_text(result)
+
+    assert text.startswith("===== TOKENS =====\nINT(int)\nIDENTIFIER(x)")
+    assert "\n===== AST GENERATED =====\nProgram(declarations=[Declaration(x" in text
+    assert "Semantic Analysis Passed\n\n===== THREE ADDRESS CODE =====\nx = 2\nL1:\n" in text
+
+
+def test_errors_are_reported_not_raised():
+    syntax = compile_source("int x;\nx = ;\n", emit=("tac",))
+    assert not syntax.ok
+    assert syntax.error == "Parsing failed with 1 syntax error(s)"
+    assert format_text(syntax) == "===== SYNTAX ERRORS =====\nline 2, column 5: Invalid expression at token SEMICOLON(;)\n"
+
+    semantic = compile_source("print(y);", emit=("tac",))
+    assert semantic.stage == "parse"
+    assert semantic.error == "Semantic Error: Variable 'y' not declared."
+
+    record = json.loads(format_json(syntax, path="a.tc").splitlines()[-1])
+    assert record == {
+        "file": "a.tc", "stage": "result", "ok": False,
+        "error": "Parsing failed with 1 syntax error(s)",
+        "diagnostics": [{"line": 2, "column": 5, "message": "Invalid expression at token SEMICOLON(;)"}],
+    }
+
+
+def test_json_lines():
+    result = compile_source(SOURCE, emit=("source", "tokens", "tac"))
+    records = [json.loads(line) for line in format_json(result).splitlines()]
+
+    assert [record["stage"] for record in records] == ["source", "tokens", "tac", "result"]
+    assert records[1]["tokens"][:2] == [["INT", "int", 1, 1], ["IDENTIFIER", "x", 1, 5]]
+    assert records[2]["tac"] == result.tac
+
+
+def test_compile_file_writes_once(tmp_path, monkeypatch):
+    path = tmp_path / "prog.tc"
+    path.write_text(SOURCE)
+    writes = []
+    stdout = io.StringIO()
+    monkeypatch.setattr(stdout, "write", lambda text: writes.append(text))
+    monkeypatch.setattr("sys.stdout", stdout)
+
+    assert main.compile_file(str(path)) == compile_source(SOURCE).tac
+    assert len(writes) == 1
+    assert writes[0].startswith("===== SOURCE CODE =====\n" + SOURCE + "\n\n===== TOKENS =====\n")
+
+
+def test_paths_are_lexed_without_reading_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "prog.tc"
+    path.write_text(SOURCE)
+    mapped = []
+    from_file = Lexer.from_file.__func__
+    monkeypatch.setattr(Lexer, "from_file", classmethod(lambda cls, name: mapped.append(name) or from_file(cls, name)))
+
+    result = compile_source(path)
+    assert mapped == [path]
+    assert result.tac == compile_source(SOURCE).tac
+    assert result.lines == 3
+
+    # Emitting the source needs its text, so the file is read instead
+    result = compile_source(path, emit=("source", "tac"))
+    assert mapped == [path] and result.source == SOURCE
+
+    assert compile_source(SOURCE.encode()).tac == result.tac
+    assert compile_source("int café = 1;\nprint(café);".encode()).tac == ["café = 1", "print café"]
@@ -0,0 +1,112 @@
+"""
+test_semantic.py
+
+Unit tests for semantic analysis and block scopes
+Run with: pytest tests/
+"""
+
+import pytest
+from lexer.lexer import Lexer
+from myparser.parser import Parser
+from myparser.ast_nodes import Block, Declaration
+from semantic import SemanticAnalyzer, SymbolTable
+from semantic.symbol_table import Symbol
+from intermediate import TACGenerator, format_code, parse_code
+
+
+def analyze(source):
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(program)
+    return program, analyzer
+
+
+def test_scopes_shadow_and_restore():
+    table = SymbolTable()
+    outer = table.declare("x", "int")
+
+    table.enter_scope()
+    inner = table.declare("x", "int")
+    table.declare("y", "int")
+    assert table.lookup("x") is inner and inner.depth == 1
+
+    table.enter_scope()
+    assert table.lookup("x") is inner
+    table.exit_scope()
+
+    table.exit_scope()
+    assert table.lookup("x") is outer
+    assert table.depth == 0
+    with pytest.raises(Exception, match="Variable 'y' not declared"):
+        table.lookup("y")
+
+
+def test_redeclaring_in_the_same_scope():
+    table = SymbolTable()
+    table.enter_scope()
+    table.declare("x", "int")
+    with pytest.raises(Exception, match="Variable 'x' already declared"):
+        table.declare("x", "int")
+
+
+def test_block_declarations():
+    program, analyzer = analyze("int x = 1;\nwhile (x > 0) {\n  x = x - 1;\n  int y = x * 2;\n  { int x = y; print(x); }\n}\nprint(x);")
+
+    body = program.statements[0].body
+    assert isinstance(body, Block) and isinstance(body.statements[1], Declaration)
+    assert set(analyzer.symbol_table.table) == {"x"}
+
+    for source in ("int x; { int y; } print(y);", "int x; { print(y); int y; }", "int x; { int y; int y; }"):
+        with pytest.raises(Exception, match="Variable 'y'"):
+            analyze(source)
+
+
+def test_declaration_initializers_generate_tac():
+    program, _ = analyze("int x = 2 * 3;\nint y;\n{ int z = x; print(z); }")
+    assert format_code(TACGenerator().generate(program)) == ["t1 = 2 * 3", "x = t1", "z = x", "print z"]
+
+
+def test_symbols_get_dense_ids_and_unique_names():
+    program, analyzer = analyze("int x = 1;\n{ int x = 2; print(x); }\n{ int x; x = 3; }\nprint(x);")
+    table = analyzer.symbol_table
+
+    assert [symbol.id for symbol in table.symbols] == [0, 1, 2]
+    assert [symbol.unique_name for symbol in table.symbols] == ["x", "x.2", "x.3"]
+    block = program.statements[0]
+    assert block.statements[1].expression.symbol is table.symbols[1]
+    assert program.statements[2].expression.symbol is table.symbols[0]
+
+    generator = TACGenerator(table)
+    code = generator.generate(program)
+    assert code[2].left is table.symbols[1]
+    assert format_code(code) == ["x = 1", "x.2 = 2", "print x.2", "x.3 = 3", "print x"]
+
+    # Temporaries continue the ids of the analyzer's table
+    program, analyzer = analyze("int x = 1 + 2;")
+    code = TACGenerator(analyzer.symbol_table).generate(program)
+    temp = code[0].dest
+    assert (temp.id, temp.type, temp.unique_name) == (1, "temp", "t1")
+
+
+def test_generator_uses_the_analyzed_table():
+    program, analyzer = analyze("int x = 4;\nint y = x * x;\nprint(y);")
+    assert program.symbol_table is analyzer.symbol_table
+
+    generator = TACGenerator()
+    code = generator.generate(program)
+    assert generator.symbol_table is analyzer.symbol_table
+    symbols = {operand for instr in code for operand in (instr.dest, instr.left, instr.right) if isinstance(operand, Symbol)}
+    assert len({symbol.id for symbol in symbols}) == len(symbols) == 3
+
+    with pytest.raises(Exception, match="Symbol 'x' was resolved in a different SymbolTable"):
+        TACGenerator(SymbolTable()).generate(program)
+
+
+def test_variables_named_like_temporaries_print_apart():
+    program, analyzer = analyze("int t1 = 5;\nint x = 2;\nprint(x * 3);\nprint(t1);")
+    lines = format_code(TACGenerator(analyzer.symbol_table).generate(program))
+
+    assert lines == ["t1.2 = 5", "x = 2", "t1 = x * 3", "print t1", "print t1.2"]
+    code = parse_code(lines)
+    assert (code[0].dest.type, code[2].dest.type) == ("int", "temp")
+    assert code[0].dest is code[4].left and code[2].dest is not code[0].dest
@@ -0,0 +1,100 @@
+"""
+test_visitor.py
+
+Unit tests for NodeVisitor dispatch
+Run with: pytest tests/
+"""
+
+import pytest
+from lexer import Lexer
+from myparser.parser import Parser
+from myparser.ast_nodes import ASTNode, Number, Identifier, BinaryOp
+from myparser.visitor import NodeVisitor
+from semantic import SemanticAnalyzer
+from intermediate import TACGenerator, format_code
+
+
+class Doubled(Number):
+    pass
+
+
+class Evaluator(NodeVisitor):
+    method_prefix = "eval_"
+
+    def eval_Number(self, node):
+        return node.value
+
+    def eval_BinaryOp(self, node):
+        return self.visit(node.left) + self.visit(node.right)
+
+
+class Printer(NodeVisitor):
+    def visit_Number(self, node):
+        return str(node.value)
+
+
+def test_dispatch_by_type_and_base_class():
+    evaluator = Evaluator()
+    assert evaluator.visit(BinaryOp(Number(2), "+", Doubled(3))) == 5
+    assert Evaluator._dispatch_table[Doubled] is Evaluator.eval_Number
+
+
+def test_each_subclass_has_its_own_table():
+    Evaluator().visit(Number(1))
+    Printer().visit(Number(1))
+
+    assert Evaluator._dispatch_table[Number] is Evaluator.eval_Number
+    assert Printer._dispatch_table[Number] is Printer.visit_Number
+    assert NodeVisitor._dispatch_table == {}
+
+
+def test_missing_methods_use_the_fallback():
+    with pytest.raises(Exception, match="No eval_Identifier method defined"):
+        Evaluator().visit(Identifier("x"))
+    with pytest.raises(Exception, match="No visit_ASTNode method defined"):
+        SemanticAnalyzer().visit(ASTNode())
+    with pytest.raises(Exception, match="No TAC generator for ASTNode"):
+        TACGenerator().generate(ASTNode())
+
+
+class Counter(NodeVisitor):
+    def visit_BinaryOp(self, node):
+        left = yield node.left
+        right = yield node.right
+        return left + right + 1
+
+    def visit_Number(self, node):
+        return 0
+
+
+def deep_expression(depth):
+    node = Number(1)
+    for _ in range(depth):
+        node = BinaryOp(Number(1), "+", node)
+    return node
+
+
+def test_generator_methods_are_not_limited_by_recursion():
+    assert Counter().visit(deep_expression(50000)) == 50000
+
+
+def test_passes_handle_deep_expressions():
+    source = "int x;\nx = " + "(1 + " * 20000 + "x" + ")" * 20000 + " - x" * 20000 + ";"
+    ast = Parser(Lexer(source).tokenize()).parse()
+
+    SemanticAnalyzer().visit(ast)
+    code = format_code(TACGenerator().generate(ast))
+
+    assert len(code) == 40001
+    assert code[0] == "t1 = 1 + x"
+    assert code[19999] == "t20000 = 1 + t19999"
+    assert code[20000] == "t20001 = t20000 - x"
+    assert code[-1] == "x = t40000"
+
+
+def test_deep_expressions_report_undeclared_names_left_first():
+    source = "int x;\nx = " + "x + " * 5000 + "y + z;"
+    ast = Parser(Lexer(source).tokenize()).parse()
+
+    with pytest.raises(Exception, match="Variable 'y' not declared"):
+        SemanticAnalyzer().visit(ast)
@@ -0,0 +1,149 @@
+"""
+test_vm.py
+
+Unit tests for the bytecode assembler and virtual machine
+Run with: pytest tests/
+"""
+
+import io
+import os
+
+import pytest
+import main
+from driver.cache import CompilationCache
+from driver.pipeline import compile_source
+from intermediate import TACGenerator, parse_code
+from intermediate.ir import Instr, Op
+from lexer import Lexer
+from myparser.parser import Parser
+from semantic import SemanticAnalyzer
+from semantic.symbol_table import Symbol
+from vm import Opcode, VirtualMachine, assemble, run
+from vm import machine
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def output(code):
+    out = io.StringIO()
+    run(code, out)
+    return out.getvalue().split()
+
+
+def test_assembler_resolves_labels_and_slots():
+    bytecode = assemble(parse_code([
+        "x = 3",
+        "L1:",
+        "t1 = x > 0",
+        "ifFalse t1 goto L2",
+        "x = x - 1",
+        "goto L1",
+        "L2:",
+        "print x",
+    ]))
+
+    assert bytecode.names == ["x", "t1", "3", "0", "1"]
+    assert bytecode.slots == [0, 0, 3, 0, 1]
+    assert bytecode.symbols == 2
+    assert bytecode.code == [
+        Opcode.COPY, 0, 2,
+        Opcode.IF_FALSE_GT, 1, 0, 3, 14,
+        Opcode.SUB, 0, 0, 4,
+        Opcode.GOTO, 3,
+        Opcode.PRINT, 0,
+        Opcode.HALT,
+    ]
+    assert all(type(word) is int for word in bytecode.code)
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_examples(optimize):
+    expected = {"sample1.tc": ["30"], "sample2.tc": ["105", "4", "103", "2", "101"]}
+    for name, printed in expected.items():
+        with open(os.path.join(EXAMPLES, name)) as f:
+            result = compile_source(f.read(), optimize=optimize)
+        assert output(result.tac) == printed
+
+
+def test_arithmetic_follows_c():
+    assert output([
+        "a = -7",
+        "t1 = a / 2", "print t1",
+        "t2 = a % 2", "print t2",
+        "t3 = 7 / -2", "print t3",
+        "t4 = 7 % -2", "print t4",
+        "t5 = a << 2", "print t5",
+        "t6 = a <= -7", "print t6",
+        "t7 = a != a", "print t7",
+    ]) == ["-3", "-1", "-3", "1", "-28", "1", "0"]
+
+
+def test_variables_after_run():
+    vm = run(["x = 4", "t1 = x * x", "y = t1"], io.StringIO())
+    assert vm.variables() == {"x": 4, "t1": 16, "y": 16}
+
+
+def test_output_is_buffered(monkeypatch):
+    class Recorder(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            Recorder.writes += 1
+            return super().write(text)
+
+    monkeypatch.setattr(machine, "FLUSH_LINES", 4)
+    result = compile_source("int x = 10;\nwhile (x > 0) { print(x); x = x - 1; }\n")
+    out = Recorder()
+    VirtualMachine(assemble(parse_code(result.tac)), out).run()
+
+    assert out.getvalue().split() == [str(x) for x in range(10, 0, -1)]
+    assert Recorder.writes == 3
+
+
+def test_symbols_sharing_an_id_get_their_own_slots():
+    x = Symbol("x", "int", symbol_id=0)
+    temp = Symbol("t1", "temp", symbol_id=0)
+    code = [Instr(Op.COPY, x, 4), Instr(Op.BINARY, temp, x, "*", x), Instr(Op.PRINT, left=temp), Instr(Op.PRINT, left=x)]
+
+    assert assemble(code).names[:2] == ["x", "t1"]
+    out = io.StringIO()
+    run(code, out)
+    assert out.getvalue() == "16\n4\n"
+
+
+def test_standalone_generator_output_runs():
+    # Temporaries must not share slots with the analyzer's variables
+    program = Parser(Lexer("int x = 4;\nprint(x * x);\nprint(x);").tokenize()).parse()
+    SemanticAnalyzer().visit(program)
+    out = io.StringIO()
+    run(TACGenerator().generate(program), out)
+    assert out.getvalue() == "16\n4\n"
+
+
+def test_division_by_zero_keeps_earlier_output():
+    out = io.StringIO()
+    with pytest.raises(Exception, match="Runtime Error: division by zero"):
+        run(["print 1", "x = 0", "t1 = 5 / x", "print t1"], out)
+    assert out.getvalue() == "1\n"
+
+
+def test_optimizer_keeps_divisions_that_may_trap():
+    source = "int x = 5;\nint y = 0;\nprint(x / y * 0);\nx = x % 0;\nprint(x / 5 * 0);\n"
+    for optimize in (False, True):
+        result = compile_source(source, optimize=optimize)
+        with pytest.raises(Exception, match="Runtime Error: division by zero"):
+            run(result.code, io.StringIO())
+
+    code = compile_source("int x = 5;\nprint(x / 5 * 0);\n", optimize=True).tac
+    assert code == ["print 0"]
+
+
+def test_compile_file_runs_the_instructions(tmp_path, capsys):
+    path = tmp_path / "prog.tc"
+    path.write_text("int t1 = 5;\nint x = 2;\nprint(x * 3);\nprint(t1);\n")
+    cache = CompilationCache(str(tmp_path / "cache"))
+
+    for _ in range(2):
+        main.compile_file(str(path), cache, emit=(), run=True)
+        assert capsys.readouterr().out == "6\n5\n"
+    assert cache.hits == 1
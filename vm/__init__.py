@@ -0,0 +1,12 @@
+"""
+Virtual Machine package
+
+Exposes:
+- assemble, Bytecode, Opcode
+- VirtualMachine, run
+"""
+
+from .assembler import Bytecode, Opcode, assemble
+from .machine import VirtualMachine, run
+
+__all__ = ["assemble", "Bytecode", "Opcode", "VirtualMachine", "run"]
@@ -0,0 +1,173 @@
+# vm/assembler.py
+
+from enum import IntEnum
+
+from intermediate.ir import Op
+from semantic.symbol_table import Symbol
+
+
+class Opcode(IntEnum):
+    # Operands are slot indexes (d, a, b) or code offsets (target)
+    HALT = 0
+    COPY = 1            # d a
+    ADD = 2             # d a b
+    SUB = 3
+    MUL = 4
+    DIV = 5
+    MOD = 6
+    SHL = 7
+    EQ = 8
+    NE = 9
+    LT = 10
+    LE = 11
+    GT = 12
+    GE = 13
+    PRINT = 14          # a
+    GOTO = 15           # target
+    IF_FALSE = 16       # a target
+    # A comparison fused with the ifFalse that reads its result:
+    # `d = a < b; ifFalse d goto target`
+    IF_FALSE_EQ = 17    # d a b target
+    IF_FALSE_NE = 18
+    IF_FALSE_LT = 19
+    IF_FALSE_LE = 20
+    IF_FALSE_GT = 21
+    IF_FALSE_GE = 22
+
+
+BINARY_OPCODES = {
+    "+": Opcode.ADD,
+    "-": Opcode.SUB,
+    "*": Opcode.MUL,
+    "/": Opcode.DIV,
+    "%": Opcode.MOD,
+    "<<": Opcode.SHL,
+    "==": Opcode.EQ,
+    "!=": Opcode.NE,
+    "<": Opcode.LT,
+    "<=": Opcode.LE,
+    ">": Opcode.GT,
+    ">=": Opcode.GE,
+}
+
+FUSED_OPCODES = {
+    "==": Opcode.IF_FALSE_EQ,
+    "!=": Opcode.IF_FALSE_NE,
+    "<": Opcode.IF_FALSE_LT,
+    "<=": Opcode.IF_FALSE_LE,
+    ">": Opcode.IF_FALSE_GT,
+    ">=": Opcode.IF_FALSE_GE,
+}
+
+
+class Bytecode:
+    """
+    An assembled program.
+
+    `code` is a flat list of ints, each opcode followed by its operands.
+    `slots` holds the initial value of every slot: variables and
+    temporaries first, starting at 0, then one slot per distinct
+    constant, so that every operand is a slot index. `names` gives the
+    TAC name of each slot, and `symbols` the number of symbol slots.
+    """
+
+    __slots__ = ("code", "slots", "names", "symbols")
+
+    def __init__(self, code, slots, names, symbols):
+        self.code = code
+        self.slots = slots
+        self.names = names
+        self.symbols = symbols
+
+    def __repr__(self):
+        return f"Bytecode({len(self.code)} words, {len(self.slots)} slots)"
+
+
+def _fuses(code, index):
+    # Whether code[index] is a comparison that the next instruction, an
+    # ifFalse, tests
+    instr = code[index]
+    if instr.operator not in FUSED_OPCODES or index + 1 == len(code):
+        return False
+    following = code[index + 1]
+    return following.op == Op.IF_FALSE and following.left is instr.dest
+
+
+def assemble(code):
+    """
+    Assemble a list of TAC instructions into Bytecode: labels become
+    code offsets, and variables, temporaries and constants become slot
+    indexes. A comparison followed by an ifFalse on its result, as
+    every `if` and `while` condition compiles to, becomes one fused
+    instruction.
+    """
+    # First pass: the offset of every label
+    offsets = {}
+    offset = 0
+    fused = False
+    for index, instr in enumerate(code):
+        op = instr.op
+        if fused:
+            fused = False
+        elif op == Op.LABEL:
+            offsets[instr.label] = offset
+        elif op == Op.BINARY:
+            fused = _fuses(code, index)
+            offset += 5 if fused else 4
+        elif op == Op.COPY or op == Op.IF_FALSE:
+            offset += 3
+        else:
+            offset += 2
+
+    # Every symbol gets a slot before any constant does. Slots are keyed
+    # by the Symbol itself, so symbols from different tables that share
+    # an id still get slots of their own
+    slots = {}
+    names = []
+    for instr in code:
+        for operand in (instr.dest, instr.left, instr.right):
+            if isinstance(operand, Symbol) and operand not in slots:
+                slots[operand] = len(names)
+                names.append(operand.unique_name)
+    symbol_count = len(names)
+    values = [0] * symbol_count
+    constant_slots = {}
+
+    def slot(operand):
+        if isinstance(operand, Symbol):
+            return slots[operand]
+        index = constant_slots.get(operand)
+        if index is None:
+            index = constant_slots[operand] = len(values)
+            values.append(operand)
+            names.append(str(operand))
+        return index
+
+    # Second pass: emit
+    words = []
+    emit = words.extend
+    skip = False
+    for index, instr in enumerate(code):
+        if skip:
+            skip = False
+            continue
+        op = instr.op
+        if op == Op.COPY:
+            emit((Opcode.COPY, slot(instr.dest), slot(instr.left)))
+        elif op == Op.BINARY:
+            if _fuses(code, index):
+                target = offsets[code[index + 1].label]
+                emit((FUSED_OPCODES[instr.operator], slot(instr.dest), slot(instr.left), slot(instr.right), target))
+                skip = True
+            else:
+                emit((BINARY_OPCODES[instr.operator], slot(instr.dest), slot(instr.left), slot(instr.right)))
+        elif op == Op.PRINT:
+            emit((Opcode.PRINT, slot(instr.left)))
+        elif op == Op.GOTO:
+            emit((Opcode.GOTO, offsets[instr.label]))
+        elif op == Op.IF_FALSE:
+            emit((Opcode.IF_FALSE, slot(instr.left), offsets[instr.label]))
+    words.append(Opcode.HALT)
+
+    # Plain ints, so the VM compares opcodes without enum lookups
+    return Bytecode([int(word) for word in words], values, names, symbol_count)
@@ -0,0 +1,142 @@
+# vm/machine.py
+
+import sys
+
+from intermediate.ir import parse_code
+from .assembler import Opcode, assemble
+
+
+# Printed values are written out in batches of this many lines
+FLUSH_LINES = 4096
+
+
+class VirtualMachine:
+    """
+    Runs assembled Bytecode.
+
+    The dispatch loop reads opcodes and slot indexes straight from the
+    flat code list, with the most frequent opcodes tested first.
+    Arithmetic follows the target language: `/` truncates toward zero
+    and `%` takes the sign of the dividend, as in C, and comparisons
+    give 1 or 0. Printed values are buffered and written to `out`
+    (standard output by default) in batches, and whatever was printed
+    is still written if the program stops on an error.
+    """
+
+    def __init__(self, bytecode, out=None):
+        self.bytecode = bytecode
+        self.out = out
+        self.slots = None
+
+    def variables(self):
+        """The value of every variable and temporary after run(), by TAC name."""
+        return dict(zip(self.bytecode.names[:self.bytecode.symbols], self.slots))
+
+    def run(self):
+        out = sys.stdout if self.out is None else self.out
+        code = self.bytecode.code
+        slots = self.slots = list(self.bytecode.slots)
+        buffer = []
+        (HALT, COPY, ADD, SUB, MUL, DIV, MOD, SHL, EQ, NE, LT, LE, GT, GE, PRINT, GOTO, IF_FALSE,
+         IF_FALSE_EQ, IF_FALSE_NE, IF_FALSE_LT, IF_FALSE_LE, IF_FALSE_GT, IF_FALSE_GE) = map(int, Opcode)
+
+        pc = 0
+        try:
+            while True:
+                op = code[pc]
+                if op == COPY:
+                    slots[code[pc + 1]] = slots[code[pc + 2]]
+                    pc += 3
+                elif op == ADD:
+                    slots[code[pc + 1]] = slots[code[pc + 2]] + slots[code[pc + 3]]
+                    pc += 4
+                elif op == SUB:
+                    slots[code[pc + 1]] = slots[code[pc + 2]] - slots[code[pc + 3]]
+                    pc += 4
+                elif op == GOTO:
+                    pc = code[pc + 1]
+                elif op == IF_FALSE_GT:
+                    condition = slots[code[pc + 2]] > slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == IF_FALSE_EQ:
+                    condition = slots[code[pc + 2]] == slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == IF_FALSE_LT:
+                    condition = slots[code[pc + 2]] < slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == MUL:
+                    slots[code[pc + 1]] = slots[code[pc + 2]] * slots[code[pc + 3]]
+                    pc += 4
+                elif op == PRINT:
+                    buffer.append(slots[code[pc + 1]])
+                    if len(buffer) >= FLUSH_LINES:
+                        out.write("\n".join(map(str, buffer)) + "\n")
+                        buffer.clear()
+                    pc += 2
+                elif op == MOD or op == DIV:
+                    left = slots[code[pc + 2]]
+                    right = slots[code[pc + 3]]
+                    if not right:
+                        raise Exception("Runtime Error: division by zero")
+                    # Floor division, corrected to truncate toward zero
+                    quotient = left // right
+                    if quotient < 0 and quotient * right != left:
+                        quotient += 1
+                    slots[code[pc + 1]] = quotient if op == DIV else left - right * quotient
+                    pc += 4
+                elif op == IF_FALSE_NE:
+                    condition = slots[code[pc + 2]] != slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == IF_FALSE_LE:
+                    condition = slots[code[pc + 2]] <= slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == IF_FALSE_GE:
+                    condition = slots[code[pc + 2]] >= slots[code[pc + 3]]
+                    slots[code[pc + 1]] = 1 if condition else 0
+                    pc = pc + 5 if condition else code[pc + 4]
+                elif op == IF_FALSE:
+                    pc = pc + 3 if slots[code[pc + 1]] else code[pc + 2]
+                elif op == EQ:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] == slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == NE:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] != slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == LT:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] < slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == LE:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] <= slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == GT:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] > slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == GE:
+                    slots[code[pc + 1]] = 1 if slots[code[pc + 2]] >= slots[code[pc + 3]] else 0
+                    pc += 4
+                elif op == SHL:
+                    slots[code[pc + 1]] = slots[code[pc + 2]] << slots[code[pc + 3]]
+                    pc += 4
+                elif op == HALT:
+                    break
+                else:
+                    raise Exception(f"Invalid opcode {op} at offset {pc}")
+        finally:
+            if buffer:
+                out.write("\n".join(map(str, buffer)) + "\n")
+        return self
+
+
+def run(code, out=None):
+    """
+    Assemble and run a program given as TAC instructions or as printed
+    TAC lines. Returns the VirtualMachine, to inspect its variables.
+    """
+    if code and isinstance(code[0], str):
+        code = parse_code(code)
+    return VirtualMachine(assemble(code), out).run()